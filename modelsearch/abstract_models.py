@@ -57,6 +57,11 @@ class BaseIndexEntry(models.Model):
     # elevating more specific matches to the top.
     title_norm = models.FloatField(default=1.0)
 
+    # A hash of the indexed content, so that writing the same content again can be skipped.
+    # This is nullable so that it can be added without rebuilding the table on SQLite,
+    # which would drop the triggers that keep the full text search table in sync.
+    fingerprint = models.CharField(max_length=40, null=True)  # NOQA: DJ001
+
     wagtail_reference_index_ignore = True
 
     class Meta:
@@ -79,6 +84,87 @@ class BaseIndexEntry(models.Model):
                 TextIDGenericRelation(cls).contribute_to_class(model, "index_entries")
 
 
+class AbstractIndexEntryStatistics(models.Model):
+    """
+    Running totals over the IndexEntry table that the database backends keep up to date as
+    entries are added and removed, so that they don't have to be aggregated over the whole
+    table each time they are needed.
+
+    There is at most one row in this table, which always has the primary key SINGLETON_PK.
+    """
+
+    SINGLETON_PK = 1
+
+    id = models.PositiveSmallIntegerField(
+        primary_key=True, default=SINGLETON_PK, editable=False
+    )
+
+    # The sum of the lengths of all non-empty titles, and the number of entries with one.
+    # These are used to work out the average title length for the title_norm field.
+    title_length_sum = models.BigIntegerField(default=0)
+    title_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("index entry statistics")
+        verbose_name_plural = _("index entry statistics")
+        abstract = True
+
+    def __str__(self):
+        return f"{self.title_count} titles"
+
+
+class AbstractRebuildCheckpoint(models.Model):
+    """
+    Records how far the rebuild_modelsearch_index command has got with rebuilding an index,
+    so that a rebuild that was interrupted can be resumed with the --resume option.
+
+    The objects of each model are indexed in primary key order, and the models of an index
+    are indexed one after another. So every model that comes before ``model`` in the index
+    has been indexed, as have the objects of ``model`` up to and including ``last_pk``.
+    """
+
+    backend_name = models.CharField(max_length=255)
+    index_name = models.CharField(max_length=255)
+
+    # The index that is being built. For atomic rebuilds this is the new index that will
+    # replace the one named index_name when the rebuild finishes.
+    target_index_name = models.CharField(max_length=255)
+
+    model = models.CharField(max_length=255, blank=True)
+    last_pk = models.CharField(max_length=255, null=True, blank=True)  # NOQA: DJ001
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("rebuild checkpoint")
+        verbose_name_plural = _("rebuild checkpoints")
+        unique_together = ("backend_name", "index_name")
+        abstract = True
+
+    def __str__(self):
+        return f"{self.backend_name}: {self.index_name}"
+
+
+class AbstractUpdateWatermark(models.Model):
+    """
+    Records when the update_modelsearch_index command last updated a model in a backend.
+    Objects modified after this time are reindexed the next time the command runs with
+    ``--since last``.
+    """
+
+    backend_name = models.CharField(max_length=255)
+    model = models.CharField(max_length=255)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("update watermark")
+        verbose_name_plural = _("update watermarks")
+        unique_together = ("backend_name", "model")
+        abstract = True
+
+    def __str__(self):
+        return f"{self.backend_name}: {self.model}"
+
+
 AbstractSQLiteFTSIndexEntry = None
 
 
@@ -3,6 +3,7 @@ from django.conf import settings
 from django.core.checks import Tags, Warning, register
 from django.db import connection
 
+from modelsearch.index import search_plans
 from modelsearch.signal_handlers import register_signal_handlers
 
 
@@ -14,6 +15,10 @@ class ModelSearchAppConfig(AppConfig):
     backend_setting_name = "MODELSEARCH_BACKENDS"
 
     def ready(self):
+        # Resolve the search fields of all indexed models up front, so that this doesn't
+        # have to be done again for each object that is indexed
+        search_plans.build()
+
         register_signal_handlers()
 
         if connection.vendor == "postgresql":
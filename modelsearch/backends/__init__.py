@@ -2,9 +2,14 @@
 # Based on the Django cache framework
 # https://github.com/django/django/blob/5d263dee304fdaf95e18d2f0619d6925984a7f02/django/core/cache/__init__.py
 
+import threading
+
 from importlib import import_module
 
+from django.apps import apps
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.module_loading import import_string
 
 from modelsearch.conf import get_app_config
@@ -37,17 +42,94 @@ def import_backend(dotted_path):
             raise ImportError from e
 
 
-def get_search_backend(backend="default", **kwargs):
+def _freeze(value):
     """
-    Get the search backend instance for the given backend name. This name can be:
-    - An identifier for a backend as defined in MODELSEARCH_BACKENDS
-    - A dotted path to a backend class (in the form modelsearch.backends.elasticsearch or modelsearch.backends.elasticsearch.ElasticsearchSearchBackend)
+    Converts a backend parameter into a hashable value so it can be used as part
+    of a registry key. Raises TypeError if the value cannot be hashed.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    elif isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
 
-    If no name is specified, `default` will be used; this defaults to the `modelsearch.backends.database` backend if not specified in MODELSEARCH_BACKENDS.
+    hash(value)
+    return value
 
-    All options within the MODELSEARCH_BACKENDS entry (except for `BACKEND` itself) will be passed to the backend class during instantiation. Additional
-    keyword arguments will also be passed to the backend class (and override options from MODELSEARCH_BACKENDS).
+
+class SearchBackendRegistry:
     """
+    A per-process registry of configured search backend instances.
+
+    Constructing a backend can be expensive (the Elasticsearch/OpenSearch backends
+    create a new client with its own connection pool), so instances are created
+    once for each combination of backend name and keyword arguments and then
+    reused. The registry is thread-safe and is cleared whenever the search
+    backends setting is changed (for example, by ``override_settings`` in tests).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backends = {}
+        self.instances_created = 0
+        self.connections_created = 0
+
+    def get(self, backend="default", **kwargs):
+        backend_cls, params = _resolve_backend(backend, kwargs)
+
+        try:
+            key = (backend, _freeze(kwargs), backend_cls)
+        except TypeError:
+            # One of the parameters can't be hashed (such as a custom connection
+            # class instance). Don't share this instance with anyone else.
+            return self._create(backend_cls, params)
+
+        try:
+            return self._backends[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key not in self._backends:
+                self._backends[key] = self._create(backend_cls, params)
+
+            return self._backends[key]
+
+    def _create(self, backend_cls, params):
+        instance = backend_cls(params)
+        self.instances_created += 1
+
+        # Backends for external services hold a client with its own connection pool
+        if getattr(instance, "client_class", None) is not None:
+            self.connections_created += 1
+
+        return instance
+
+    def reset(self):
+        """
+        Discards all registered backend instances. New instances will be created
+        the next time they are requested.
+        """
+        with self._lock:
+            self._backends.clear()
+
+    def stats(self):
+        """
+        Returns the number of backend instances currently held by the registry and
+        the number of instances and client connections created since startup.
+        """
+        return {
+            "instances": len(self._backends),
+            "instances_created": self.instances_created,
+            "connections_created": self.connections_created,
+        }
+
+
+search_backend_registry = SearchBackendRegistry()
+
+
+def _resolve_backend(backend, kwargs):
     search_backends = get_app_config().get_search_backend_config()
 
     # Try to find the backend
@@ -62,7 +144,7 @@ def get_search_backend(backend="default", **kwargs):
             raise InvalidSearchBackendError(
                 f"Could not find backend '{backend}': {e}"
             ) from e
-        params = kwargs
+        params = kwargs.copy()
     else:
         # Backend is a conf entry
         params = conf.copy()
@@ -77,8 +159,39 @@ def get_search_backend(backend="default", **kwargs):
             f"Could not find backend '{backend}': {e}"
         ) from e
 
-    # Create backend
-    return backend_cls(params)
+    return backend_cls, params
+
+
+def get_search_backend(backend="default", **kwargs):
+    """
+    Get the search backend instance for the given backend name. This name can be:
+    - An identifier for a backend as defined in MODELSEARCH_BACKENDS
+    - A dotted path to a backend class (in the form modelsearch.backends.elasticsearch or modelsearch.backends.elasticsearch.ElasticsearchSearchBackend)
+
+    If no name is specified, `default` will be used; this defaults to the `modelsearch.backends.database` backend if not specified in MODELSEARCH_BACKENDS.
+
+    All options within the MODELSEARCH_BACKENDS entry (except for `BACKEND` itself) will be passed to the backend class during instantiation. Additional
+    keyword arguments will also be passed to the backend class (and override options from MODELSEARCH_BACKENDS).
+
+    Backend instances are shared through the process-wide ``search_backend_registry``, so
+    calling this repeatedly with the same arguments returns the same instance.
+    """
+    return search_backend_registry.get(backend, **kwargs)
+
+
+def reset_search_backends():
+    """
+    Discards all shared backend instances, so they are recreated from the current
+    settings the next time they are requested.
+    """
+    search_backend_registry.reset()
+
+
+@receiver(setting_changed)
+def reset_search_backends_on_setting_change(*, setting, **kwargs):
+    # Backends can't have been created before the app registry is ready
+    if apps.ready and setting == get_app_config().backend_setting_name:
+        reset_search_backends()
 
 
 def get_search_backends_with_name(with_auto_update=False):
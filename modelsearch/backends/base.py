@@ -1,4 +1,5 @@
 import datetime
+import threading
 
 from warnings import warn
 
@@ -270,6 +271,7 @@ class BaseSearchResults:
     """
 
     supports_facet = False
+    supports_values = False
 
     def __init__(self, backend, query_compiler, prefetch_related=None):
         self.backend = backend
@@ -280,6 +282,12 @@ class BaseSearchResults:
         self._results_cache = None
         self._count_cache = None
         self._score_field = None
+        self._values_fields = None
+        # The number of results before slicing, if the backend found it while searching
+        self._total_hits = None
+        # Whether the search should count every result exactly while searching, rather
+        # than up to the backend's limit (set by SearchPaginator, which needs the count)
+        self._count_total_hits = False
         # Attach the model to mimic a QuerySet so that we can inspect it after
         # doing a search, e.g. to get the model's name in a paginator.
         # The query_compiler may be None, e.g. when using EmptySearchResults.
@@ -309,6 +317,8 @@ class BaseSearchResults:
         new.start = self.start
         new.stop = self.stop
         new._score_field = self._score_field
+        new._values_fields = self._values_fields
+        new._count_total_hits = self._count_total_hits
         return new
 
     def _do_search(self):
@@ -382,10 +392,49 @@ class BaseSearchResults:
         return clone
 
     def facet(self, field_name):
+        return self.facets([field_name])[field_name]
+
+    def facets(self, field_names):
+        """
+        Performs a faceted search on each of the given fields at once. Returns a dict of the
+        facet results of each field, in the same format as facet().
+        """
         raise NotImplementedError("This search backend does not support faceting")
 
+    def _check_facet_field(self, field_name):
+        field = self.query_compiler._get_filterable_field(field_name)
+        if field is None:
+            raise FilterFieldError(
+                'Cannot facet search results with field "'
+                + field_name
+                + "\". Please add index.FilterField('"
+                + field_name
+                + "') to "
+                + self.query_compiler.queryset.model.__name__
+                + ".search_fields.",
+                field_name=field_name,
+            )
+
+        return field
+
+    def values(self, *field_names):
+        """
+        Returns the results as dicts of the given fields, read from the search index
+        rather than the database. With no field names, all fields in the index are returned.
+        """
+        if not self.supports_values:
+            raise NotImplementedError(
+                "This search backend does not support fetching values"
+            )
+
+        clone = self._clone()
+        clone._values_fields = field_names
+        return clone
+
 
 class EmptySearchResults(BaseSearchResults):
+    supports_values = True
+
     def __init__(self):
         super().__init__(None, None)
 
@@ -407,6 +456,10 @@ class BaseIndex:
     backend. Subclass it for backends that need to do something.
     """
 
+    # Whether to skip writing documents that haven't changed since they were last indexed.
+    # This is turned off when rebuilding, which rewrites every document.
+    skip_unchanged = True
+
     def __init__(self, backend):
         self.backend = backend
 
@@ -452,6 +505,16 @@ class BaseIndex:
         """
         pass
 
+    def delete_items(self, model, pks):
+        """
+        Deletes multiple objects of the same model from the index, given their primary keys.
+
+        Indexes that can delete several objects at once should override this. By default,
+        each object is deleted with delete_item().
+        """
+        for pk in pks:
+            self.delete_item(model(pk=pk))
+
 
 class BaseSearchBackend:
     query_compiler_class = None
@@ -462,7 +525,19 @@ class BaseSearchBackend:
     catch_indexing_errors = False
 
     def __init__(self, params):
-        pass
+        # The number of documents that weren't written because they were already indexed
+        # with the same content (see add_skipped_writes)
+        self.skipped_writes = 0
+        self._skipped_writes_lock = threading.Lock()
+
+    def add_skipped_writes(self, count):
+        """
+        Adds to the number of documents that weren't written because they were already
+        indexed with the same content. Backends are shared by every thread in the process,
+        so the count is updated under a lock.
+        """
+        with self._skipped_writes_lock:
+            self.skipped_writes += count
 
     def get_index_for_model(self, model):
         """
@@ -476,6 +551,17 @@ class BaseSearchBackend:
         """
         return self.get_index_for_model(obj._meta.model)
 
+    def get_index_by_key(self, key, rebuilding=False):
+        """
+        Returns the index with the given key (see BaseIndex.get_key). Used by the workers of
+        parallel rebuilds, which are given the key of the index that is being rebuilt.
+        """
+        index = self.index_class(self)
+
+        # Every object is written when rebuilding, so don't look up their fingerprints
+        index.skip_unchanged = not rebuilding
+        return index
+
     def all_indexes(self):
         """
         Returns a sequence of all indexes used by this backend.
@@ -521,6 +607,13 @@ class BaseSearchBackend:
         """
         self.get_index_for_object(obj).delete_item(obj)
 
+    def delete_bulk(self, model, pks):
+        """
+        Deletes multiple objects of the same model from the data store managed by this backend,
+        given their primary keys.
+        """
+        self.get_index_for_model(model).delete_items(model, pks)
+
     def _search(self, query_compiler_class, query, model_or_queryset, **kwargs):
         # Find model/queryset
         if isinstance(model_or_queryset, QuerySet):
@@ -591,6 +684,18 @@ class BaseSearchBackend:
             order_by_relevance=order_by_relevance,
         )
 
+    def multi_search(self, results):
+        """
+        Performs several searches at once, filling in each of the given SearchResults.
+        Backends that can send several searches in one request override this.
+        """
+        results = list(results)
+
+        for result in results:
+            result.results()
+
+        return results
+
 
 def get_model_root(model):
     """
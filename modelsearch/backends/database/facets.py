@@ -0,0 +1,137 @@
+from collections import Counter, OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Count, F, Value
+
+
+def is_multi_valued(model, field_name):
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return False
+
+    return field.many_to_many or field.one_to_many
+
+
+def count_values(queryset, field_name):
+    """
+    Counts the values of the given field in a GROUP BY query.
+    """
+    counter = Counter()
+
+    for row in queryset.values(field_name).annotate(count=Count("pk")):
+        counter[row[field_name]] += row["count"]
+
+    return OrderedDict(counter.most_common())
+
+
+def count_values_with_union(queryset, field_names):
+    """
+    Counts the values of the given fields in a single query, which combines a GROUP BY
+    over each field with UNION ALL. Each field gets a column of its own, which is NULL
+    in the rows of the other fields, and a "facet" column says which field a row is for.
+    """
+    columns = [f"facet_{i}" for i in range(len(field_names))]
+
+    # Typed NULLs, so that the values of each column are converted the same way as the
+    # field's (the columns of a UNION take their types from the first query)
+    nulls = [
+        Value(None, output_field=queryset.query.clone().resolve_ref(name).output_field)
+        for name in field_names
+    ]
+
+    querysets = [
+        queryset.annotate(
+            facet=Value(i),
+            **{
+                column: F(field_name) if j == i else nulls[j]
+                for j, column in enumerate(columns)
+            },
+        )
+        .values("facet", *columns)
+        .annotate(count=Count("pk"))
+        for i, field_name in enumerate(field_names)
+    ]
+
+    counters = [Counter() for field_name in field_names]
+    for row in querysets[0].union(*querysets[1:], all=True):
+        counters[row["facet"]][row[columns[row["facet"]]]] += row["count"]
+
+    return {
+        field_name: OrderedDict(counter.most_common())
+        for field_name, counter in zip(field_names, counters, strict=True)
+    }
+
+
+def count_values_with_grouping_sets(queryset, field_names):
+    """
+    Counts the values of the given fields in a single query with GROUPING SETS, so the
+    database groups by each field separately in one pass over the results.
+    """
+    connection = connections[queryset.db]
+    quote_name = connection.ops.quote_name
+    sql, params = queryset.values(*field_names).query.sql_with_params()
+
+    columns = [quote_name(f"facet_{i}") for i in range(len(field_names))]
+    groupings = [f"GROUPING({column})" for column in columns]
+    grouping_sets = [f"({column})" for column in columns]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT {", ".join(columns)}, {", ".join(groupings)}, COUNT(*)
+            FROM ({sql}) AS {quote_name("facets")} ({", ".join(columns)})
+            GROUP BY GROUPING SETS ({", ".join(grouping_sets)})
+            ORDER BY COUNT(*) DESC
+            """,  # noqa: S608
+            params,
+        )
+        rows = cursor.fetchall()
+
+    facets = {field_name: OrderedDict() for field_name in field_names}
+    for row in rows:
+        values = row[: len(field_names)]
+        grouped_out = row[len(field_names) : -1]
+        for field_name, value, is_grouped_out in zip(
+            field_names, values, grouped_out, strict=True
+        ):
+            # GROUPING() is 1 for the fields that this row isn't grouped by
+            if not is_grouped_out:
+                facets[field_name][value] = row[-1]
+
+    return facets
+
+
+def get_facets(queryset, field_names, grouping_sets=False):
+    """
+    Counts the values of each of the given fields in the search results, returning a dict
+    of an OrderedDict of values to counts (most common first) for each field.
+
+    Fields with a single value per object are counted together in one query, with
+    GROUPING SETS if the database supports them and UNION ALL otherwise. Fields that may
+    have several values per object (such as many-to-many fields) are each counted in a
+    query of their own, as joining them would count each object once for each of their
+    values.
+    """
+    model = queryset.model
+    field_names = list(dict.fromkeys(field_names))
+    queryset = queryset.order_by()
+
+    single_valued = [
+        field_name
+        for field_name in field_names
+        if not is_multi_valued(model, field_name)
+    ]
+
+    facets = {}
+    if len(single_valued) > 1 and grouping_sets:
+        facets.update(count_values_with_grouping_sets(queryset, single_valued))
+    elif len(single_valued) > 1:
+        facets.update(count_values_with_union(queryset, single_valued))
+
+    for field_name in field_names:
+        if field_name not in facets:
+            facets[field_name] = count_values(queryset, field_name)
+
+    return {field_name: facets[field_name] for field_name in field_names}
@@ -1,17 +1,15 @@
-from collections import OrderedDict
 from warnings import warn
 
 from django.core.exceptions import FieldDoesNotExist
 from django.db import models
-from django.db.models import Count
 from django.db.models.expressions import Value
 
 from modelsearch.backends.base import (
     BaseSearchBackend,
     BaseSearchQueryCompiler,
     BaseSearchResults,
-    FilterFieldError,
 )
+from modelsearch.backends.database.facets import get_facets
 from modelsearch.query import And, Boost, MatchAll, Not, Or, Phrase, PlainText
 from modelsearch.utils import AND, OR
 
@@ -183,29 +181,13 @@ class DatabaseSearchResults(BaseSearchResults):
 
     supports_facet = True
 
-    def facet(self, field_name):
-        # Get field
-        field = self.query_compiler._get_filterable_field(field_name)
-        if field is None:
-            raise FilterFieldError(
-                'Cannot facet search results with field "'
-                + field_name
-                + "\". Please add index.FilterField('"
-                + field_name
-                + "') to "
-                + self.query_compiler.queryset.model.__name__
-                + ".search_fields.",
-                field_name=field_name,
-            )
+    def facets(self, field_names):
+        for field_name in field_names:
+            self._check_facet_field(field_name)
 
         query = self.get_queryset()
-        results = (
-            query.values(field_name).annotate(count=Count("pk")).order_by("-count")
-        )
 
-        return OrderedDict(
-            [(result[field_name], result["count"]) for result in results]
-        )
+        return get_facets(query, field_names)
 
 
 class DatabaseSearchBackend(BaseSearchBackend):
@@ -0,0 +1,171 @@
+import hashlib
+import json
+
+from django.db.models import Manager
+from django.utils.encoding import force_str
+from django.utils.functional import cached_property
+
+from modelsearch.index import (
+    AutocompleteField,
+    RelatedFields,
+    SearchField,
+    get_search_plan,
+)
+
+
+class BaseObjectIndexer:
+    """
+    Responsible for extracting data from an object to be inserted into the index.
+
+    The search fields of the object (and of any related objects) are walked once, sorting
+    each value into the title, body or autocomplete texts. Subclasses convert those texts
+    into the values that are stored in the database by overriding ``join_texts``.
+    """
+
+    def __init__(self, obj, backend):
+        self.obj = obj
+        self.search_fields = get_search_plan(type(obj)).search_fields
+        self.config = backend.config
+
+    def prepare_value(self, value):
+        if isinstance(value, str):
+            return value
+
+        elif isinstance(value, list):
+            return ", ".join(self.prepare_value(item) for item in value)
+
+        elif isinstance(value, dict):
+            return ", ".join(self.prepare_value(item) for item in value.values())
+
+        return force_str(value)
+
+    def get_weight(self, field):
+        """
+        Returns the weight to index the values of the given field with, if the database
+        supports weights.
+        """
+        return None
+
+    def prepare_field(self, obj, field):
+        if isinstance(field, (SearchField, AutocompleteField)):
+            yield (
+                field,
+                self.get_weight(field),
+                self.prepare_value(field.get_value(obj)),
+            )
+
+        elif isinstance(field, RelatedFields):
+            sub_obj = field.get_value(obj)
+            if sub_obj is None:
+                return
+
+            if isinstance(sub_obj, Manager):
+                sub_objs = sub_obj.all()
+
+            else:
+                if callable(sub_obj):
+                    sub_obj = sub_obj()
+
+                sub_objs = [sub_obj]
+
+            for sub_obj in sub_objs:
+                for sub_field in field.fields:
+                    yield from self.prepare_field(sub_obj, sub_field)
+
+    @cached_property
+    def texts(self):
+        """
+        Returns the (value, weight) pairs to index as title, body and autocomplete.
+
+        Title is the value of all SearchFields that have the field_name 'title', body is the
+        value of all other SearchFields and autocomplete is the value of all
+        AutocompleteFields.
+        """
+        title = []
+        body = []
+        autocomplete = []
+
+        for field in self.search_fields:
+            for current_field, weight, value in self.prepare_field(self.obj, field):
+                if isinstance(current_field, AutocompleteField):
+                    autocomplete.append((value, weight))
+                elif current_field.field_name == "title":
+                    title.append((value, weight))
+                else:
+                    body.append((value, weight))
+
+        return title, body, autocomplete
+
+    def join_texts(self, texts, for_autocomplete=False):
+        """
+        Converts a list of (value, weight) pairs into the value to store in the index.
+        """
+        return " ".join(value for value, weight in texts)
+
+    @cached_property
+    def id(self):
+        """
+        Returns the value to use as the ID of the record in the index
+        """
+        return force_str(self.obj.pk)
+
+    @cached_property
+    def title(self):
+        """
+        Returns all values to index as "title".
+        """
+        return self.join_texts(self.texts[0])
+
+    @cached_property
+    def body(self):
+        """
+        Returns all values to index as "body".
+        """
+        return self.join_texts(self.texts[1])
+
+    @cached_property
+    def autocomplete(self):
+        """
+        Returns all values to index as "autocomplete".
+        """
+        return self.join_texts(self.texts[2], for_autocomplete=True)
+
+    def get_fingerprint_content(self):
+        """
+        Returns everything that affects the values stored in the index for this object.
+        """
+        return {"config": self.config, "texts": self.texts}
+
+    @cached_property
+    def fingerprint(self):
+        """
+        Returns a hash of the content to index. This is stored on the index entry so that
+        indexing the same content again can be skipped.
+        """
+        content = json.dumps(self.get_fingerprint_content(), sort_keys=True)
+        return hashlib.sha1(content.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_changed_indexers(index, content_type_pk, indexers):
+    """
+    Returns the indexers whose content is different to what is stored in the index, keyed by
+    object ID. The other objects are counted as skipped writes on the backend.
+    """
+    indexers = {indexer.id: indexer for indexer in indexers}
+
+    if not index.skip_unchanged:
+        return indexers
+
+    fingerprints = dict(
+        index.entries.using(index.write_connection.alias)
+        .filter(content_type_id=content_type_pk, object_id__in=list(indexers.keys()))
+        .values_list("object_id", "fingerprint")
+    )
+    changed = {
+        object_id: indexer
+        for object_id, indexer in indexers.items()
+        if fingerprints.get(object_id) != indexer.fingerprint
+    }
+    index.backend.add_skipped_writes(len(indexers) - len(changed))
+
+    return changed
@@ -1,8 +1,6 @@
 import re
 import warnings
 
-from collections import OrderedDict
-
 from django.db import (
     NotSupportedError,
     connections,
@@ -10,28 +8,29 @@ from django.db import (
     transaction,
 )
 from django.db.models import Case, OuterRef, Subquery, When
-from django.db.models.aggregates import Avg, Count
 from django.db.models.constants import LOOKUP_SEP
 from django.db.models.expressions import F
 from django.db.models.fields import BooleanField, FloatField, TextField
 from django.db.models.functions.comparison import Cast
-from django.db.models.functions.text import Length
-from django.db.models.manager import Manager
 from django.utils.encoding import force_str
-from django.utils.functional import cached_property
 
 from modelsearch.backends.base import (
     BaseIndex,
     BaseSearchBackend,
     BaseSearchQueryCompiler,
     BaseSearchResults,
-    FilterFieldError,
+)
+from modelsearch.backends.database.facets import get_facets
+from modelsearch.backends.database.indexer import (
+    BaseObjectIndexer,
+    get_changed_indexers,
 )
 from modelsearch.backends.database.mysql.query import (
     Lexeme,
     MatchExpression,
     SearchQuery,
 )
+from modelsearch.backends.database.title_norms import TitleNorms
 from modelsearch.conf import get_app_config
 from modelsearch.index import (
     AutocompleteField,
@@ -50,107 +49,14 @@ from modelsearch.utils import (
 IndexEntry = get_app_config().get_model("IndexEntry", require_ready=False)
 
 
-class ObjectIndexer:
-    """
-    Responsible for extracting data from an object to be inserted into the index.
-    """
-
-    def __init__(self, obj, backend):
-        self.obj = obj
-        self.search_fields = obj.get_search_fields()
-        self.config = backend.config
-
-    def prepare_value(self, value):
-        if isinstance(value, str):
-            return value
-
-        elif isinstance(value, list):
-            return ", ".join(self.prepare_value(item) for item in value)
-
-        elif isinstance(value, dict):
-            return ", ".join(self.prepare_value(item) for item in value.values())
-
-        return force_str(value)
-
-    def prepare_field(self, obj, field):
-        if isinstance(field, SearchField):
-            yield (field, self.prepare_value(field.get_value(obj)))
-
-        elif isinstance(field, AutocompleteField):
-            yield (field, self.prepare_value(field.get_value(obj)))
-
-        elif isinstance(field, RelatedFields):
-            sub_obj = field.get_value(obj)
-            if sub_obj is None:
-                return
-
-            if isinstance(sub_obj, Manager):
-                sub_objs = sub_obj.all()
-
-            else:
-                if callable(sub_obj):
-                    sub_obj = sub_obj()
-
-                sub_objs = [sub_obj]
-
-            for sub_obj in sub_objs:
-                for sub_field in field.fields:
-                    yield from self.prepare_field(sub_obj, sub_field)
-
-    @cached_property
-    def id(self):
-        """
-        Returns the value to use as the ID of the record in the index
-        """
-        return force_str(self.obj.pk)
-
-    @cached_property
-    def title(self):
-        """
-        Returns all values to index as "title". This is the value of all SearchFields that have the field_name 'title'
-        """
-        texts = []
-        for field in self.search_fields:
-            for current_field, value in self.prepare_field(self.obj, field):
-                if (
-                    isinstance(current_field, SearchField)
-                    and current_field.field_name == "title"
-                ):
-                    texts.append(value)
-
-        return " ".join(texts)
-
-    @cached_property
-    def body(self):
-        """
-        Returns all values to index as "body". This is the value of all SearchFields excluding the title
-        """
-        texts = []
-        for field in self.search_fields:
-            for current_field, value in self.prepare_field(self.obj, field):
-                if (
-                    isinstance(current_field, SearchField)
-                    and not current_field.field_name == "title"
-                ):
-                    texts.append(value)
-
-        return " ".join(texts)
-
-    @cached_property
-    def autocomplete(self):
-        """
-        Returns all values to index as "autocomplete". This is the value of all AutocompleteFields
-        """
-        texts = []
-        for field in self.search_fields:
-            for current_field, value in self.prepare_field(self.obj, field):
-                if isinstance(current_field, AutocompleteField):
-                    texts.append(value)
-
-        return " ".join(texts)
+class ObjectIndexer(BaseObjectIndexer):
+    pass
 
 
 class MySQLIndex(BaseIndex):
+    # The number of stale entries to delete per query when rebuilding
+    stale_entries_chunk_size = 1000
+
     def __init__(self, backend):
         super().__init__(backend)
 
@@ -166,37 +72,7 @@ class MySQLIndex(BaseIndex):
             )
 
         self.entries = IndexEntry._default_manager.all()
-
-    def _refresh_title_norms(self, full=False):
-        """
-        Refreshes the value of the title_norm field.
-
-        This needs to be set to 'lavg/ld' where:
-         - lavg is the average length of titles in all documents (also in terms)
-         - ld is the length of the title field in this document (in terms)
-        """
-
-        lavg = (
-            self.entries.annotate(title_length=Length("title"))
-            .filter(title_length__gt=0)
-            .aggregate(Avg("title_length"))["title_length__avg"]
-        )
-
-        if full:
-            # Update the whole table
-            # This is the most accurate option but requires a full table rewrite
-            # so we can't do it too often as it could lead to locking issues.
-            entries = self.entries
-
-        else:
-            # Only update entries where title_norm is 1.0
-            # This is the default value set on new entries.
-            # It's possible that other entries could have this exact value but there shouldn't be too many of those
-            entries = self.entries.filter(title_norm=1.0)
-
-        entries.annotate(title_length=Length("title")).filter(
-            title_length__gt=0
-        ).update(title_norm=lavg / F("title_length"))
+        self.title_norms = TitleNorms(self.entries, self.write_connection.alias)
 
     def delete_stale_model_entries(self, model):
         existing_pks = model._default_manager.annotate(
@@ -206,7 +82,14 @@ class MySQLIndex(BaseIndex):
         stale_entries = self.entries.filter(
             content_type_id__in=content_types_pks
         ).exclude(object_id__in=existing_pks)
-        stale_entries.delete()
+
+        # Deleted a chunk at a time, so that each DELETE only locks a bounded number of rows
+        while object_ids := list(
+            stale_entries.values_list("object_id", flat=True)[
+                : self.stale_entries_chunk_size
+            ]
+        ):
+            self.delete_items(model, object_ids)
 
     def delete_stale_entries(self):
         for model in get_indexed_models():
@@ -228,46 +111,49 @@ class MySQLIndex(BaseIndex):
 
         content_type_pk = get_content_type_pk(model)
 
-        ids_and_data = {}
-        for indexer in indexers:
-            ids_and_data[indexer.id] = (
-                indexer.title,
-                indexer.autocomplete,
-                indexer.body,
+        # Keyed by object ID so that each object is only written once
+        indexers = get_changed_indexers(self, content_type_pk, indexers)
+        if not indexers:
+            return
+
+        entries = {
+            object_id: IndexEntry(
+                content_type_id=content_type_pk,
+                object_id=object_id,
+                title=indexer.title,
+                autocomplete=indexer.autocomplete,
+                body=indexer.body,
+                fingerprint=indexer.fingerprint,
             )
+            for object_id, indexer in indexers.items()
+        }
 
-        index_entries_for_ct = self.entries.filter(content_type_id=content_type_pk)
-        indexed_ids = frozenset(
-            index_entries_for_ct.filter(object_id__in=ids_and_data.keys()).values_list(
-                "object_id", flat=True
+        with self.title_norms.write(
+            self.entries.filter(
+                content_type_id=content_type_pk, object_id__in=list(entries.keys())
             )
-        )
-        for indexed_id in indexed_ids:
-            title, autocomplete, body = ids_and_data[indexed_id]
-            index_entries_for_ct.filter(object_id=indexed_id).update(
-                title=title, autocomplete=autocomplete, body=body
+        ):
+            # Insert new entries and update existing ones with multi-row
+            # INSERT ... ON DUPLICATE KEY UPDATE statements, which conflict on the
+            # (content_type, object_id) unique key. The number of rows in each statement
+            # is capped so that large chunks stay under max_allowed_packet.
+            self.entries.bulk_create(
+                entries.values(),
+                batch_size=self.backend.insert_batch_size,
+                update_conflicts=True,
+                update_fields=["title", "autocomplete", "body", "fingerprint"],
             )
 
-        to_be_created = []
-        for object_id in ids_and_data.keys():
-            if object_id not in indexed_ids:
-                title, autocomplete, body = ids_and_data[object_id]
-                to_be_created.append(
-                    IndexEntry(
-                        content_type_id=content_type_pk,
-                        object_id=object_id,
-                        title=title,
-                        autocomplete=autocomplete,
-                        body=body,
-                    )
-                )
-
-        self.entries.bulk_create(to_be_created)
-
-        self._refresh_title_norms()
-
     def delete_item(self, item):
-        item.index_entries.all()._raw_delete(using=self.write_connection.alias)
+        self.delete_items(item._meta.model, [item.pk])
+
+    def delete_items(self, model, pks):
+        entries = self.entries.filter(
+            content_type_id__in=get_descendants_content_types_pks(model),
+            object_id__in=[force_str(pk) for pk in pks],
+        )
+        self.title_norms.remove(entries)
+        entries._raw_delete(using=self.write_connection.alias)
 
     def reset(self):
         for connection in [
@@ -276,6 +162,7 @@ class MySQLIndex(BaseIndex):
             if connection.vendor == "mysql"
         ]:
             IndexEntry._default_manager.all()._raw_delete(using=connection.alias)
+            TitleNorms(IndexEntry._default_manager.all(), connection.alias).reset()
 
 
 class MySQLSearchQueryCompiler(BaseSearchQueryCompiler):
@@ -534,34 +421,21 @@ class MySQLSearchResults(BaseSearchResults):
 
     supports_facet = True
 
-    def facet(self, field_name):
-        # Get field
-        field = self.query_compiler._get_filterable_field(field_name)
-        if field is None:
-            raise FilterFieldError(
-                'Cannot facet search results with field "'
-                + field_name
-                + "\". Please add index.FilterField('"
-                + field_name
-                + "') to "
-                + self.query_compiler.queryset.model.__name__
-                + ".search_fields.",
-                field_name=field_name,
-            )
+    def facets(self, field_names):
+        for field_name in field_names:
+            self._check_facet_field(field_name)
 
         query = self.query_compiler.search(
             self.query_compiler.get_config(self.backend), None, None
         )
-        results = (
-            query.values(field_name).annotate(count=Count("pk")).order_by("-count")
-        )
 
-        return OrderedDict(
-            [(result[field_name], result["count"]) for result in results]
-        )
+        return get_facets(query, field_names)
 
 
 class MySQLSearchRebuilder:
+    # Objects can be indexed by several processes at once, see rebuild_modelsearch_index
+    supports_workers = True
+
     def __init__(self, index):
         self.index = index
 
@@ -569,11 +443,21 @@ class MySQLSearchRebuilder:
         self.index.delete_stale_entries()
         return self.index
 
+    def resume(self, target_index_name):
+        """
+        Continues a rebuild that was interrupted, returning the index to add the remaining
+        objects into. Returns None if the rebuild can't be resumed and must start again.
+        """
+        return self.index
+
     def finish(self):
-        self.index._refresh_title_norms(full=True)
+        self.index.title_norms.refresh()
 
 
 class MySQLSearchAtomicRebuilder(MySQLSearchRebuilder):
+    # Everything is written in a single transaction, which other processes can't join
+    supports_workers = False
+
     def __init__(self, index):
         super().__init__(index)
         self.transaction = transaction.atomic(using=index.write_connection.alias)
@@ -584,8 +468,12 @@ class MySQLSearchAtomicRebuilder(MySQLSearchRebuilder):
         self.transaction_opened = True
         return super().start()
 
+    def resume(self, target_index_name):
+        # The transaction of the interrupted rebuild was rolled back, so nothing was kept
+        return None
+
     def finish(self):
-        self.index._refresh_title_norms(full=True)
+        self.index.title_norms.refresh()
 
         self.transaction.__exit__(None, None, None)
         self.transaction_opened = False
@@ -612,6 +500,9 @@ class MySQLSearchBackend(BaseSearchBackend):
         self.config = None
         self.autocomplete_config = None
 
+        # The maximum number of entries to write in each INSERT statement
+        self.insert_batch_size = params.get("INSERT_BATCH_SIZE", 500)
+
         if params.get("ATOMIC_REBUILD", True):
             self.rebuilder_class = self.atomic_rebuilder_class
 
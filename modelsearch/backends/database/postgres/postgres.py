@@ -1,6 +1,7 @@
+import csv
+import io
 import warnings
 
-from collections import OrderedDict
 from functools import reduce
 
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
@@ -10,16 +11,21 @@ from django.db import (
     router,
     transaction,
 )
-from django.db.models import Avg, Count, F, Manager, TextField, Value
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.models import F, TextField, Value
 from django.db.models.constants import LOOKUP_SEP
-from django.db.models.functions import Cast, Length
+from django.db.models.functions import Cast
 from django.db.models.sql.subqueries import InsertQuery
 from django.utils.encoding import force_str
-from django.utils.functional import cached_property
 
 from modelsearch.conf import get_app_config
 
-from ....index import AutocompleteField, RelatedFields, SearchField, get_indexed_models
+from ....index import (
+    AutocompleteField,
+    RelatedFields,
+    SearchField,
+    get_indexed_models,
+)
 from ....query import And, Boost, MatchAll, Not, Or, Phrase, PlainText
 from ....utils import (
     ADD,
@@ -32,8 +38,10 @@ from ...base import (
     BaseSearchBackend,
     BaseSearchQueryCompiler,
     BaseSearchResults,
-    FilterFieldError,
 )
+from ..facets import get_facets
+from ..indexer import BaseObjectIndexer, get_changed_indexers
+from ..title_norms import TitleNorms
 from .query import Lexeme
 from .weights import get_sql_weights, get_weight
 
@@ -41,59 +49,28 @@ from .weights import get_sql_weights, get_weight
 IndexEntry = get_app_config().get_model("IndexEntry", require_ready=False)
 EMPTY_VECTOR = SearchVector(Value("", output_field=TextField()))
 
+# Rebuilds load each object into the first table and each of its texts into the second, and
+# convert the texts into search vectors in the database.
+STAGING_TABLE = "modelsearch_indexentry_staging"
+STAGING_TEXT_TABLE = "modelsearch_indexentry_staging_text"
+STAGING_FIELDS = ["title", "autocomplete", "body"]
+
+# Concatenates search vectors with ||, in the same way as ObjectIndexer.as_vector(). This is
+# created as a temporary aggregate by each rebuild, as PostgreSQL doesn't have one built in.
+TSVECTOR_AGGREGATE = "pg_temp.modelsearch_tsvector_agg"
 
-class ObjectIndexer:
-    """
-    Responsible for extracting data from an object to be inserted into the index.
-    """
 
+class ObjectIndexer(BaseObjectIndexer):
     def __init__(self, obj, backend):
-        self.obj = obj
-        self.search_fields = obj.get_search_fields()
-        self.config = backend.config
+        super().__init__(obj, backend)
         self.autocomplete_config = backend.autocomplete_config
 
-    def prepare_value(self, value):
-        if isinstance(value, str):
-            return value
-
-        elif isinstance(value, list):
-            return ", ".join(self.prepare_value(item) for item in value)
-
-        elif isinstance(value, dict):
-            return ", ".join(self.prepare_value(item) for item in value.values())
-
-        return force_str(value)
-
-    def prepare_field(self, obj, field):
-        if isinstance(field, SearchField):
-            yield (
-                field,
-                get_weight(field.boost),
-                self.prepare_value(field.get_value(obj)),
-            )
-
-        elif isinstance(field, AutocompleteField):
+    def get_weight(self, field):
+        if isinstance(field, AutocompleteField):
             # AutocompleteField does not define a boost parameter, so use a base weight of 'D'
-            yield (field, "D", self.prepare_value(field.get_value(obj)))
-
-        elif isinstance(field, RelatedFields):
-            sub_obj = field.get_value(obj)
-            if sub_obj is None:
-                return
-
-            if isinstance(sub_obj, Manager):
-                sub_objs = sub_obj.all()
+            return "D"
 
-            else:
-                if callable(sub_obj):
-                    sub_obj = sub_obj()
-
-                sub_objs = [sub_obj]
-
-            for sub_obj in sub_objs:
-                for sub_field in field.fields:
-                    yield from self.prepare_field(sub_obj, sub_field)
+        return get_weight(field.boost)
 
     def as_vector(self, texts, for_autocomplete=False):
         """
@@ -118,60 +95,44 @@ class ObjectIndexer:
             ]
         )
 
-    @cached_property
-    def id(self):
-        """
-        Returns the value to use as the ID of the record in the index
-        """
-        return force_str(self.obj.pk)
+    def join_texts(self, texts, for_autocomplete=False):
+        return self.as_vector(texts, for_autocomplete=for_autocomplete)
 
-    @cached_property
-    def title(self):
-        """
-        Returns all values to index as "title". This is the value of all SearchFields that have the field_name 'title'
-        """
-        texts = []
-        for field in self.search_fields:
-            for current_field, boost, value in self.prepare_field(self.obj, field):
-                if (
-                    isinstance(current_field, SearchField)
-                    and current_field.field_name == "title"
-                ):
-                    texts.append((value, boost))
-
-        return self.as_vector(texts)
-
-    @cached_property
-    def body(self):
+    def get_fingerprint_content(self):
+        return {
+            **super().get_fingerprint_content(),
+            "autocomplete_config": self.autocomplete_config,
+        }
+
+    def get_staging_row(self, content_type_pk):
         """
-        Returns all values to index as "body". This is the value of all SearchFields excluding the title
+        Returns the row to load into the staging table for this object.
         """
-        texts = []
-        for field in self.search_fields:
-            for current_field, boost, value in self.prepare_field(self.obj, field):
-                if (
-                    isinstance(current_field, SearchField)
-                    and not current_field.field_name == "title"
-                ):
-                    texts.append((value, boost))
-
-        return self.as_vector(texts)
-
-    @cached_property
-    def autocomplete(self):
+        return [content_type_pk, self.id, self.fingerprint]
+
+    def get_staging_text_rows(self):
         """
-        Returns all values to index as "autocomplete". This is the value of all AutocompleteFields
+        Returns the rows to load into the text staging table for this object, one for each
+        non-empty text of each field, numbered in the order that as_vector() joins them.
         """
-        texts = []
-        for field in self.search_fields:
-            for current_field, boost, value in self.prepare_field(self.obj, field):
-                if isinstance(current_field, AutocompleteField):
-                    texts.append((value, boost))
+        title, body, autocomplete = self.texts
+        rows = []
 
-        return self.as_vector(texts, for_autocomplete=True)
+        for field_name, texts in zip(
+            STAGING_FIELDS, [title, autocomplete, body], strict=True
+        ):
+            for text, weight in texts:
+                text = text.strip()
+                if text:
+                    rows.append([self.id, field_name, len(rows), weight, text])
+
+        return rows
 
 
 class PostgresIndex(BaseIndex):
+    # The number of stale entries to delete per query when rebuilding
+    stale_entries_chunk_size = 1000
+
     def __init__(self, backend):
         super().__init__(backend)
 
@@ -187,37 +148,10 @@ class PostgresIndex(BaseIndex):
             )
 
         self.entries = IndexEntry._default_manager.all()
+        self.title_norms = TitleNorms(self.entries, self.write_connection.alias)
 
-    def _refresh_title_norms(self, full=False):
-        """
-        Refreshes the value of the title_norm field.
-
-        This needs to be set to 'lavg/ld' where:
-         - lavg is the average length of titles in all documents (also in terms)
-         - ld is the length of the title field in this document (in terms)
-        """
-
-        lavg = (
-            self.entries.annotate(title_length=Length("title"))
-            .filter(title_length__gt=0)
-            .aggregate(Avg("title_length"))["title_length__avg"]
-        )
-
-        if full:
-            # Update the whole table
-            # This is the most accurate option but requires a full table rewrite
-            # so we can't do it too often as it could lead to locking issues.
-            entries = self.entries
-
-        else:
-            # Only update entries where title_norm is 1.0
-            # This is the default value set on new entries.
-            # It's possible that other entries could have this exact value but there shouldn't be too many of those
-            entries = self.entries.filter(title_norm=1.0)
-
-        entries.annotate(title_length=Length("title")).filter(
-            title_length__gt=0
-        ).update(title_norm=lavg / F("title_length"))
+        # Set by the rebuilders to load entries with COPY, see bulk_load_items
+        self.bulk_load = False
 
     def delete_stale_model_entries(self, model):
         existing_pks = model._default_manager.annotate(
@@ -227,7 +161,14 @@ class PostgresIndex(BaseIndex):
         stale_entries = self.entries.filter(
             content_type_id__in=content_types_pks
         ).exclude(object_id__in=existing_pks)
-        stale_entries.delete()
+
+        # Deleted a chunk at a time, so that each DELETE only locks a bounded number of rows
+        while object_ids := list(
+            stale_entries.values_list("object_id", flat=True)[
+                : self.stale_entries_chunk_size
+            ]
+        ):
+            self.delete_items(model, object_ids)
 
     def delete_stale_entries(self):
         for model in get_indexed_models():
@@ -248,6 +189,14 @@ class PostgresIndex(BaseIndex):
             return
 
         content_type_pk = get_content_type_pk(model)
+        indexers = list(get_changed_indexers(self, content_type_pk, indexers).values())
+        if not indexers:
+            return
+
+        if self.bulk_load:
+            self.bulk_load_items(content_type_pk, indexers)
+            return
+
         compiler = InsertQuery(IndexEntry).get_compiler(
             connection=self.write_connection
         )
@@ -257,7 +206,7 @@ class PostgresIndex(BaseIndex):
         data_params = []
 
         for indexer in indexers:
-            data_params.extend((content_type_pk, indexer.id))
+            data_params.extend((content_type_pk, indexer.id, indexer.fingerprint))
 
             # Compile title value
             value = compiler.prepare_value(
@@ -285,29 +234,159 @@ class PostgresIndex(BaseIndex):
 
         data_sql = ", ".join(
             [
-                f"(%s, %s, {a}, {b}, {c}, 1.0)"
+                f"(%s, %s, %s, {a}, {b}, {c}, 1.0)"
                 for a, b, c in zip(title_sql, autocomplete_sql, body_sql, strict=True)
             ]
         )
 
-        with self.write_connection.cursor() as cursor:
-            cursor.execute(
-                f"""
-                INSERT INTO {IndexEntry._meta.db_table} (content_type_id, object_id, title, autocomplete, body, title_norm)
-                (VALUES {data_sql})
-                ON CONFLICT (content_type_id, object_id)
-                DO UPDATE SET title = EXCLUDED.title,
-                              title_norm = 1.0,
-                              autocomplete = EXCLUDED.autocomplete,
-                              body = EXCLUDED.body
-                """,
-                data_params,
-            )
+        written_entries = self.entries.filter(
+            content_type_id=content_type_pk,
+            object_id__in=[indexer.id for indexer in indexers],
+        )
+        with self.title_norms.write(written_entries):
+            with self.write_connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {IndexEntry._meta.db_table} (content_type_id, object_id, fingerprint, title, autocomplete, body, title_norm)
+                    (VALUES {data_sql})
+                    ON CONFLICT (content_type_id, object_id)
+                    DO UPDATE SET title = EXCLUDED.title,
+                                  title_norm = 1.0,
+                                  autocomplete = EXCLUDED.autocomplete,
+                                  body = EXCLUDED.body,
+                                  fingerprint = EXCLUDED.fingerprint
+                    """,
+                    data_params,
+                )
+
+    def get_staging_vector_sql(self, field_name):
+        """
+        Returns the SQL that converts the texts of the given field in the text staging table
+        into a single weighted search vector, concatenating them in order with ||.
+        """
+        if field_name == "autocomplete":
+            search_config = self.backend.autocomplete_config
+        else:
+            search_config = self.backend.config
+
+        config_sql = "%s::regconfig, " if search_config else ""
+        sql = (
+            f"COALESCE({TSVECTOR_AGGREGATE}("
+            f"setweight(to_tsvector({config_sql}staging_text.text), staging_text.weight) "
+            "ORDER BY staging_text.position"
+            ") FILTER (WHERE staging_text.field_name = %s), ''::tsvector)"
+        )
+        params = [search_config] if search_config else []
+        return sql, [*params, field_name]
+
+    def copy_staging_rows(self, cursor, table, columns, rows):
+        copy_sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+
+        if is_psycopg3:
+            with cursor.copy(copy_sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+        else:
+            data = io.StringIO()
+            csv.writer(data).writerows(rows)
+            data.seek(0)
+            cursor.copy_expert(f"{copy_sql} WITH (FORMAT csv)", data)
+
+    def bulk_load_items(self, content_type_pk, indexers):
+        """
+        Adds or updates the entries of the given objects through staging tables.
+
+        Rather than compiling a search vector expression for every text of every object,
+        the raw texts are streamed into a staging table with COPY and converted into
+        search vectors by a single INSERT ... SELECT. Each text is converted on its own and
+        the vectors are concatenated in order, so the entries are the same as the ones
+        written by add_items. The staging tables are temporary so they aren't written to
+        the WAL, and are dropped when the transaction commits.
+        """
+        rows = [indexer.get_staging_row(content_type_pk) for indexer in indexers]
+        text_rows = [
+            row for indexer in indexers for row in indexer.get_staging_text_rows()
+        ]
+
+        select_sql = []
+        select_params = []
+        for field_name in STAGING_FIELDS:
+            sql, params = self.get_staging_vector_sql(field_name)
+            select_sql.append(sql)
+            select_params.extend(params)
+
+        title_sql, autocomplete_sql, body_sql = select_sql
+        written_entries = self.entries.filter(
+            content_type_id=content_type_pk,
+            object_id__in=[indexer.id for indexer in indexers],
+        )
+
+        with transaction.atomic(using=self.write_connection.alias):
+            with self.write_connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    CREATE OR REPLACE AGGREGATE {TSVECTOR_AGGREGATE} (tsvector)
+                    (SFUNC = tsvector_concat, STYPE = tsvector, INITCOND = '')
+                    """
+                )
+                cursor.execute(
+                    f"""
+                    CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE}
+                    (content_type_id integer NOT NULL, object_id text NOT NULL, fingerprint text NOT NULL)
+                    ON COMMIT DROP
+                    """
+                )
+                cursor.execute(
+                    f"""
+                    CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TEXT_TABLE}
+                    (object_id text NOT NULL, field_name text NOT NULL, position integer NOT NULL, weight "char" NOT NULL, text text NOT NULL)
+                    ON COMMIT DROP
+                    """
+                )
+                cursor.execute(f"TRUNCATE {STAGING_TABLE}, {STAGING_TEXT_TABLE}")
+                self.copy_staging_rows(
+                    cursor,
+                    STAGING_TABLE,
+                    ["content_type_id", "object_id", "fingerprint"],
+                    rows,
+                )
+                self.copy_staging_rows(
+                    cursor,
+                    STAGING_TEXT_TABLE,
+                    ["object_id", "field_name", "position", "weight", "text"],
+                    text_rows,
+                )
 
-        self._refresh_title_norms()
+            with self.title_norms.write(written_entries):
+                with self.write_connection.cursor() as cursor:
+                    cursor.execute(
+                        f"""
+                        INSERT INTO {IndexEntry._meta.db_table} (content_type_id, object_id, fingerprint, title, autocomplete, body, title_norm)
+                        SELECT staging.content_type_id, staging.object_id, staging.fingerprint, {title_sql}, {autocomplete_sql}, {body_sql}, 1.0
+                        FROM {STAGING_TABLE} staging
+                        LEFT JOIN {STAGING_TEXT_TABLE} staging_text ON staging_text.object_id = staging.object_id
+                        GROUP BY staging.content_type_id, staging.object_id, staging.fingerprint
+                        ON CONFLICT (content_type_id, object_id)
+                        DO UPDATE SET title = EXCLUDED.title,
+                                      title_norm = 1.0,
+                                      autocomplete = EXCLUDED.autocomplete,
+                                      body = EXCLUDED.body,
+                                      fingerprint = EXCLUDED.fingerprint
+                        """,  # noqa: S608
+                        select_params,
+                    )
 
     def delete_item(self, item):
-        item.index_entries.all()._raw_delete(using=self.write_connection.alias)
+        self.delete_items(item._meta.model, [item.pk])
+
+    def delete_items(self, model, pks):
+        entries = self.entries.filter(
+            content_type_id__in=get_descendants_content_types_pks(model),
+            object_id__in=[force_str(pk) for pk in pks],
+        )
+        self.title_norms.remove(entries)
+        entries._raw_delete(using=self.write_connection.alias)
 
     def reset(self):
         for connection in [
@@ -316,6 +395,7 @@ class PostgresIndex(BaseIndex):
             if connection.vendor == "postgresql"
         ]:
             IndexEntry._default_manager.all()._raw_delete(using=connection.alias)
+            TitleNorms(IndexEntry._default_manager.all(), connection.alias).reset()
 
 
 class PostgresSearchQueryCompiler(BaseSearchQueryCompiler):
@@ -607,46 +687,46 @@ class PostgresSearchResults(BaseSearchResults):
 
     supports_facet = True
 
-    def facet(self, field_name):
-        # Get field
-        field = self.query_compiler._get_filterable_field(field_name)
-        if field is None:
-            raise FilterFieldError(
-                'Cannot facet search results with field "'
-                + field_name
-                + "\". Please add index.FilterField('"
-                + field_name
-                + "') to "
-                + self.query_compiler.queryset.model.__name__
-                + ".search_fields.",
-                field_name=field_name,
-            )
+    def facets(self, field_names):
+        for field_name in field_names:
+            self._check_facet_field(field_name)
 
         query = self.query_compiler.search(
             self.query_compiler.get_config(self.backend), None, None
         )
-        results = (
-            query.values(field_name).annotate(count=Count("pk")).order_by("-count")
-        )
 
-        return OrderedDict(
-            [(result[field_name], result["count"]) for result in results]
-        )
+        return get_facets(query, field_names, grouping_sets=True)
 
 
 class PostgresSearchRebuilder:
+    # Objects can be indexed by several processes at once, see rebuild_modelsearch_index
+    supports_workers = True
+
     def __init__(self, index):
         self.index = index
 
     def start(self):
         self.index.delete_stale_entries()
+        self.index.bulk_load = self.index.backend.bulk_load_rebuild
+        return self.index
+
+    def resume(self, target_index_name):
+        """
+        Continues a rebuild that was interrupted, returning the index to add the remaining
+        objects into. Returns None if the rebuild can't be resumed and must start again.
+        """
+        self.index.bulk_load = self.index.backend.bulk_load_rebuild
         return self.index
 
     def finish(self):
-        self.index._refresh_title_norms(full=True)
+        self.index.bulk_load = False
+        self.index.title_norms.refresh()
 
 
 class PostgresSearchAtomicRebuilder(PostgresSearchRebuilder):
+    # Everything is written in a single transaction, which other processes can't join
+    supports_workers = False
+
     def __init__(self, index):
         super().__init__(index)
         self.transaction = transaction.atomic(using=index.write_connection.alias)
@@ -657,8 +737,13 @@ class PostgresSearchAtomicRebuilder(PostgresSearchRebuilder):
         self.transaction_opened = True
         return super().start()
 
+    def resume(self, target_index_name):
+        # The transaction of the interrupted rebuild was rolled back, so nothing was kept
+        return None
+
     def finish(self):
-        self.index._refresh_title_norms(full=True)
+        self.index.bulk_load = False
+        self.index.title_norms.refresh()
 
         self.transaction.__exit__(None, None, None)
         self.transaction_opened = False
@@ -687,8 +772,16 @@ class PostgresSearchBackend(BaseSearchBackend):
         # https://www.postgresql.org/docs/9.1/datatype-textsearch.html#DATATYPE-TSQUERY
         self.autocomplete_config = params.get("AUTOCOMPLETE_SEARCH_CONFIG", "simple")
 
+        # Load entries through COPY and a staging table when rebuilding the index
+        self.bulk_load_rebuild = params.get("BULK_LOAD_REBUILD", True)
+
         if params.get("ATOMIC_REBUILD", True):
             self.rebuilder_class = self.atomic_rebuilder_class
 
+    def get_index_by_key(self, key, rebuilding=False):
+        index = super().get_index_by_key(key, rebuilding=rebuilding)
+        index.bulk_load = rebuilding and self.bulk_load_rebuild
+        return index
+
 
 SearchBackend = PostgresSearchBackend
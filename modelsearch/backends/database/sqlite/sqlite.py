@@ -1,4 +1,3 @@
-from collections import OrderedDict
 from functools import reduce
 
 from django.db import (
@@ -7,15 +6,19 @@ from django.db import (
     router,
     transaction,
 )
-from django.db.models import Avg, Count, F, Manager, TextField
+from django.db.models import F, TextField
 from django.db.models.constants import LOOKUP_SEP
-from django.db.models.functions import Cast, Length
+from django.db.models.functions import Cast
 from django.utils.encoding import force_str
-from django.utils.functional import cached_property
 
 from modelsearch.conf import get_app_config
 
-from ....index import AutocompleteField, RelatedFields, SearchField, get_indexed_models
+from ....index import (
+    AutocompleteField,
+    RelatedFields,
+    SearchField,
+    get_indexed_models,
+)
 from ....query import And, MatchAll, Not, Or, Phrase, PlainText
 from ....utils import (
     ADD,
@@ -28,8 +31,10 @@ from ...base import (
     BaseSearchBackend,
     BaseSearchQueryCompiler,
     BaseSearchResults,
-    FilterFieldError,
 )
+from ..facets import get_facets
+from ..indexer import BaseObjectIndexer, get_changed_indexers
+from ..title_norms import TitleNorms
 from .query import (
     BM25,
     AndNot,
@@ -45,107 +50,14 @@ IndexEntry = app_config.get_model("IndexEntry", require_ready=False)
 SQLiteFTSIndexEntry = app_config.get_model("SQLiteFTSIndexEntry", require_ready=False)
 
 
-class ObjectIndexer:
-    """
-    Responsible for extracting data from an object to be inserted into the index.
-    """
-
-    def __init__(self, obj, backend):
-        self.obj = obj
-        self.search_fields = obj.get_search_fields()
-        self.config = backend.config
-
-    def prepare_value(self, value):
-        if isinstance(value, str):
-            return value
-
-        elif isinstance(value, list):
-            return ", ".join(self.prepare_value(item) for item in value)
-
-        elif isinstance(value, dict):
-            return ", ".join(self.prepare_value(item) for item in value.values())
-
-        return force_str(value)
-
-    def prepare_field(self, obj, field):
-        if isinstance(field, SearchField):
-            yield (field, self.prepare_value(field.get_value(obj)))
-
-        elif isinstance(field, AutocompleteField):
-            yield (field, self.prepare_value(field.get_value(obj)))
-
-        elif isinstance(field, RelatedFields):
-            sub_obj = field.get_value(obj)
-            if sub_obj is None:
-                return
-
-            if isinstance(sub_obj, Manager):
-                sub_objs = sub_obj.all()
-
-            else:
-                if callable(sub_obj):
-                    sub_obj = sub_obj()
-
-                sub_objs = [sub_obj]
-
-            for sub_obj in sub_objs:
-                for sub_field in field.fields:
-                    yield from self.prepare_field(sub_obj, sub_field)
-
-    @cached_property
-    def id(self):
-        """
-        Returns the value to use as the ID of the record in the index
-        """
-        return force_str(self.obj.pk)
-
-    @cached_property
-    def title(self):
-        """
-        Returns all values to index as "title". This is the value of all SearchFields that have the field_name 'title'
-        """
-        texts = []
-        for field in self.search_fields:
-            for current_field, value in self.prepare_field(self.obj, field):
-                if (
-                    isinstance(current_field, SearchField)
-                    and current_field.field_name == "title"
-                ):
-                    texts.append(value)
-
-        return " ".join(texts)
-
-    @cached_property
-    def body(self):
-        """
-        Returns all values to index as "body". This is the value of all SearchFields excluding the title
-        """
-        texts = []
-        for field in self.search_fields:
-            for current_field, value in self.prepare_field(self.obj, field):
-                if (
-                    isinstance(current_field, SearchField)
-                    and not current_field.field_name == "title"
-                ):
-                    texts.append(value)
-
-        return " ".join(texts)
-
-    @cached_property
-    def autocomplete(self):
-        """
-        Returns all values to index as "autocomplete". This is the value of all AutocompleteFields
-        """
-        texts = []
-        for field in self.search_fields:
-            for current_field, value in self.prepare_field(self.obj, field):
-                if isinstance(current_field, AutocompleteField):
-                    texts.append(value)
-
-        return " ".join(texts)
+class ObjectIndexer(BaseObjectIndexer):
+    pass
 
 
 class SQLiteIndex(BaseIndex):
+    # The number of stale entries to delete per query when rebuilding
+    stale_entries_chunk_size = 1000
+
     def __init__(self, backend):
         super().__init__(backend)
 
@@ -161,37 +73,7 @@ class SQLiteIndex(BaseIndex):
             )
 
         self.entries = IndexEntry._default_manager.all()
-
-    def _refresh_title_norms(self, full=False):
-        """
-        Refreshes the value of the title_norm field.
-
-        This needs to be set to 'lavg/ld' where:
-         - lavg is the average length of titles in all documents (also in terms)
-         - ld is the length of the title field in this document (in terms)
-        """
-
-        lavg = (
-            self.entries.annotate(title_length=Length("title"))
-            .filter(title_length__gt=0)
-            .aggregate(Avg("title_length"))["title_length__avg"]
-        )
-
-        if full:
-            # Update the whole table
-            # This is the most accurate option but requires a full table rewrite
-            # so we can't do it too often as it could lead to locking issues.
-            entries = self.entries
-
-        else:
-            # Only update entries where title_norm is 1.0
-            # This is the default value set on new entries.
-            # It's possible that other entries could have this exact value but there shouldn't be too many of those
-            entries = self.entries.filter(title_norm=1.0)
-
-        entries.annotate(title_length=Length("title")).filter(
-            title_length__gt=0
-        ).update(title_norm=lavg / F("title_length"))
+        self.title_norms = TitleNorms(self.entries, self.write_connection.alias)
 
     def delete_stale_model_entries(self, model):
         existing_pks = model._default_manager.annotate(
@@ -201,7 +83,14 @@ class SQLiteIndex(BaseIndex):
         stale_entries = self.entries.filter(
             content_type_id__in=content_types_pks
         ).exclude(object_id__in=existing_pks)
-        stale_entries.delete()
+
+        # Deleted a chunk at a time, so that each DELETE only locks a bounded number of rows
+        while object_ids := list(
+            stale_entries.values_list("object_id", flat=True)[
+                : self.stale_entries_chunk_size
+            ]
+        ):
+            self.delete_items(model, object_ids)
 
     def delete_stale_entries(self):
         for model in get_indexed_models():
@@ -223,46 +112,78 @@ class SQLiteIndex(BaseIndex):
 
         content_type_pk = get_content_type_pk(model)
 
-        ids_and_data = {}
-        for indexer in indexers:
-            ids_and_data[indexer.id] = (
-                indexer.title,
-                indexer.autocomplete,
-                indexer.body,
+        # Keyed by object ID so that each object is only written once
+        indexers = get_changed_indexers(self, content_type_pk, indexers)
+        if not indexers:
+            return
+
+        entries = {
+            object_id: IndexEntry(
+                content_type_id=content_type_pk,
+                object_id=object_id,
+                title=indexer.title,
+                autocomplete=indexer.autocomplete,
+                body=indexer.body,
+                fingerprint=indexer.fingerprint,
             )
+            for object_id, indexer in indexers.items()
+        }
 
+        with self.title_norms.write(
+            self.entries.filter(
+                content_type_id=content_type_pk, object_id__in=list(entries.keys())
+            )
+        ):
+            if self.write_connection.features.supports_update_conflicts_with_target:
+                # Insert new entries and update existing ones in a single statement
+                # (INSERT ... ON CONFLICT DO UPDATE, requires SQLite 3.24)
+                self.entries.bulk_create(
+                    entries.values(),
+                    update_conflicts=True,
+                    unique_fields=["content_type", "object_id"],
+                    update_fields=["title", "autocomplete", "body", "fingerprint"],
+                )
+            else:
+                self.update_or_create_entries(content_type_pk, entries)
+
+    def update_or_create_entries(self, content_type_pk, entries):
+        """
+        Updates the entries that already exist one at a time, then inserts the rest. Used on
+        versions of SQLite that don't support upserts.
+        """
         index_entries_for_ct = self.entries.filter(content_type_id=content_type_pk)
         indexed_ids = frozenset(
-            index_entries_for_ct.filter(object_id__in=ids_and_data.keys()).values_list(
+            index_entries_for_ct.filter(object_id__in=entries.keys()).values_list(
                 "object_id", flat=True
             )
         )
         for indexed_id in indexed_ids:
-            title, autocomplete, body = ids_and_data[indexed_id]
+            entry = entries[indexed_id]
             index_entries_for_ct.filter(object_id=indexed_id).update(
-                title=title, autocomplete=autocomplete, body=body
+                title=entry.title,
+                autocomplete=entry.autocomplete,
+                body=entry.body,
+                fingerprint=entry.fingerprint,
             )
 
-        to_be_created = []
-        for object_id in ids_and_data.keys():
-            if object_id not in indexed_ids:
-                title, autocomplete, body = ids_and_data[object_id]
-                to_be_created.append(
-                    IndexEntry(
-                        content_type_id=content_type_pk,
-                        object_id=object_id,
-                        title=title,
-                        autocomplete=autocomplete,
-                        body=body,
-                    )
-                )
-
-        self.entries.bulk_create(to_be_created)
-
-        self._refresh_title_norms()
+        self.entries.bulk_create(
+            [
+                entry
+                for object_id, entry in entries.items()
+                if object_id not in indexed_ids
+            ]
+        )
 
     def delete_item(self, item):
-        item.index_entries.all()._raw_delete(using=self.write_connection.alias)
+        self.delete_items(item._meta.model, [item.pk])
+
+    def delete_items(self, model, pks):
+        entries = self.entries.filter(
+            content_type_id__in=get_descendants_content_types_pks(model),
+            object_id__in=[force_str(pk) for pk in pks],
+        )
+        self.title_norms.remove(entries)
+        entries._raw_delete(using=self.write_connection.alias)
 
     def reset(self):
         for connection in [
@@ -271,9 +192,13 @@ class SQLiteIndex(BaseIndex):
             if connection.vendor == "sqlite"
         ]:
             IndexEntry._default_manager.all()._raw_delete(using=connection.alias)
+            TitleNorms(IndexEntry._default_manager.all(), connection.alias).reset()
 
 
 class SQLiteSearchRebuilder:
+    # Objects can be indexed by several processes at once, see rebuild_modelsearch_index
+    supports_workers = True
+
     def __init__(self, index):
         self.index = index
 
@@ -281,11 +206,21 @@ class SQLiteSearchRebuilder:
         self.index.delete_stale_entries()
         return self.index
 
+    def resume(self, target_index_name):
+        """
+        Continues a rebuild that was interrupted, returning the index to add the remaining
+        objects into. Returns None if the rebuild can't be resumed and must start again.
+        """
+        return self.index
+
     def finish(self):
-        self.index._refresh_title_norms(full=True)
+        self.index.title_norms.refresh()
 
 
 class SQLiteSearchAtomicRebuilder(SQLiteSearchRebuilder):
+    # Everything is written in a single transaction, which other processes can't join
+    supports_workers = False
+
     def __init__(self, index):
         super().__init__(index)
         self.transaction = transaction.atomic(using=index.write_connection.alias)
@@ -296,8 +231,12 @@ class SQLiteSearchAtomicRebuilder(SQLiteSearchRebuilder):
         self.transaction_opened = True
         return super().start()
 
+    def resume(self, target_index_name):
+        # The transaction of the interrupted rebuild was rolled back, so nothing was kept
+        return None
+
     def finish(self):
-        self.index._refresh_title_norms(full=True)
+        self.index.title_norms.refresh()
 
         self.transaction.__exit__(None, None, None)
         self.transaction_opened = False
@@ -593,31 +532,15 @@ class SQLiteSearchResults(BaseSearchResults):
 
     supports_facet = True
 
-    def facet(self, field_name):
-        # Get field
-        field = self.query_compiler._get_filterable_field(field_name)
-        if field is None:
-            raise FilterFieldError(
-                'Cannot facet search results with field "'
-                + field_name
-                + "\". Please add index.FilterField('"
-                + field_name
-                + "') to "
-                + self.query_compiler.queryset.model.__name__
-                + ".search_fields.",
-                field_name=field_name,
-            )
+    def facets(self, field_names):
+        for field_name in field_names:
+            self._check_facet_field(field_name)
 
         query = self.query_compiler.search(
             self.query_compiler.get_config(self.backend), None, None
         )
-        results = (
-            query.values(field_name).annotate(count=Count("pk")).order_by("-count")
-        )
 
-        return OrderedDict(
-            [(result[field_name], result["count"]) for result in results]
-        )
+        return get_facets(query, field_names)
 
 
 class SQLiteSearchBackend(BaseSearchBackend):
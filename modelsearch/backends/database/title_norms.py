@@ -0,0 +1,156 @@
+from contextlib import contextmanager
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Length
+
+from modelsearch.conf import get_app_config
+
+
+IndexEntryStatistics = get_app_config().get_model(
+    "IndexEntryStatistics", require_ready=False
+)
+
+
+class TitleNorms:
+    """
+    Maintains the title_norm field of index entries.
+
+    This needs to be set to 'lavg/ld' where:
+     - lavg is the average length of titles in all documents (also in terms)
+     - ld is the length of the title field in this document (in terms)
+
+    Rather than aggregating lavg over the whole table on every write, the sum and count of
+    title lengths are kept in IndexEntryStatistics. Indexes call ``write`` and ``remove`` with
+    the entries they are about to write or delete, which only measures those entries.
+    """
+
+    # The number of entries to update per query when refreshing the whole table
+    refresh_chunk_size = 5000
+
+    def __init__(self, entries, using):
+        self.entries = entries.using(using)
+        self.using = using
+
+    def measure(self, entries):
+        """
+        Returns the sum of the lengths of the non-empty titles of the given entries, and
+        how many of them there are.
+        """
+        result = (
+            entries.using(self.using)
+            .annotate(title_length=Length("title"))
+            .filter(title_length__gt=0)
+            .aggregate(title_length_sum=Sum("title_length"), title_count=Count("pk"))
+        )
+        return result["title_length_sum"] or 0, result["title_count"]
+
+    def get_statistics(self):
+        manager = IndexEntryStatistics._default_manager.using(self.using)
+        statistics = manager.filter(pk=IndexEntryStatistics.SINGLETON_PK).first()
+        if statistics is None:
+            # Start from the entries that were indexed before the statistics were tracked.
+            # The row always has the same primary key, so if another process creates it
+            # first, get_or_create() returns that row rather than adding a second one.
+            title_length_sum, title_count = self.measure(self.entries)
+            statistics, _ = manager.get_or_create(
+                pk=IndexEntryStatistics.SINGLETON_PK,
+                defaults={
+                    "title_length_sum": title_length_sum,
+                    "title_count": title_count,
+                },
+            )
+
+        return statistics
+
+    def add(self, title_length_sum, title_count):
+        """
+        Adds the given title lengths onto the statistics. Pass negative numbers to remove.
+        """
+        if not title_length_sum and not title_count:
+            return
+
+        IndexEntryStatistics._default_manager.using(self.using).filter(
+            pk=self.get_statistics().pk
+        ).update(
+            title_length_sum=F("title_length_sum") + title_length_sum,
+            title_count=F("title_count") + title_count,
+        )
+
+    def remove(self, entries):
+        """
+        Removes the given entries from the statistics. Call this before deleting them.
+        """
+        title_length_sum, title_count = self.measure(entries)
+        self.add(-title_length_sum, -title_count)
+
+    def get_average_title_length(self):
+        statistics = self.get_statistics()
+        if statistics.title_count:
+            return statistics.title_length_sum / statistics.title_count
+
+    def update_norms(self, entries, average_title_length=None):
+        """
+        Sets the title_norm of the given entries from the current average title length.
+        """
+        if average_title_length is None:
+            average_title_length = self.get_average_title_length()
+
+        if average_title_length is None:
+            return
+
+        entries.using(self.using).annotate(title_length=Length("title")).filter(
+            title_length__gt=0
+        ).update(title_norm=average_title_length / F("title_length"))
+
+    @contextmanager
+    def write(self, entries):
+        """
+        Wraps the adding or updating of the given entries, keeping the statistics up to date
+        and setting the title_norm of the written entries.
+        """
+        old_title_length_sum, old_title_count = self.measure(entries)
+
+        yield
+
+        new_title_length_sum, new_title_count = self.measure(entries)
+        self.add(
+            new_title_length_sum - old_title_length_sum,
+            new_title_count - old_title_count,
+        )
+        self.update_norms(entries)
+
+    def reset(self):
+        IndexEntryStatistics._default_manager.using(self.using).all().delete()
+
+    def refresh(self):
+        """
+        Recalculates the statistics from scratch, then updates the title_norm of every entry,
+        a chunk of entries at a time.
+
+        This is the most accurate option but rewrites the whole table, so it is only done
+        when rebuilding the index.
+        """
+        title_length_sum, title_count = self.measure(self.entries)
+        IndexEntryStatistics._default_manager.using(self.using).filter(
+            pk=self.get_statistics().pk
+        ).update(title_length_sum=title_length_sum, title_count=title_count)
+
+        if not title_count:
+            return
+
+        average_title_length = title_length_sum / title_count
+        last_pk = None
+        while True:
+            chunk = self.entries.order_by("pk")
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+
+            pks = list(chunk.values_list("pk", flat=True)[: self.refresh_chunk_size])
+            if not pks:
+                break
+
+            self.update_norms(
+                self.entries.filter(pk__gte=pks[0], pk__lte=pks[-1]),
+                average_title_length,
+            )
+            last_pk = pks[-1]
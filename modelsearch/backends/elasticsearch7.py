@@ -1,6 +1,6 @@
 from elasticsearch import VERSION as ELASTICSEARCH_VERSION
 from elasticsearch import Elasticsearch, NotFoundError
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import BulkIndexError, bulk, streaming_bulk
 
 from modelsearch.backends.elasticsearchbase import (
     ElasticsearchBaseAutocompleteQueryCompiler,
@@ -41,11 +41,15 @@ class Elasticsearch7SearchBackend(ElasticsearchBaseSearchBackend):
     autocomplete_query_compiler_class = Elasticsearch7AutocompleteQueryCompiler
     results_class = Elasticsearch7SearchResults
     NotFoundError = NotFoundError
+    BulkIndexError = BulkIndexError
     client_class = Elasticsearch
     use_new_elasticsearch_api = ELASTICSEARCH_VERSION >= (7, 15)
 
     def bulk(self, *args, **kwargs):
         return bulk(*args, **kwargs)
 
+    def streaming_bulk(self, *args, **kwargs):
+        return streaming_bulk(*args, **kwargs)
+
 
 SearchBackend = Elasticsearch7SearchBackend
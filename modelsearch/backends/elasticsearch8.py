@@ -9,7 +9,6 @@ from modelsearch.backends.elasticsearch7 import (
     Elasticsearch7SearchQueryCompiler,
     Elasticsearch7SearchResults,
 )
-from modelsearch.index import class_is_indexed
 
 
 class Elasticsearch8Mapping(Elasticsearch7Mapping):
@@ -31,25 +30,16 @@ class Elasticsearch8Index(Elasticsearch7Index):
 
     def add_model(self, model):
         # Get mapping
-        mapping = self.mapping_class(model)
+        mapping = self.mapping_class.for_model(model)
 
         # Put mapping
         self.es.indices.put_mapping(index=self.name, **mapping.get_mapping())
 
-    def add_item(self, item):
-        # Make sure the object can be indexed
-        if not class_is_indexed(item.__class__):
-            return
+    def index_document(self, document_id, document):
+        self.es.index(index=self.name, document=document, id=document_id)
 
-        # Get mapping
-        mapping = self.mapping_class(item.__class__)
-
-        # Add document to index
-        self.es.index(
-            index=self.name,
-            document=mapping.get_document(item),
-            id=mapping.get_document_id(item),
-        )
+    def get_documents(self, docs):
+        return self.es.mget(index=self.name, docs=docs)
 
 
 class Elasticsearch8SearchQueryCompiler(Elasticsearch7SearchQueryCompiler):
@@ -62,6 +52,9 @@ class Elasticsearch8SearchResults(Elasticsearch7SearchResults):
         # keys of the body dict are now kwargs in their own right
         return self.backend.es.search(**body, **kwargs)
 
+    def _close_point_in_time(self, pit_id):
+        self.backend.es.close_point_in_time(id=pit_id)
+
 
 class Elasticsearch8AutocompleteQueryCompiler(Elasticsearch7AutocompleteQueryCompiler):
     mapping_class = Elasticsearch8Mapping
@@ -75,6 +68,9 @@ class Elasticsearch8SearchBackend(Elasticsearch7SearchBackend):
     results_class = Elasticsearch8SearchResults
     timeout_kwarg_name = "request_timeout"
 
+    def msearch(self, searches):
+        return self.es.msearch(searches=searches)["responses"]
+
     def _get_host_config_from_url(self, url):
         """Given a parsed URL, return the host configuration to be added to self.hosts"""
         use_ssl = url.scheme == "https"
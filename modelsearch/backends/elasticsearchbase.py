@@ -1,21 +1,25 @@
+import hashlib
+import itertools
 import json
 
 from collections import OrderedDict
 from copy import deepcopy
 from urllib.parse import urlparse
 
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from django.db import DEFAULT_DB_ALIAS, models
 from django.db.models import Subquery
 from django.db.models.sql import Query
 from django.db.models.sql.constants import MULTI, SINGLE
 from django.utils.crypto import get_random_string
+from django.utils.functional import cached_property
 
 from modelsearch.backends.base import (
     BaseIndex,
     BaseSearchBackend,
     BaseSearchQueryCompiler,
     BaseSearchResults,
-    FilterFieldError,
+    SearchFieldError,
     get_model_root,
 )
 from modelsearch.index import (
@@ -26,6 +30,7 @@ from modelsearch.index import (
     SearchField,
     class_is_indexed,
     get_indexed_models,
+    get_search_plan,
 )
 from modelsearch.query import And, Boost, Fuzzy, MatchAll, Not, Or, Phrase, PlainText
 from modelsearch.utils import deep_update
@@ -47,6 +52,7 @@ class Field:
 class ElasticsearchBaseMapping:
     all_field_name = "_all_text"
     edgengrams_field_name = "_edgengrams"
+    fingerprint_field_name = "_fingerprint"
 
     type_map = {
         "AutoField": "integer",
@@ -86,24 +92,54 @@ class ElasticsearchBaseMapping:
 
     def __init__(self, model):
         self.model = model
+        self.search_plan = get_search_plan(model)
+        self._column_names = {}
+        self._nested_document_fields = {}
+
+    @classmethod
+    def for_model(cls, model):
+        """
+        Returns the mapping of the given model. This is shared between calls, so that its
+        column names, content types and mapping are only worked out once per model.
+        """
+        # The mapping is kept on the search plan, so it's replaced along with the plan when
+        # the model's search fields change
+        search_plan = get_search_plan(model)
+        try:
+            return search_plan.mappings[cls]
+        except KeyError:
+            mapping = search_plan.mappings[cls] = cls(model)
+            return mapping
 
     def get_parent(self):
         for base in self.model.__bases__:
             if issubclass(base, Indexed) and issubclass(base, models.Model):
-                return type(self)(base)
+                return type(self).for_model(base)
+
+    @cached_property
+    def root_model(self):
+        return get_model_root(self.model)
 
     def get_document_type(self):
         return "doc"
 
     def get_field_column_name(self, field):
+        key = self.search_plan.get_field_plan_key(field)
+        try:
+            return self._column_names[key]
+        except KeyError:
+            column_name = self._column_names[key] = self._get_field_column_name(field)
+            return column_name
+
+    def _get_field_column_name(self, field):
         # Fields in derived models get prefixed with their model name, fields
         # in the root model don't get prefixed at all
         # This is to prevent mapping clashes in cases where two page types have
         # a field with the same name but a different type.
-        root_model = get_model_root(self.model)
-        definition_model = field.get_definition_model(self.model)
+        field_plan = self.search_plan.get_field_plan(field)
+        definition_model = field_plan.definition_model
 
-        if definition_model != root_model:
+        if definition_model != self.root_model:
             prefix = (
                 definition_model._meta.app_label.lower()
                 + "_"
@@ -114,11 +150,11 @@ class ElasticsearchBaseMapping:
             prefix = ""
 
         if isinstance(field, FilterField):
-            return prefix + field.get_attname(self.model) + "_filter"
+            return prefix + field_plan.attname + "_filter"
         elif isinstance(field, AutocompleteField):
-            return prefix + field.get_attname(self.model) + "_edgengrams"
+            return prefix + field_plan.attname + "_edgengrams"
         elif isinstance(field, SearchField):
-            return prefix + field.get_attname(self.model)
+            return prefix + field_plan.attname
         elif isinstance(field, RelatedFields):
             return prefix + field.field_name
 
@@ -145,6 +181,10 @@ class ElasticsearchBaseMapping:
         For example: ["myapp.MyPageModel", "wagtailcore.Page"]
                      ["myapp.MyModel"]
         """
+        return list(self.all_content_types)
+
+    @cached_property
+    def all_content_types(self):
         # Add our content type
         content_types = [self.get_content_type()]
 
@@ -159,8 +199,8 @@ class ElasticsearchBaseMapping:
     def get_field_mapping(self, field):
         if isinstance(field, RelatedFields):
             mapping = {"type": "nested", "properties": {}}
-            nested_model = field.get_field(self.model).related_model
-            nested_mapping = type(self)(nested_model)
+            nested_model = self.search_plan.get_field_plan(field).related_model
+            nested_mapping = type(self).for_model(nested_model)
 
             for sub_field in field.fields:
                 sub_field_name, sub_field_mapping = nested_mapping.get_field_mapping(
@@ -170,7 +210,8 @@ class ElasticsearchBaseMapping:
 
             return self.get_field_column_name(field), mapping
         else:
-            mapping = {"type": self.type_map.get(field.get_type(self.model), "string")}
+            field_type = self.search_plan.get_field_plan(field).type
+            mapping = {"type": self.type_map.get(field_type, "string")}
 
             if isinstance(field, SearchField):
                 if mapping["type"] == "string":
@@ -196,15 +237,21 @@ class ElasticsearchBaseMapping:
             return self.get_field_column_name(field), mapping
 
     def get_mapping(self):
+        # Copied, as callers may change it
+        return deepcopy(self.mapping)
+
+    @cached_property
+    def mapping(self):
         # Make field list
         fields = {
             "pk": {"type": self.keyword_type, "store": True},
             "_django_content_type": {"type": self.keyword_type},
+            self.fingerprint_field_name: {"type": self.keyword_type, "index": False},
             self.edgengrams_field_name: {"type": self.text_type},
         }
         fields[self.edgengrams_field_name].update(self.edgengram_analyzer_config)
 
-        for field in self.model.get_search_fields():
+        for field in self.search_plan.search_fields:
             key, val = self.get_field_mapping(field)
             fields[key] = val
 
@@ -245,18 +292,55 @@ class ElasticsearchBaseMapping:
     def get_document_id(self, obj):
         return str(obj.pk)
 
-    def _get_nested_document(self, fields, obj):
+    @cached_property
+    def document_fields(self):
+        """
+        The column name, search field and value getter of each field in this model's
+        documents, so building a document doesn't need to look any of them up
+        """
+        return [
+            (
+                self.get_field_column_name(field_plan.search_field),
+                field_plan.search_field,
+                field_plan.get_value,
+            )
+            for field_plan in self.search_plan
+        ]
+
+    def get_nested_document_fields(self, related_fields):
+        """
+        Returns the column name, value getter and whether it's an autocomplete field, for
+        each sub-field of the given RelatedFields in the documents of this model.
+        """
+        key = self.search_plan.get_field_plan_key(related_fields)
+        try:
+            return self._nested_document_fields[key]
+        except KeyError:
+            document_fields = self._nested_document_fields[key] = [
+                (
+                    self.get_field_column_name(field),
+                    self.search_plan.get_field_plan(field).get_value,
+                    isinstance(field, AutocompleteField),
+                )
+                for field in related_fields.fields
+            ]
+            return document_fields
+
+    def _get_nested_document(self, related_fields, obj):
         doc = {}
         edgengrams = []
-        model = type(obj)
-        mapping = type(self)(model)
+        mapping = type(self).for_model(type(obj))
 
-        for field in fields:
-            value = field.get_value(obj)
-            doc[mapping.get_field_column_name(field)] = value
+        for (
+            column_name,
+            get_value,
+            is_autocomplete,
+        ) in mapping.get_nested_document_fields(related_fields):
+            value = get_value(obj)
+            doc[column_name] = value
 
             # Check if this field should be added into _edgengrams
-            if isinstance(field, AutocompleteField):
+            if is_autocomplete:
                 edgengrams.append(value)
 
         return doc, edgengrams
@@ -265,8 +349,8 @@ class ElasticsearchBaseMapping:
         # Build document
         doc = {"pk": str(obj.pk), "_django_content_type": self.get_all_content_types()}
         edgengrams = []
-        for field in self.model.get_search_fields():
-            value = field.get_value(obj)
+        for column_name, field, get_value in self.document_fields:
+            value = get_value(obj)
 
             if isinstance(field, RelatedFields):
                 if isinstance(value, (models.Manager, models.QuerySet)):
@@ -274,16 +358,14 @@ class ElasticsearchBaseMapping:
 
                     for nested_obj in value.all():
                         nested_doc, extra_edgengrams = self._get_nested_document(
-                            field.fields, nested_obj
+                            field, nested_obj
                         )
                         nested_docs.append(nested_doc)
                         edgengrams.extend(extra_edgengrams)
 
                     value = nested_docs
                 elif isinstance(value, models.Model):
-                    value, extra_edgengrams = self._get_nested_document(
-                        field.fields, value
-                    )
+                    value, extra_edgengrams = self._get_nested_document(field, value)
                     edgengrams.extend(extra_edgengrams)
             elif isinstance(field, FilterField):
                 if isinstance(value, (models.Manager, models.QuerySet)):
@@ -296,7 +378,7 @@ class ElasticsearchBaseMapping:
                         for item in value
                     ]
 
-            doc[self.get_field_column_name(field)] = value
+            doc[column_name] = value
 
             # Check if this field should be added into _edgengrams
             if isinstance(field, AutocompleteField):
@@ -307,6 +389,14 @@ class ElasticsearchBaseMapping:
 
         return doc
 
+    def get_document_fingerprint(self, document):
+        """
+        Returns a hash of the given document. This is stored in the document so that
+        indexing the same content again can be skipped.
+        """
+        content = json.dumps(document, sort_keys=True, default=str)
+        return hashlib.sha1(content.encode(), usedforsecurity=False).hexdigest()
+
     def __repr__(self):
         return f"<ElasticsearchMapping: {self.model.__name__}>"
 
@@ -368,63 +458,158 @@ class ElasticsearchBaseIndex(BaseIndex):
 
     def add_model(self, model):
         # Get mapping
-        mapping = self.mapping_class(model)
+        mapping = self.mapping_class.for_model(model)
 
         # Put mapping
         self.es.indices.put_mapping(index=self.name, body=mapping.get_mapping())
 
+    def index_document(self, document_id, document):
+        if self.backend.use_new_elasticsearch_api:
+            self.es.index(index=self.name, document=document, id=document_id)
+        else:
+            self.es.index(self.name, document, id=document_id)
+
+    def get_documents(self, docs):
+        return self.es.mget(body={"docs": docs}, index=self.name)
+
+    def get_fingerprints(self, mapping, document_ids):
+        """
+        Returns the fingerprints of the documents with the given IDs that are in the index,
+        keyed by document ID.
+        """
+        docs = [
+            {"_id": document_id, "_source": [mapping.fingerprint_field_name]}
+            for document_id in document_ids
+        ]
+
+        try:
+            response = self.get_documents(docs)
+        except self.backend.NotFoundError:
+            return {}
+
+        return {
+            doc["_id"]: doc["_source"].get(mapping.fingerprint_field_name)
+            for doc in response["docs"]
+            if doc.get("found")
+        }
+
+    def get_changed_documents(self, mapping, items):
+        """
+        Returns the documents of the given objects keyed by document ID, leaving out the
+        documents that are already in the index with the same content.
+        """
+        documents = {}
+        for item in items:
+            document = mapping.get_document(item)
+            document[mapping.fingerprint_field_name] = mapping.get_document_fingerprint(
+                document
+            )
+            documents[mapping.get_document_id(item)] = document
+
+        if self.skip_unchanged and documents:
+            fingerprints = self.get_fingerprints(mapping, list(documents.keys()))
+            unchanged = [
+                document_id
+                for document_id, document in documents.items()
+                if fingerprints.get(document_id)
+                == document[mapping.fingerprint_field_name]
+            ]
+            for document_id in unchanged:
+                del documents[document_id]
+
+            self.backend.add_skipped_writes(len(unchanged))
+
+        return documents
+
     def add_item(self, item):
         # Make sure the object can be indexed
         if not class_is_indexed(item.__class__):
             return
 
         # Get mapping
-        mapping = self.mapping_class(item.__class__)
+        mapping = self.mapping_class.for_model(item.__class__)
 
         # Add document to index
-        if self.backend.use_new_elasticsearch_api:
-            self.es.index(
-                index=self.name,
-                document=mapping.get_document(item),
-                id=mapping.get_document_id(item),
-            )
-        else:
-            self.es.index(
-                self.name, mapping.get_document(item), id=mapping.get_document_id(item)
-            )
+        for document_id, document in self.get_changed_documents(
+            mapping, [item]
+        ).items():
+            self.index_document(document_id, document)
 
-    def add_items(self, model, items):
+    def get_actions(self, mapping, items):
+        """
+        Yields the bulk actions to index the given objects, which may be any iterable
+        (including a generator). Objects are taken a chunk at a time so that the
+        documents that haven't changed can be left out with one request per chunk.
+        """
+        items = iter(items)
+        while True:
+            chunk = list(itertools.islice(items, self.backend.bulk_chunk_size))
+            if not chunk:
+                break
+
+            for document_id, document in self.get_changed_documents(
+                mapping, chunk
+            ).items():
+                yield {"_id": document_id, **document}
+
+    def stream_items(self, model, items):
+        """
+        Adds the given objects into the index without building a list of all of their
+        documents first. ``items`` may be any iterable of objects, including a generator.
+
+        Documents are sent in requests of at most ``BULK_CHUNK_SIZE`` documents and
+        ``BULK_MAX_BYTES`` bytes. This is a generator that yields a (document ID, error)
+        pair for each document once it has been sent, where error is None if the document
+        was indexed. A document that fails doesn't stop the others from being sent.
+        """
+        for ok, result in self._streaming_bulk(model, items):
+            ((op_type, info),) = result.items()
+            yield info.get("_id"), None if ok else info.get("error", info)
+
+    def _streaming_bulk(self, model, items):
         if not class_is_indexed(model):
             return
 
-        # Get mapping
-        mapping = self.mapping_class(model)
+        mapping = self.mapping_class.for_model(model)
 
-        # Create list of actions
-        actions = []
-        for item in items:
-            # Create the action
-            action = {"_id": mapping.get_document_id(item)}
-            action.update(mapping.get_document(item))
-            actions.append(action)
+        yield from self.backend.streaming_bulk(
+            self.es,
+            self.get_actions(mapping, items),
+            index=self.name,
+            chunk_size=self.backend.bulk_chunk_size,
+            max_chunk_bytes=self.backend.bulk_max_bytes,
+            raise_on_error=False,
+        )
 
-        # Run the actions
-        if actions:
-            self.backend.bulk(self.es, actions, index=self.name)
+    def add_items(self, model, items):
+        # Unlike the bulk() helper, every document is sent before the client's
+        # BulkIndexError is raised, with the errors of all the documents that failed
+        errors = [result for ok, result in self._streaming_bulk(model, items) if not ok]
+
+        if errors:
+            raise self.backend.BulkIndexError(
+                f"{len(errors)} document(s) failed to index.", errors
+            )
 
     def delete_item(self, item):
-        # Make sure the object can be indexed
-        if not class_is_indexed(item.__class__):
+        self.delete_items(item._meta.model, [item.pk])
+
+    def delete_items(self, model, pks):
+        if not class_is_indexed(model):
             return
 
         # Get mapping
-        mapping = self.mapping_class(item.__class__)
+        mapping = self.mapping_class.for_model(model)
 
-        # Delete document
-        try:
-            self.es.delete(index=self.name, id=mapping.get_document_id(item))
-        except self.backend.NotFoundError:
-            pass  # Document doesn't exist, ignore this exception
+        # Create list of actions
+        actions = [
+            {"_op_type": "delete", "_id": mapping.get_document_id(model(pk=pk))}
+            for pk in pks
+        ]
+
+        # Run the actions, ignoring documents that don't exist
+        if actions:
+            self.backend.bulk(self.es, actions, index=self.name, ignore_status=(404,))
 
     def reset(self):
         # Delete old index
@@ -446,7 +631,7 @@ class ElasticsearchBaseSearchQueryCompiler(BaseSearchQueryCompiler):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.mapping = self.mapping_class(self.queryset.model)
+        self.mapping = self.mapping_class.for_model(self.queryset.model)
         self.remapped_fields = self._remap_fields(self.fields)
 
     def _remap_fields(self, fields):
@@ -743,7 +928,9 @@ class ElasticsearchBaseSearchQueryCompiler(BaseSearchQueryCompiler):
     def get_content_type_filter(self):
         # Query content_type using a "match" query. See comment in
         # ElasticsearchBaseMapping.get_document for more details
-        content_type = self.mapping_class(self.queryset.model).get_content_type()
+        content_type = self.mapping_class.for_model(
+            self.queryset.model
+        ).get_content_type()
 
         return {"match": {"_django_content_type": content_type}}
 
@@ -809,50 +996,60 @@ class ElasticsearchBaseSearchQueryCompiler(BaseSearchQueryCompiler):
 class ElasticsearchBaseSearchResults(BaseSearchResults):
     fields_param_name = "stored_fields"
     supports_facet = True
+    supports_values = True
 
-    def facet(self, field_name):
-        # Get field
-        field = self.query_compiler._get_filterable_field(field_name)
-        if field is None:
-            raise FilterFieldError(
-                'Cannot facet search results with field "'
-                + field_name
-                + "\". Please add index.FilterField('"
-                + field_name
-                + "') to "
-                + self.query_compiler.queryset.model.__name__
-                + ".search_fields.",
-                field_name=field_name,
-            )
-
+    def facets(self, field_names):
         # Build body
         body = self._get_es_body()
-        column_name = self.query_compiler.mapping.get_field_column_name(field)
+        body["aggregations"] = {}
+
+        for field_name in field_names:
+            field = self._check_facet_field(field_name)
+            column_name = self.query_compiler.mapping.get_field_column_name(field)
 
-        body["aggregations"] = {
-            field_name: {
+            body["aggregations"][field_name] = {
                 "terms": {
                     "field": column_name,
                     "missing": 0,
                 }
             }
-        }
 
-        # Send to Elasticsearch
-        response = self._backend_do_search(
-            body,
-            index=self.backend.get_index_for_model(
-                self.query_compiler.queryset.model
-            ).name,
-            size=0,
-        )
+        if (
+            self._results_cache is None
+            and self.stop is not None
+            and self.stop - self.start <= self.backend.page_size
+        ):
+            # Fetch this page of results and their count in the same request
+            body["track_total_hits"] = self._get_track_total_hits()
+            response = self._backend_do_search(
+                body,
+                from_=self.start,
+                size=self.stop - self.start,
+                **self._get_search_params(),
+            )
+            self._set_page_response(response)
+        else:
+            # Send to Elasticsearch
+            response = self._backend_do_search(
+                body,
+                index=self.backend.get_index_for_model(
+                    self.query_compiler.queryset.model
+                ).name,
+                size=0,
+            )
 
-        return OrderedDict(
-            [
-                (bucket["key"] if bucket["key"] != 0 else None, bucket["doc_count"])
-                for bucket in response["aggregations"][field_name]["buckets"]
-            ]
-        )
+        return {
+            field_name: OrderedDict(
+                [
+                    (
+                        bucket["key"] if bucket["key"] != 0 else None,
+                        bucket["doc_count"],
+                    )
+                    for bucket in response["aggregations"][field_name]["buckets"]
+                ]
+            )
+            for field_name in field_names
+        }
 
     def _get_es_body(self, for_count=False):
         body = {"query": self.query_compiler.get_query()}
@@ -865,10 +1062,103 @@ class ElasticsearchBaseSearchResults(BaseSearchResults):
 
         return body
 
+    def _get_values_columns(self):
+        """
+        Returns a (name, column name, model field) tuple for each field requested with
+        values(). The model field is None for fields that aren't model fields.
+        """
+        model = self.query_compiler.queryset.model
+        field_names = self._values_fields or ["pk"] + [
+            field.get_attname(model)
+            for field in model.get_search_fields()
+            if not isinstance(field, RelatedFields)
+        ]
+
+        # Filter fields hold the value as it was indexed, the others may be analysed
+        search_fields = sorted(
+            (
+                field
+                for field in model.get_search_fields()
+                if not isinstance(field, RelatedFields)
+            ),
+            key=lambda field: not isinstance(field, FilterField),
+        )
+
+        columns = []
+        for field_name in dict.fromkeys(field_names):
+            if field_name == "pk":
+                continue
+
+            field = next(
+                (
+                    field
+                    for field in search_fields
+                    if field.get_attname(model) == field_name
+                ),
+                None,
+            )
+            if field is None:
+                raise SearchFieldError(
+                    'Cannot get "'
+                    + field_name
+                    + "\" from search results. Please add index.FilterField('"
+                    + field_name
+                    + "') to "
+                    + model.__name__
+                    + ".search_fields.",
+                    field_name=field_name,
+                )
+
+            try:
+                model_field = field.get_field(model)
+            except FieldDoesNotExist:
+                model_field = None
+
+            columns.append(
+                (
+                    field_name,
+                    self.query_compiler.mapping.get_field_column_name(field),
+                    model_field,
+                )
+            )
+
+        return columns
+
+    def _get_values_from_hits(self, hits):
+        """
+        Yields a dict of the fields requested with values() for each hit, straight from
+        the document in Elasticsearch
+        """
+        pk_field = self.query_compiler.queryset.model._meta.pk
+        columns = self._get_values_columns()
+        include_pk = not self._values_fields or "pk" in self._values_fields
+
+        for hit in hits:
+            row = {}
+            if include_pk:
+                row["pk"] = pk_field.to_python(hit["fields"]["pk"][0])
+
+            source = hit.get("_source", {})
+            for field_name, column_name, model_field in columns:
+                value = source.get(column_name)
+                if model_field is not None and value is not None:
+                    value = model_field.to_python(value)
+
+                row[field_name] = value
+
+            if self._score_field:
+                row[self._score_field] = hit["_score"]
+
+            yield row
+
     def _get_results_from_hits(self, hits):
         """
         Yields Django model instances from a page of hits returned by Elasticsearch
         """
+        if self._values_fields is not None:
+            yield from self._get_values_from_hits(hits)
+            return
+
         # Get pks from results
         pks = [hit["fields"]["pk"][0] for hit in hits]
         scores = {str(hit["fields"]["pk"][0]): hit["_score"] for hit in hits}
@@ -899,17 +1189,86 @@ class ElasticsearchBaseSearchResults(BaseSearchResults):
             # Send the search query to the backend.
             return self.backend.es.search(body=body, **kwargs)
 
-    def _do_search(self):
-        PAGE_SIZE = 100
+    def _open_point_in_time(self, index_name):
+        return self.backend.es.open_point_in_time(
+            index=index_name, keep_alive=self.backend.keep_alive
+        )["id"]
 
-        if self.stop is not None:
-            limit = self.stop - self.start
-        else:
-            limit = None
+    def _close_point_in_time(self, pit_id):
+        self.backend.es.close_point_in_time(body={"id": pit_id})
 
-        use_scroll = limit is None or limit > PAGE_SIZE
+    def _get_search_after_sort(self, sort):
+        # search_after needs a total order, so pk is added as a tiebreaker
+        sort = list(sort or ["_score"])
+        if not any("pk" in field for field in sort if isinstance(field, dict)):
+            sort.append({"pk": "asc"})
 
-        body = self._get_es_body()
+        return sort
+
+    def _do_search_after(self, body, params, limit):
+        """
+        Pages through the results with search_after, against a point in time so that
+        the results don't shift while they're being read
+        """
+        page_size = self.backend.page_size
+        index_name = params.pop("index")
+        body = dict(body, sort=self._get_search_after_sort(body.get("sort")))
+        skip = self.start
+        pit_id = self._open_point_in_time(index_name)
+
+        try:
+            while limit is None or limit > 0:
+                kwargs = {}
+                if limit is not None:
+                    size = min(limit, page_size)
+                else:
+                    size = page_size
+
+                if skip and "search_after" not in body:
+                    if skip + size <= self.backend.max_result_window:
+                        # The first request can jump straight to an offset within the
+                        # window that from/size are allowed to reach
+                        kwargs["from_"] = skip
+                        skip = 0
+
+                if skip:
+                    # Results before the offset are never loaded from the database, so
+                    # skip over them in as few requests as possible
+                    size = min(skip, self.backend.max_result_window)
+
+                body["pit"] = {"id": pit_id, "keep_alive": self.backend.keep_alive}
+                page = self._backend_do_search(body, size=size, **kwargs, **params)
+                pit_id = page.get("pit_id", pit_id)
+
+                # Only the first request needs to count the results
+                if body.pop("track_total_hits", None) is not None:
+                    self._set_total_hits(page)
+                hits = page["hits"]["hits"]
+
+                if len(hits) == 0:
+                    break
+
+                body["search_after"] = hits[-1]["sort"]
+
+                if skip:
+                    skip -= len(hits)
+                else:
+                    yield from self._get_results_from_hits(hits)
+
+                    if limit is not None:
+                        limit -= len(hits)
+
+                if len(hits) < size:
+                    break
+        finally:
+            # Also runs when the generator is closed or garbage collected before
+            # it's exhausted, so the point in time is never left open
+            try:
+                self._close_point_in_time(pit_id)
+            except self.backend.NotFoundError:
+                pass
+
+    def _get_search_params(self):
         params = {
             "index": self.backend.get_index_for_model(
                 self.query_compiler.queryset.model
@@ -918,10 +1277,67 @@ class ElasticsearchBaseSearchResults(BaseSearchResults):
             self.fields_param_name: "pk",
         }
 
+        if self._values_fields is not None:
+            params["_source"] = [
+                column_name for _, column_name, _ in self._get_values_columns()
+            ]
+
+        return params
+
+    def _get_page_request(self):
+        """
+        Returns the header and body of a request for these results in a multi search, or
+        None if they aren't limited to a single page (or have already been fetched)
+        """
+        if (
+            self._results_cache is not None
+            or self.stop is None
+            or self.stop - self.start > self.backend.page_size
+        ):
+            return None
+
+        params = self._get_search_params()
+        body = self._get_es_body()
+        body.update(
+            {
+                "from": self.start,
+                "size": self.stop - self.start,
+                "_source": params["_source"],
+                self.fields_param_name: [params[self.fields_param_name]],
+                "track_total_hits": self._get_track_total_hits(),
+            }
+        )
+
+        return {"index": params["index"]}, body
+
+    def _set_page_response(self, response):
+        self._set_total_hits(response)
+        self._results_cache = list(
+            self._get_results_from_hits(response["hits"]["hits"])
+        )
+
+    def _do_search(self):
+        PAGE_SIZE = self.backend.page_size
+
+        if self.stop is not None:
+            limit = self.stop - self.start
+        else:
+            limit = None
+
+        use_scroll = limit is None or limit > PAGE_SIZE
+
+        body = self._get_es_body()
+        params = self._get_search_params()
+
+        if use_scroll and self.backend.pagination == "search_after":
+            body["track_total_hits"] = self._get_track_total_hits()
+            yield from self._do_search_after(body, params, limit)
+            return
+
         if use_scroll:
             params.update(
                 {
-                    "scroll": "2m",
+                    "scroll": self.backend.keep_alive,
                     "size": PAGE_SIZE,
                 }
             )
@@ -931,6 +1347,7 @@ class ElasticsearchBaseSearchResults(BaseSearchResults):
 
             # Send to Elasticsearch
             page = self._backend_do_search(body, **params)
+            self._set_total_hits(page)
 
             while True:
                 hits = page["hits"]["hits"]
@@ -962,7 +1379,9 @@ class ElasticsearchBaseSearchResults(BaseSearchResults):
                 if "_scroll_id" not in page:
                     break
 
-                page = self.backend.es.scroll(scroll_id=page["_scroll_id"], scroll="2m")
+                page = self.backend.es.scroll(
+                    scroll_id=page["_scroll_id"], scroll=self.backend.keep_alive
+                )
 
             # Clear the scroll
             if "_scroll_id" in page:
@@ -975,13 +1394,41 @@ class ElasticsearchBaseSearchResults(BaseSearchResults):
                 }
             )
 
+            body["track_total_hits"] = self._get_track_total_hits()
+
             # Send to Elasticsearch
-            hits = self._backend_do_search(body, **params)["hits"]["hits"]
+            response = self._backend_do_search(body, **params)
+            self._set_total_hits(response)
+            hits = response["hits"]["hits"]
 
             # Get results
             for result in self._get_results_from_hits(hits):
                 yield result
 
+    def _get_track_total_hits(self):
+        if self._count_total_hits:
+            return True
+
+        return self.backend.track_total_hits
+
+    def _set_total_hits(self, response):
+        """
+        Fills in the count from the total number of hits in a search response, so that
+        counting the results doesn't need another request
+        """
+        total = response["hits"].get("total")
+
+        if isinstance(total, dict):
+            # If the total is capped by track_total_hits, it's only a lower bound
+            if total["relation"] != "eq":
+                return
+
+            total = total["value"]
+
+        if total is not None:
+            self._total_hits = total
+            self._count_cache = self._get_limited_count(total)
+
     def _do_count(self):
         # Get count
         hit_count = self.backend.es.count(
@@ -991,6 +1438,9 @@ class ElasticsearchBaseSearchResults(BaseSearchResults):
             body=self._get_es_body(for_count=True),
         )["count"]
 
+        return self._get_limited_count(hit_count)
+
+    def _get_limited_count(self, hit_count):
         # Add limits
         hit_count -= self.start
         if self.stop is not None:
@@ -1046,6 +1496,9 @@ class ElasticsearchBaseAutocompleteQueryCompiler(
 
 
 class ElasticsearchIndexRebuilder:
+    # Objects can be indexed by several processes at once, see rebuild_modelsearch_index
+    supports_workers = True
+
     def __init__(self, index):
         self.index = index
 
@@ -1056,6 +1509,16 @@ class ElasticsearchIndexRebuilder:
         # Reset the index
         self.reset_index()
 
+        # The index is empty, so there are no fingerprints to compare documents against
+        self.index.skip_unchanged = False
+        return self.index
+
+    def resume(self, target_index_name):
+        """
+        Continues a rebuild that was interrupted, returning the index to add the remaining
+        objects into. Returns None if the rebuild can't be resumed and must start again.
+        """
+        self.index.skip_unchanged = False
         return self.index
 
     def finish(self):
@@ -1086,6 +1549,17 @@ class ElasticsearchAtomicIndexRebuilder(ElasticsearchIndexRebuilder):
         # Create the new index
         self.index.put()
 
+        self.index.skip_unchanged = False
+        return self.index
+
+    def resume(self, target_index_name):
+        # Carry on filling the new index that the interrupted rebuild created
+        index = self.alias.backend.index_class(self.alias.backend, target_index_name)
+        if not index.exists():
+            return None
+
+        self.index = index
+        self.index.skip_unchanged = False
         return self.index
 
     def finish(self):
@@ -1132,6 +1606,9 @@ class ElasticsearchBaseSearchBackend(BaseSearchBackend):
     timeout_kwarg_name = "timeout"
     use_new_elasticsearch_api = False
 
+    # The most hits a single search can return, the default index.max_result_window
+    max_result_window = 10000
+
     settings = {
         "settings": {
             "analysis": {
@@ -1203,6 +1680,26 @@ class ElasticsearchBaseSearchBackend(BaseSearchBackend):
         self.index_prefix = params.pop("INDEX_PREFIX", "")
         self.timeout = params.pop("TIMEOUT", 10)
 
+        # How results are paged through when more than a page of them are requested,
+        # either "scroll" or "search_after" (with a point in time)
+        self.pagination = params.pop("PAGINATION", "scroll")
+        if self.pagination not in ("scroll", "search_after"):
+            raise ImproperlyConfigured(
+                f"Unknown PAGINATION {self.pagination!r}, expected 'scroll' or 'search_after'"
+            )
+
+        self.page_size = params.pop("PAGE_SIZE", 100)
+
+        # Counts results while searching, up to this many (beyond which count() makes a
+        # separate request). True counts them all, and False doesn't count them. The
+        # default is the same as Elasticsearch's, so that searches don't get slower
+        self.track_total_hits = params.pop("TRACK_TOTAL_HITS", 10000)
+        self.keep_alive = params.pop("KEEP_ALIVE", "2m")
+
+        # Limits on the size of each request to the bulk API
+        self.bulk_chunk_size = params.pop("BULK_CHUNK_SIZE", 500)
+        self.bulk_max_bytes = params.pop("BULK_MAX_BYTES", 10 * 1024 * 1024)
+
         if params.pop("ATOMIC_REBUILD", True):
             self.rebuilder_class = self.atomic_rebuilder_class
         else:
@@ -1247,5 +1744,42 @@ class ElasticsearchBaseSearchBackend(BaseSearchBackend):
 
         return self.index_class(self, index_name)
 
+    def get_index_by_key(self, key, rebuilding=False):
+        index = self.index_class(self, key)
+
+        # Every document is written when rebuilding, so don't look up their fingerprints
+        index.skip_unchanged = not rebuilding
+        return index
+
+    def msearch(self, searches):
+        return self.es.msearch(body=searches)["responses"]
+
+    def multi_search(self, results):
+        results = list(results)
+        searches = []
+        batched_results = []
+
+        for result in results:
+            if isinstance(result, ElasticsearchBaseSearchResults):
+                request = result._get_page_request()
+
+                if request is not None:
+                    searches.extend(request)
+                    batched_results.append(result)
+
+        if batched_results:
+            responses = self.msearch(searches)
+
+            for result, response in zip(batched_results, responses, strict=True):
+                # Searches that failed are run again below, which raises their error
+                if "error" not in response:
+                    result._set_page_response(response)
+
+        # Results that aren't limited to a page are fetched with their own searches
+        for result in results:
+            result.results()
+
+        return results
+
 
 SearchBackend = ElasticsearchBaseSearchBackend
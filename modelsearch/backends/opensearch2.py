@@ -1,5 +1,5 @@
 from opensearchpy import NotFoundError, OpenSearch
-from opensearchpy.helpers import bulk
+from opensearchpy.helpers import BulkIndexError, bulk, streaming_bulk
 
 from modelsearch.backends.elasticsearchbase import (
     ElasticsearchBaseAutocompleteQueryCompiler,
@@ -24,7 +24,13 @@ class OpenSearch2SearchQueryCompiler(ElasticsearchBaseSearchQueryCompiler):
 
 
 class OpenSearch2SearchResults(ElasticsearchBaseSearchResults):
-    pass
+    def _open_point_in_time(self, index_name):
+        return self.backend.es.create_pit(
+            index=index_name, keep_alive=self.backend.keep_alive
+        )["pit_id"]
+
+    def _close_point_in_time(self, pit_id):
+        self.backend.es.delete_pit(body={"pit_id": [pit_id]})
 
 
 class OpenSearch2AutocompleteQueryCompiler(ElasticsearchBaseAutocompleteQueryCompiler):
@@ -38,10 +44,14 @@ class OpenSearch2SearchBackend(ElasticsearchBaseSearchBackend):
     autocomplete_query_compiler_class = OpenSearch2AutocompleteQueryCompiler
     results_class = OpenSearch2SearchResults
     NotFoundError = NotFoundError
+    BulkIndexError = BulkIndexError
     client_class = OpenSearch
 
     def bulk(self, *args, **kwargs):
         return bulk(*args, **kwargs)
 
+    def streaming_bulk(self, *args, **kwargs):
+        return streaming_bulk(*args, **kwargs)
+
 
 SearchBackend = OpenSearch2SearchBackend
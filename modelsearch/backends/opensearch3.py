@@ -8,7 +8,6 @@ from modelsearch.backends.opensearch2 import (
     OpenSearch2SearchQueryCompiler,
     OpenSearch2SearchResults,
 )
-from modelsearch.index import class_is_indexed
 
 
 class OpenSearch3Mapping(OpenSearch2Mapping):
@@ -31,20 +30,8 @@ class OpenSearch3Index(OpenSearch2Index):
     def exists(self):
         return self.es.indices.exists(index=self.name)
 
-    def add_item(self, item):
-        # Make sure the object can be indexed
-        if not class_is_indexed(item.__class__):
-            return
-
-        # Get mapping
-        mapping = self.mapping_class(item.__class__)
-
-        # Add document to index
-        self.es.index(
-            index=self.name,
-            body=mapping.get_document(item),
-            id=mapping.get_document_id(item),
-        )
+    def index_document(self, document_id, document):
+        self.es.index(index=self.name, body=document, id=document_id)
 
 
 class OpenSearch3SearchQueryCompiler(OpenSearch2SearchQueryCompiler):
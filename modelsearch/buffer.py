@@ -0,0 +1,159 @@
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from modelsearch.backends.base import get_model_root
+from modelsearch.index import class_is_indexed
+from modelsearch.tasks import insert_or_update_objects_task, remove_objects_task
+
+
+INSERT_OR_UPDATE = "insert_or_update"
+DELETE = "delete"
+
+# The maximum number of objects to index or delete in a single task
+TASK_BATCH_SIZE = 500
+
+
+class IndexingBatch:
+    """
+    The index changes made within one transaction (or savepoint) that are yet to be written.
+
+    Each object is recorded once, keyed by its model and primary key, with the most recent
+    operation winning. So an object that is saved many times before the transaction commits
+    is only indexed once, and an object that is saved then deleted is only deleted.
+
+    Objects to index are handed to ``insert_or_update_objects_task`` with one task per
+    model, and objects to delete to ``remove_objects_task`` with one task per inheritance tree (both
+    split into chunks of ``TASK_BATCH_SIZE``).
+    """
+
+    def __init__(self, buffer, key):
+        self.buffer = buffer
+        self.key = key
+        self.operations = {}
+
+    def add(self, model, pk, operation):
+        # Re-insert so the dict stays in the order the objects were last changed in
+        self.operations.pop((model, pk), None)
+        self.operations[(model, pk)] = operation
+
+    def merge(self, other):
+        for (model, pk), operation in other.operations.items():
+            self.add(model, pk, operation)
+
+        other.operations = {}
+
+    def flush(self):
+        self.buffer.discard(self)
+
+        operations, self.operations = self.operations, {}
+
+        inserts = {}
+        deletes = {}
+        for (model, pk), operation in operations.items():
+            if operation == DELETE:
+                # Models that share an index are deleted together, through the model
+                # at the root of their inheritance tree. Deleting a child object also
+                # deletes its parents, so the same pk may be recorded more than once.
+                root_model = get_model_root(model)
+                if class_is_indexed(root_model):
+                    model = root_model
+
+                deletes.setdefault(model, {})[pk] = None
+            else:
+                inserts.setdefault(model, []).append(pk)
+
+        # Deletes go first. The insert task indexes whatever is in the database when it
+        # runs, so an object that was deleted then created again ends up indexed.
+        for model, pks in deletes.items():
+            enqueue_in_batches(remove_objects_task, model, list(pks))
+
+        for model, pks in inserts.items():
+            enqueue_in_batches(insert_or_update_objects_task, model, pks)
+
+
+def enqueue_in_batches(task, model, pks):
+    for start in range(0, len(pks), TASK_BATCH_SIZE):
+        task.enqueue(
+            model._meta.app_label,
+            model._meta.model_name,
+            [str(pk) for pk in pks[start : start + TASK_BATCH_SIZE]],
+        )
+
+
+class IndexingBuffer:
+    """
+    Collects the index changes made through a database connection and writes them in bulk
+    when the current transaction commits. Changes made in a transaction that is rolled back
+    are never written.
+
+    Outside of a transaction, changes are written immediately.
+    """
+
+    def __init__(self, using):
+        self.using = using
+        self.batches = {}
+
+    def add(self, model, pk, operation):
+        connection = connections[self.using]
+
+        if not connection.in_atomic_block:
+            batch = IndexingBatch(self, None)
+            batch.add(model, pk, operation)
+            batch.flush()
+            return
+
+        # Changes made inside a savepoint get a batch of their own, so that they can be
+        # discarded if the savepoint is rolled back. Atomic blocks that don't create a
+        # savepoint are recorded as None and can't be rolled back on their own.
+        key = frozenset(sid for sid in connection.savepoint_ids if sid is not None)
+
+        # A batch is only kept for as long as its on_commit callback is registered.
+        # Django drops the callbacks of a transaction or savepoint that is rolled back,
+        # and of a transaction whose earlier callbacks raised or whose connection was
+        # closed, so the batches left behind by those are discarded here.
+        registered = [
+            getattr(func, "__self__", None)
+            for sids, func, *rest in connection.run_on_commit
+        ]
+        for other in list(self.batches.values()):
+            if other not in registered:
+                self.discard(other)
+
+        batch = self.batches.get(key)
+        if batch is None:
+            batch = self.batches[key] = IndexingBatch(self, key)
+            transaction.on_commit(batch.flush, using=self.using)
+
+        # Batches of savepoints nested within the current one that are still here were
+        # released, as rolling back a savepoint drops their callbacks. Fold them into this
+        # batch so that their changes are written together and in order.
+        for other in list(self.batches.values()):
+            if other.key > key:
+                batch.merge(other)
+                self.discard(other)
+
+        batch.add(model, pk, operation)
+
+    def discard(self, batch):
+        if self.batches.get(batch.key) is batch:
+            del self.batches[batch.key]
+
+
+_local = threading.local()
+
+
+def get_indexing_buffer(using=None):
+    """
+    Returns the indexing buffer for the given database alias in the current thread.
+    """
+    using = using or DEFAULT_DB_ALIAS
+
+    buffers = getattr(_local, "buffers", None)
+    if buffers is None:
+        buffers = _local.buffers = {}
+
+    if using not in buffers:
+        buffers[using] = IndexingBuffer(using)
+
+    return buffers[using]
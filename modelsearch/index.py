@@ -1,11 +1,16 @@
+import functools
 import inspect
 import logging
+import operator
+import weakref
 
 from django.apps import apps
 from django.core import checks
 from django.core.exceptions import FieldDoesNotExist
 from django.db import models
 from django.db.models.fields.related import ForeignObjectRel, OneToOneRel, RelatedField
+from django.utils.functional import cached_property
+from django.utils.hashable import make_hashable
 
 from modelsearch.backends import get_search_backends_with_name
 
@@ -114,6 +119,8 @@ class Indexed:
     def check(cls, **kwargs):
         errors = super().check(**kwargs)
         errors.extend(cls._check_search_fields(**kwargs))
+        errors.extend(cls._check_search_field_dependencies(**kwargs))
+        errors.extend(cls._check_search_updated_field(**kwargs))
         return errors
 
     @classmethod
@@ -131,17 +138,51 @@ class Indexed:
                 )
         return errors
 
+    @classmethod
+    def _check_search_field_dependencies(cls, **kwargs):
+        errors = []
+        for field in cls.get_search_fields():
+            for name in getattr(field, "depends_on", None) or []:
+                try:
+                    cls._meta.get_field(name)
+                except FieldDoesNotExist:
+                    errors.append(
+                        checks.Warning(
+                            f"{cls.__name__}.search_fields entry '{field.field_name}' depends on the non-existent field '{name}'",
+                            obj=cls,
+                            id="modelsearch.W006",
+                        )
+                    )
+        return errors
+
+    @classmethod
+    def _check_search_updated_field(cls, **kwargs):
+        if cls.search_updated_field is None:
+            return []
+
+        try:
+            cls._meta.get_field(cls.search_updated_field)
+        except FieldDoesNotExist:
+            return [
+                checks.Warning(
+                    f"{cls.__name__}.search_updated_field refers to the non-existent field '{cls.search_updated_field}'",
+                    obj=cls,
+                    id="modelsearch.W005",
+                )
+            ]
+
+        return []
+
     search_fields = []
 
+    # The name of a field that holds the time each object was last modified, such as a
+    # DateTimeField with auto_now=True. This allows the update_modelsearch_index command to
+    # only reindex the objects that have changed since it last ran.
+    search_updated_field = None
+
 
 def get_indexed_models():
-    return [
-        model
-        for model in apps.get_models()
-        if issubclass(model, Indexed)
-        and not model._meta.abstract
-        and model.search_fields
-    ]
+    return search_plans.get_indexed_models()
 
 
 def class_is_indexed(cls):
@@ -153,24 +194,105 @@ def class_is_indexed(cls):
     )
 
 
+@functools.cache
+def has_custom_indexed_objects(model):
+    """
+    Returns True if the model's ``get_indexed_objects`` may exclude some of its objects.
+
+    If the model uses the default implementation with a plain manager, every saved object is
+    an indexed object and there's no need to query the database to check.
+    """
+    if model.get_indexed_objects.__func__ is not Indexed.get_indexed_objects.__func__:
+        return True
+
+    return type(model.objects).get_queryset is not models.Manager.get_queryset
+
+
+def save_affects_index(model, update_fields):
+    """
+    Returns False if saving only the given fields of an object of the model can't change
+    what is indexed for it.
+
+    The object may be indexed as a more specific class (see ``get_indexed_instance``), so
+    the search fields of the indexed subclasses of the model are taken into account too.
+    """
+    for indexed_model in get_indexed_models():
+        if not issubclass(indexed_model, model) and not issubclass(
+            model, indexed_model
+        ):
+            continue
+
+        dependencies = get_search_plan(indexed_model).dependencies
+        if dependencies is None or not dependencies.isdisjoint(update_fields):
+            return True
+
+    return False
+
+
 def get_indexed_instance(instance, check_exists=True):
     indexed_instance = instance.get_indexed_instance()
     if indexed_instance is None:
         return
 
     # Make sure that the instance is in its class's indexed objects
-    if (
-        check_exists
-        and not type(indexed_instance)
-        .get_indexed_objects()
-        .filter(pk=indexed_instance.pk)
-        .exists()
-    ):
-        return
+    if check_exists:
+        if indexed_instance.pk is None:
+            return
+
+        if (
+            has_custom_indexed_objects(type(indexed_instance))
+            and not type(indexed_instance)
+            .get_indexed_objects()
+            .filter(pk=indexed_instance.pk)
+            .exists()
+        ):
+            return
 
     return indexed_instance
 
 
+def get_indexed_instances(instances, check_exists=True):
+    """
+    Returns the indexed instances of the given instances, like ``get_indexed_instance``,
+    leaving out the ones that shouldn't be indexed.
+
+    The indexed objects are checked with one query per class rather than one per instance.
+    """
+    indexed_instances = []
+    for instance in instances:
+        indexed_instance = instance.get_indexed_instance()
+        if indexed_instance is None:
+            continue
+
+        if check_exists and indexed_instance.pk is None:
+            continue
+
+        indexed_instances.append(indexed_instance)
+
+    if not check_exists:
+        return indexed_instances
+
+    pks_by_model = {}
+    for indexed_instance in indexed_instances:
+        model = type(indexed_instance)
+        if has_custom_indexed_objects(model):
+            pks_by_model.setdefault(model, set()).add(indexed_instance.pk)
+
+    existing_pks = {
+        model: set(
+            model.get_indexed_objects().filter(pk__in=pks).values_list("pk", flat=True)
+        )
+        for model, pks in pks_by_model.items()
+    }
+
+    return [
+        indexed_instance
+        for indexed_instance in indexed_instances
+        if type(indexed_instance) not in existing_pks
+        or indexed_instance.pk in existing_pks[type(indexed_instance)]
+    ]
+
+
 def insert_or_update_object(instance):
     indexed_instance = get_indexed_instance(instance)
 
@@ -222,9 +344,84 @@ def remove_object(instance):
                     raise
 
 
+def insert_or_update_objects(model, pks):
+    """
+    Indexes the objects of the given model with the given primary keys, making one
+    ``add_bulk`` call per model and backend.
+
+    Objects excluded by ``get_indexed_objects`` are skipped. The objects are loaded through
+    ``get_indexed_objects`` with one query per class, so the related objects it selects are
+    fetched along with them.
+    """
+    if model.get_indexed_instance is Indexed.get_indexed_instance:
+        pks_by_model = {model: pks}
+    else:
+        # The model may index its objects as a more specific class, which can only be
+        # found out by loading them
+        pks_by_model = {}
+        for instance in model.objects.filter(pk__in=pks):
+            indexed_instance = instance.get_indexed_instance()
+            if indexed_instance is not None and indexed_instance.pk is not None:
+                pks_by_model.setdefault(type(indexed_instance), []).append(
+                    indexed_instance.pk
+                )
+
+    indexed_instances = {}
+    for indexed_model, indexed_pks in pks_by_model.items():
+        objs = list(indexed_model.get_indexed_objects().filter(pk__in=indexed_pks))
+        if objs:
+            indexed_instances[indexed_model] = objs
+
+    for backend_name, backend in get_search_backends_with_name(with_auto_update=True):
+        for indexed_model, objs in indexed_instances.items():
+            try:
+                backend.add_bulk(indexed_model, objs)
+            except Exception:
+                logger.exception(
+                    "Exception raised while adding %d %s objects into the '%s' search backend",
+                    len(objs),
+                    indexed_model.__name__,
+                    backend_name,
+                )
+
+                # See the comments in insert_or_update_object
+                if not backend.catch_indexing_errors:
+                    raise
+
+
+def remove_objects(model, pks):
+    """
+    Removes the objects of the given model with the given primary keys from the index,
+    making one ``delete_bulk`` call per backend.
+
+    The objects don't need to exist in the database any more.
+    """
+    pks = list(pks)
+    if not pks:
+        return
+
+    for backend_name, backend in get_search_backends_with_name(with_auto_update=True):
+        try:
+            backend.delete_bulk(model, pks)
+        except Exception:
+            logger.exception(
+                "Exception raised while deleting %d %s objects from the '%s' search backend",
+                len(pks),
+                model.__name__,
+                backend_name,
+            )
+
+            # See the comments in insert_or_update_object
+            if not backend.catch_indexing_errors:
+                raise
+
+
 class BaseField:
-    def __init__(self, field_name, **kwargs):
+    def __init__(self, field_name, depends_on=None, **kwargs):
         self.field_name = field_name
+
+        # The names of the model fields that the value of a callable or property depends on
+        self.depends_on = depends_on
         self.kwargs = kwargs
 
     def get_field(self, cls):
@@ -269,15 +466,25 @@ class BaseField:
             return "CharField"
 
     def get_value(self, obj):
-        try:
-            field = self.get_field(obj.__class__)
-        except FieldDoesNotExist:
-            value = getattr(obj, self.field_name, None)
-            if callable(value):
-                value = value()
-            return value
+        return get_search_plan(type(obj)).get_field_plan(self).get_value(obj)
+
+    def make_value_getter(self, field):
+        """
+        Returns a function that extracts the value of this field from an object.
 
-        value = field.value_from_object(obj)
+        ``field`` is the Django field that this search field refers to on the object's
+        class, or None if it refers to an attribute or method instead.
+        """
+        if field is None:
+            field_name = self.field_name
+
+            def get_attribute_value(obj):
+                value = getattr(obj, field_name, None)
+                if callable(value):
+                    value = value()
+                return value
+
+            return get_attribute_value
 
         if apps.is_installed("taggit"):
             from taggit.managers import TaggableManager
@@ -285,10 +492,10 @@ class BaseField:
             if isinstance(field, TaggableManager):
                 # As of django-taggit 1.0, value_from_object returns a list of Tag objects,
                 # which matches what we want
-                return value
+                return field.value_from_object
 
         if hasattr(field, "get_searchable_content"):
-            value = field.get_searchable_content(value)
+            searchable_content_field = field
 
         elif isinstance(field, RelatedField):
             # The type of the ForeignKey may have a get_searchable_content method that we should
@@ -299,10 +506,20 @@ class BaseField:
             while isinstance(remote_field, RelatedField):
                 remote_field = remote_field.target_field
 
-            if hasattr(remote_field, "get_searchable_content"):
-                value = remote_field.get_searchable_content(value)
+            if not hasattr(remote_field, "get_searchable_content"):
+                return field.value_from_object
 
-        return value
+            searchable_content_field = remote_field
+
+        else:
+            return field.value_from_object
+
+        def get_searchable_content(obj):
+            return searchable_content_field.get_searchable_content(
+                field.value_from_object(obj)
+            )
+
+        return get_searchable_content
 
     def __repr__(self):
         return f"<{self.__class__.__name__}: {self.field_name}>"
@@ -335,10 +552,13 @@ class RelatedFields:
         return field.model
 
     def get_value(self, obj):
-        field = self.get_field(obj.__class__)
+        return get_search_plan(type(obj)).get_field_plan(self).get_value(obj)
 
+    def make_value_getter(self, field):
         if isinstance(field, (RelatedField, ForeignObjectRel)):
-            return getattr(obj, self.field_name)
+            return operator.attrgetter(self.field_name)
+
+        return lambda obj: None
 
     def select_on_queryset(self, queryset):
         """
@@ -372,3 +592,238 @@ class RelatedFields:
                 return queryset.prefetch_related(self.field_name)
 
         return queryset
+
+
+class SearchFieldPlan:
+    """
+    A search field resolved against a model.
+
+    Holds the Django field that the search field refers to along with its attname, type and
+    definition model, and the function that extracts its value from an object, so these
+    only have to be worked out once rather than for every object that is indexed.
+    """
+
+    def __init__(self, search_field, model):
+        self.search_field = search_field
+        self.model = model
+
+        try:
+            self.field = search_field.get_field(model)
+        except FieldDoesNotExist:
+            self.field = None
+
+        if isinstance(search_field, RelatedFields):
+            self.attname = search_field.field_name
+            self.type = None
+            self.definition_model = self.field.model if self.field else None
+            self.related_model = self.field.related_model if self.field else None
+        else:
+            self.attname = search_field.get_attname(model)
+            self.type = search_field.get_type(model)
+            self.definition_model = search_field.get_definition_model(model)
+            self.related_model = None
+
+        self.get_value = search_field.make_value_getter(self.field)
+
+    @property
+    def dependencies(self):
+        """
+        The names (and attnames) of the model fields that the indexed value of this field is
+        worked out from, or None if they aren't known.
+        """
+        depends_on = getattr(self.search_field, "depends_on", None)
+        if depends_on is not None:
+            fields = []
+            for name in depends_on:
+                try:
+                    fields.append(self.model._meta.get_field(name))
+                except FieldDoesNotExist:
+                    pass
+
+            return frozenset(depends_on) | {
+                field.attname for field in fields if hasattr(field, "attname")
+            }
+
+        if self.field is None:
+            # A callable or property, which could depend on anything
+            return None
+
+        return frozenset(
+            [self.field.name, getattr(self.field, "attname", self.field.name)]
+        )
+
+    @property
+    def related_plan(self):
+        """
+        The search plan of the model that a RelatedFields points to.
+        """
+        if self.related_model is not None:
+            return get_search_plan(self.related_model)
+
+    def __repr__(self):
+        return (
+            f"<SearchFieldPlan: {self.model.__name__}.{self.search_field.field_name}>"
+        )
+
+
+class ModelSearchPlan:
+    """
+    The search fields of a model, each resolved into a ``SearchFieldPlan``.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.source = getattr(model, "search_fields", None)
+        self.search_fields = (
+            model.get_search_fields() if issubclass(model, Indexed) else []
+        )
+        self.field_plans = {}
+        self.search_field_plans = []
+
+        # Field objects that have been looked up before, so that the key of a field doesn't
+        # need to be worked out again each time its value is read
+        self.field_plans_by_field = weakref.WeakKeyDictionary()
+
+        # The mappings that search backends build from this plan, keyed by mapping class.
+        # They are discarded along with the plan when the model's search fields change.
+        self.mappings = {}
+
+        for search_field in self.search_fields:
+            field_plan = SearchFieldPlan(search_field, self.model)
+            self.field_plans.setdefault(
+                self.get_field_plan_key(search_field), field_plan
+            )
+            self.search_field_plans.append(field_plan)
+
+    @cached_property
+    def dependencies(self):
+        """
+        The names (and attnames) of the model fields that the indexed document is worked out
+        from, or None if they aren't known. Saving other fields can't change the document.
+        """
+        dependencies = set()
+        for field_plan in self:
+            if field_plan.dependencies is None:
+                return None
+
+            dependencies |= field_plan.dependencies
+
+        return frozenset(dependencies)
+
+    def is_stale(self):
+        # Tests and some projects swap out search_fields at runtime
+        return getattr(self.model, "search_fields", None) is not self.source
+
+    @classmethod
+    def get_field_plan_key(cls, search_field):
+        """
+        Returns a key for the type and options of a search field (including the sub-fields
+        of a RelatedFields).
+
+        Plans are looked up by this key rather than by the field itself, so models whose
+        get_search_fields() makes new fields each time it's called don't add a plan for
+        every call. Fields that only differ in their options, such as their boost, still
+        get plans of their own.
+        """
+        return type(search_field), cls._get_options_key(vars(search_field))
+
+    @classmethod
+    def _get_options_key(cls, value):
+        if isinstance(value, (BaseField, RelatedFields)):
+            return cls.get_field_plan_key(value)
+
+        if isinstance(value, dict):
+            return tuple(
+                sorted((key, cls._get_options_key(item)) for key, item in value.items())
+            )
+
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._get_options_key(item) for item in value)
+
+        return make_hashable(value)
+
+    def get_field_plan(self, search_field):
+        """
+        Returns the plan for the given search field. This works for fields that are not in
+        the model's search_fields too, such as the sub-fields of a RelatedFields.
+        """
+        try:
+            return self.field_plans_by_field[search_field]
+        except KeyError:
+            pass
+
+        key = self.get_field_plan_key(search_field)
+        try:
+            field_plan = self.field_plans[key]
+        except KeyError:
+            field_plan = self.field_plans[key] = SearchFieldPlan(
+                search_field, self.model
+            )
+
+        self.field_plans_by_field[search_field] = field_plan
+        return field_plan
+
+    def __iter__(self):
+        return iter(self.search_field_plans)
+
+
+class SearchPlanRegistry:
+    """
+    Keeps the ``ModelSearchPlan`` of each model, along with the list of indexed models.
+
+    The plans of the indexed models are built when the app is ready. Plans of other models,
+    such as the targets of RelatedFields, are built the first time they are needed.
+    """
+
+    def __init__(self):
+        self.plans = {}
+        self.indexed_models = None
+
+    def build(self):
+        self.reset()
+        for model in self.get_indexed_models():
+            plan = self.get(model)
+            self._build_related(plan)
+
+    def _build_related(self, plan):
+        for field_plan in plan:
+            if isinstance(field_plan.search_field, RelatedFields):
+                related_plan = field_plan.related_plan
+                if related_plan is None:
+                    continue
+
+                for sub_field in field_plan.search_field.fields:
+                    related_plan.get_field_plan(sub_field)
+
+    def get(self, model):
+        plan = self.plans.get(model)
+        if plan is None or plan.is_stale():
+            plan = self.plans[model] = ModelSearchPlan(model)
+
+        return plan
+
+    def get_indexed_models(self):
+        if self.indexed_models is None:
+            self.indexed_models = [
+                model
+                for model in apps.get_models()
+                if issubclass(model, Indexed)
+                and not model._meta.abstract
+                and model.search_fields
+            ]
+
+        return list(self.indexed_models)
+
+    def reset(self):
+        self.plans = {}
+        self.indexed_models = None
+
+
+search_plans = SearchPlanRegistry()
+
+
+def get_search_plan(model):
+    """
+    Returns the ``ModelSearchPlan`` of the given model.
+    """
+    return search_plans.get(model)
@@ -1,15 +1,24 @@
 import collections
+import contextlib
+import itertools
+import multiprocessing
+import time
 
-from django.core.management.base import BaseCommand
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from modelsearch.backends import get_search_backend
 from modelsearch.conf import get_app_config
 from modelsearch.index import get_indexed_models
+from modelsearch.management.workers import index_pk_range, init_worker
 
 
 DEFAULT_CHUNK_SIZE = 1000
 
+RebuildCheckpoint = get_app_config().get_model("RebuildCheckpoint", require_ready=False)
+
 
 def group_models_by_index(backend, models):
     """
@@ -51,6 +60,30 @@ def group_models_by_index(backend, models):
     )
 
 
+def get_pk_ranges(qs, chunk_size=DEFAULT_CHUNK_SIZE, after_pk=None):
+    """
+    Splits the primary keys of a queryset into ranges of at most ``chunk_size`` objects.
+
+    Returns a list of ``(after_pk, last_pk)`` tuples, where a range contains the objects
+    with a primary key greater than ``after_pk`` (if not None) and less than or equal to
+    ``last_pk`` (if not None). The first range starts after the given ``after_pk``.
+    """
+    pks = qs.order_by("pk").values_list("pk", flat=True)
+    ranges = []
+    while True:
+        remaining_pks = pks if after_pk is None else pks.filter(pk__gt=after_pk)
+        last_pk = remaining_pks[chunk_size - 1 : chunk_size].first()
+        if last_pk is None:
+            if remaining_pks.exists():
+                ranges.append((after_pk, None))
+            break
+
+        ranges.append((after_pk, last_pk))
+        after_pk = last_pk
+
+    return ranges
+
+
 class Command(BaseCommand):
     def write(self, *args, **kwargs):
         """Helper function that respects verbosity when printing."""
@@ -58,7 +91,13 @@ class Command(BaseCommand):
             self.stdout.write(*args, **kwargs)
 
     def update_backend(
-        self, backend_name, schema_only=False, chunk_size=DEFAULT_CHUNK_SIZE
+        self,
+        backend_name,
+        schema_only=False,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        stream=False,
+        workers=1,
+        resume=False,
     ):
         self.write("Updating backend: " + backend_name)
 
@@ -68,50 +107,283 @@ class Command(BaseCommand):
             self.write(f"Backend '{backend_name}' doesn't require rebuilding")
             return
 
+        if workers > 1 and not getattr(
+            backend.rebuilder_class, "supports_workers", False
+        ):
+            self.write(
+                f"Backend '{backend_name}' can't be rebuilt by multiple workers, using a single process"
+            )
+            workers = 1
+
         models_grouped_by_index = group_models_by_index(
             backend, get_indexed_models()
         ).items()
         if not models_grouped_by_index:
             self.write(f"{backend_name}: No indices to rebuild")
 
-        for index, models in models_grouped_by_index:
-            self.write(f"{backend_name}: Rebuilding index {index}")
+        # Worker processes are started once and shared by all indexes of the backend
+        with self.get_worker_pool(workers) as pool:
+            for index, models in models_grouped_by_index:
+                self.write(f"{backend_name}: Rebuilding index {index}")
 
-            # Start rebuild
-            rebuilder = backend.rebuilder_class(index)
-            index = rebuilder.start()
+                # Start rebuild, or carry on from where an interrupted one got to
+                rebuilder = backend.rebuilder_class(index)
+                checkpoint, index = self.start_rebuild(
+                    backend_name, rebuilder, index, resume
+                )
 
-            # Add models
-            for model in models:
-                index.add_model(model)
+                # Rewrite every document, so that changes to the configuration of the
+                # backend are picked up even when the content of an object hasn't changed
+                index.skip_unchanged = False
 
-            # Add objects
-            object_count = 0
-            if not schema_only:
+                # Add models
                 for model in models:
-                    self.write(
-                        f"{backend_name}: {model._meta.app_label}.{model.__name__} ".ljust(
-                            35
-                        ),
-                        ending="",
-                    )
-
-                    # Add items (chunk_size at a time)
-                    for chunk in self.print_iter_progress(
-                        self.queryset_chunks(
-                            model.get_indexed_objects().order_by("pk"), chunk_size
+                    index.add_model(model)
+
+                # Add objects
+                object_count = 0
+                start_time = time.monotonic()
+                if not schema_only:
+                    models = self.get_remaining_models(checkpoint, models)
+                    for model in models:
+                        after_pk = self.get_checkpoint_pk(checkpoint, model)
+                        self.save_checkpoint(checkpoint, model, after_pk)
+
+                        self.write(
+                            f"{backend_name}: {model._meta.app_label}.{model.__name__} ".ljust(
+                                35
+                            ),
+                            ending="",
                         )
-                    ):
-                        index.add_items(model, chunk)
-                        object_count += len(chunk)
 
-                    self.print_newline()
+                        if pool is not None:
+                            # Chunks finish out of order, so the checkpoint only moves
+                            # on once the whole model has been indexed
+                            object_count += self.add_items_in_parallel(
+                                pool, backend_name, index, model, chunk_size, after_pk
+                            )
+                            continue
+
+                        if stream and hasattr(index, "stream_items"):
+                            object_count += self.stream_items(
+                                backend_name,
+                                checkpoint,
+                                index,
+                                model,
+                                chunk_size,
+                                after_pk,
+                            )
+                            continue
+
+                        # Add items (chunk_size at a time)
+                        for chunk in self.print_iter_progress(
+                            self.queryset_chunks(
+                                model.get_indexed_objects(),
+                                chunk_size,
+                                stream=stream,
+                                after_pk=after_pk,
+                            )
+                        ):
+                            index.add_items(model, chunk)
+                            object_count += len(chunk)
+                            self.save_checkpoint(checkpoint, model, chunk[-1].pk)
+
+                        self.print_newline()
+
+                # Finish rebuild
+                rebuilder.finish()
+                checkpoint.delete()
+
+                elapsed = time.monotonic() - start_time
+                rate = object_count / elapsed if elapsed else 0
+                self.write(
+                    f"{backend_name}: indexed {object_count} objects in {elapsed:.2f}s ({rate:.0f} objects/s)"
+                )
+                self.print_newline()
+
+    def start_rebuild(self, backend_name, rebuilder, index, resume=False):
+        """
+        Starts rebuilding an index, or resumes the previous rebuild of the index if
+        ``resume`` is set and it didn't finish.
+
+        Returns the checkpoint that records the progress of the rebuild, and the index to
+        add objects into.
+        """
+        index_name = str(index.get_key())
+        checkpoint = RebuildCheckpoint._default_manager.filter(
+            backend_name=backend_name, index_name=index_name
+        ).first()
+
+        if resume and checkpoint is not None:
+            resume_rebuild = getattr(rebuilder, "resume", None)
+            target_index = (
+                resume_rebuild(checkpoint.target_index_name) if resume_rebuild else None
+            )
+            if target_index is not None:
+                self.write(
+                    f"{backend_name}: Resuming rebuild of index {index} from {checkpoint.model or 'the start'}"
+                )
+                return checkpoint, target_index
+
+            self.write(
+                f"{backend_name}: The previous rebuild of index {index} can't be resumed, starting again"
+            )
+
+        target_index = rebuilder.start()
+
+        if checkpoint is None:
+            checkpoint = RebuildCheckpoint(
+                backend_name=backend_name, index_name=index_name
+            )
+
+        checkpoint.target_index_name = str(target_index.get_key())
+        checkpoint.model = ""
+        checkpoint.last_pk = None
+        checkpoint.save()
+
+        return checkpoint, target_index
+
+    def get_remaining_models(self, checkpoint, models):
+        """
+        Returns the models that still need to be indexed, skipping those that come before
+        the model the checkpoint is at.
+        """
+        model_labels = [model._meta.label for model in models]
+        if checkpoint.model not in model_labels:
+            return models
+
+        return models[model_labels.index(checkpoint.model) :]
+
+    def get_checkpoint_pk(self, checkpoint, model):
+        """
+        Returns the primary key of the last object of the model that has been indexed, if
+        the checkpoint is at this model.
+        """
+        if checkpoint.model != model._meta.label or checkpoint.last_pk is None:
+            return None
+
+        return model._meta.pk.to_python(checkpoint.last_pk)
+
+    def save_checkpoint(self, checkpoint, model, last_pk):
+        checkpoint.model = model._meta.label
+        checkpoint.last_pk = None if last_pk is None else str(last_pk)
+        checkpoint.save(update_fields=["model", "last_pk", "updated_at"])
+
+    def get_worker_pool(self, workers):
+        """
+        Returns a pool of worker processes for parallel rebuilds, or a context that yields
+        None if the rebuild runs in this process.
+        """
+        if workers <= 1:
+            return contextlib.nullcontext()
+
+        # Workers are spawned rather than forked, so that they don't inherit the database
+        # connections and search backend clients of this process
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        )
+
+    def add_items_in_parallel(
+        self, pool, backend_name, index, model, chunk_size, after_pk=None
+    ):
+        """
+        Adds the objects of a model (with a primary key greater than ``after_pk``, if set)
+        into the index using a pool of worker processes, each of which indexes ranges of
+        ``chunk_size`` primary keys.
+
+        Every range is attempted even if some of them fail. The errors are then reported
+        together and the rebuild is aborted, so that an incomplete index is never swapped in.
+        """
+        qs = model.get_indexed_objects()
+        if after_pk is not None:
+            qs = qs.filter(pk__gt=after_pk)
+
+        pk_ranges = get_pk_ranges(qs, chunk_size, after_pk=after_pk)
+        model_label = model._meta.label
+        object_count = 0
+        errors = []
+
+        futures = {
+            pool.submit(
+                index_pk_range,
+                backend_name,
+                index.get_key(),
+                model_label,
+                after_pk,
+                last_pk,
+            ): (after_pk, last_pk)
+            for after_pk, last_pk in pk_ranges
+        }
+
+        for future in self.print_iter_progress(as_completed(futures)):
+            try:
+                object_count += future.result()
+            except Exception as e:
+                errors.append((futures[future], e))
+
+        self.print_newline()
+
+        if errors:
+            for (after_pk, last_pk), e in errors:
+                self.stderr.write(
+                    f"{backend_name}: failed to index {model_label} objects with primary keys after {after_pk} up to {last_pk}: {e!r}"
+                )
+
+            raise CommandError(
+                f"{len(errors)} of {len(pk_ranges)} chunks of {model_label} objects couldn't be indexed"
+            )
+
+        return object_count
 
-            # Finish rebuild
-            rebuilder.finish()
+    def stream_items(
+        self, backend_name, checkpoint, index, model, chunk_size, after_pk=None
+    ):
+        """
+        Pushes the objects of a model (with a primary key greater than ``after_pk``, if set)
+        from a database cursor straight into an index that can stream them (see
+        ``ElasticsearchBaseIndex.stream_items``), without building a list of each chunk.
 
-            self.write(f"{backend_name}: indexed {object_count} objects")
-            self.print_newline()
+        The checkpoint moves on every ``chunk_size`` documents, up to the first document
+        that fails. Every object is sent even if some of them fail. The failures are then
+        reported together and the rebuild is aborted.
+        """
+        qs = model.get_indexed_objects().order_by("pk")
+        if after_pk is not None:
+            qs = qs.filter(pk__gt=after_pk)
+
+        model_label = model._meta.label
+        results = iter(index.stream_items(model, qs.iterator(chunk_size=chunk_size)))
+        object_count = 0
+        errors = []
+
+        def result_chunks():
+            while chunk := list(itertools.islice(results, chunk_size)):
+                yield chunk
+
+        for chunk in self.print_iter_progress(result_chunks()):
+            for document_id, error in chunk:
+                if error is not None:
+                    errors.append((document_id, error))
+
+            object_count += len(chunk)
+            if not errors:
+                self.save_checkpoint(checkpoint, model, chunk[-1][0])
+
+        self.print_newline()
+
+        if errors:
+            for document_id, error in errors:
+                self.stderr.write(
+                    f"{backend_name}: failed to index {model_label} object {document_id}: {error!r}"
+                )
+
+            raise CommandError(
+                f"{len(errors)} of {object_count} {model_label} objects couldn't be indexed"
+            )
+
+        return object_count
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -136,6 +408,28 @@ class Command(BaseCommand):
             type=int,
             help="Set number of records to be fetched at once for inserting into the index",
         )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            dest="stream",
+            default=False,
+            help="Read records through a single server-side cursor instead of fetching each chunk with a separate query. Backends that support it are sent the records as they are read",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            dest="resume",
+            default=False,
+            help="Continue the previous rebuild of each index from where it got to, if it didn't finish",
+        )
+        parser.add_argument(
+            "--workers",
+            action="store",
+            dest="workers",
+            default=1,
+            type=int,
+            help="Set number of processes to index records with. Each process indexes chunks of --chunk_size records",
+        )
 
     def handle(self, **options):
         self.verbosity = options["verbosity"]
@@ -154,6 +448,9 @@ class Command(BaseCommand):
                 backend_name,
                 schema_only=options.get("schema_only", False),
                 chunk_size=options.get("chunk_size"),
+                stream=options.get("stream", False),
+                workers=options.get("workers", 1),
+                resume=options.get("resume", False),
             )
 
     def print_newline(self):
@@ -182,19 +479,53 @@ class Command(BaseCommand):
 
             self.stdout.flush()
 
-    # Atomic so the count of models doesn't change as it is iterated
-    @transaction.atomic
-    def queryset_chunks(self, qs, chunk_size=DEFAULT_CHUNK_SIZE):
+    def queryset_chunks(
+        self, qs, chunk_size=DEFAULT_CHUNK_SIZE, stream=False, after_pk=None
+    ):
         """
-        Yield a queryset in chunks of at most ``chunk_size``. The chunk yielded
-        will be a list, not a queryset. Iterating over the chunks is done in a
-        transaction so that the order and count of items in the queryset
-        remains stable.
+        Yield a queryset in chunks of at most ``chunk_size``, in primary key order. The
+        chunk yielded will be a list, not a queryset.
+
+        Each chunk is fetched by filtering on the last primary key of the previous one
+        (rather than with an OFFSET) in a short transaction of its own, so rebuilding a
+        large table takes linear time and no snapshot is held open between chunks.
+
+        If ``stream`` is set, the queryset is instead read through a single server-side
+        cursor (on databases that support them), fetching ``chunk_size`` rows at a time.
+
+        If ``after_pk`` is set, only objects with a greater primary key are yielded.
         """
-        i = 0
+        qs = qs.order_by("pk")
+        if after_pk is not None:
+            qs = qs.filter(pk__gt=after_pk)
+
+        if stream:
+            items = []
+            for item in qs.iterator(chunk_size=chunk_size):
+                items.append(item)
+                if len(items) == chunk_size:
+                    yield items
+                    items = []
+
+            if items:
+                yield items
+
+            return
+
+        last_pk = None
         while True:
-            items = list(qs[i * chunk_size :][:chunk_size])
+            chunk_qs = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+
+            # Fetch the chunk and anything it prefetches from the same snapshot
+            with transaction.atomic(using=qs.db):
+                items = list(chunk_qs[:chunk_size])
+
             if not items:
                 break
+
             yield items
-            i += 1
+
+            if len(items) < chunk_size:
+                break
+
+            last_pk = items[-1].pk
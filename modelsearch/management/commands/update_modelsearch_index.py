@@ -0,0 +1,145 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from modelsearch.backends import get_search_backend
+from modelsearch.conf import get_app_config
+from modelsearch.index import get_indexed_models
+
+from .rebuild_modelsearch_index import DEFAULT_CHUNK_SIZE
+from .rebuild_modelsearch_index import Command as RebuildCommand
+
+
+UpdateWatermark = get_app_config().get_model("UpdateWatermark", require_ready=False)
+
+
+def parse_since(value):
+    """
+    Parses the value of the --since option, which is either "last" or a date or datetime
+    in ISO 8601 format.
+    """
+    if value == "last":
+        return value
+
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            date = parse_date(value)
+            if date is not None:
+                since = datetime.datetime.combine(date, datetime.time.min)
+    except ValueError:
+        since = None
+
+    if since is None:
+        raise CommandError(
+            f"'{value}' is not a valid date or datetime. Use ISO 8601 format or 'last'."
+        )
+
+    if settings.USE_TZ and timezone.is_naive(since):
+        since = timezone.make_aware(since)
+
+    return since
+
+
+class Command(RebuildCommand):
+    def update_models(self, backend_name, since, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.write("Updating backend: " + backend_name)
+
+        backend = get_search_backend(backend_name)
+
+        if not backend.rebuilder_class:
+            self.write(f"Backend '{backend_name}' doesn't require updating")
+            return
+
+        models = [
+            model
+            for model in get_indexed_models()
+            if model.search_updated_field is not None
+        ]
+        if not models:
+            self.write(f"{backend_name}: No models set search_updated_field")
+
+        for model in models:
+            self.update_model(backend, backend_name, model, since, chunk_size)
+
+    def update_model(self, backend, backend_name, model, since, chunk_size):
+        model_label = model._meta.label
+
+        # Taken before querying, so objects modified while the command runs are picked up
+        # again by the next run
+        started_at = timezone.now()
+
+        if since == "last":
+            watermark = UpdateWatermark._default_manager.filter(
+                backend_name=backend_name, model=model_label
+            ).first()
+
+            # Models that haven't been updated before are indexed in full
+            since = watermark.updated_at if watermark else None
+
+        queryset = model.get_indexed_objects()
+        if since is not None:
+            queryset = queryset.filter(**{f"{model.search_updated_field}__gte": since})
+
+        self.write(f"{backend_name}: {model_label} ".ljust(35), ending="")
+
+        object_count = 0
+        for chunk in self.print_iter_progress(
+            self.queryset_chunks(queryset, chunk_size)
+        ):
+            backend.add_bulk(model, chunk)
+            object_count += len(chunk)
+
+        self.print_newline()
+
+        UpdateWatermark._default_manager.update_or_create(
+            backend_name=backend_name,
+            model=model_label,
+            defaults={"updated_at": started_at},
+        )
+
+        self.write(f"{backend_name}: updated {object_count} {model_label} objects")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            action="store",
+            dest="backend_name",
+            default=None,
+            help="Specify a backend to update",
+        )
+        parser.add_argument(
+            "--since",
+            action="store",
+            dest="since",
+            required=True,
+            help="Reindex objects modified since this date or datetime (in ISO 8601 format), or since the last update if 'last'",
+        )
+        parser.add_argument(
+            "--chunk_size",
+            action="store",
+            dest="chunk_size",
+            default=DEFAULT_CHUNK_SIZE,
+            type=int,
+            help="Set number of records to be fetched at once for inserting into the index",
+        )
+
+    def handle(self, **options):
+        self.verbosity = options["verbosity"]
+        since = parse_since(options["since"])
+
+        # Get list of backends to update
+        if options["backend_name"]:
+            # update only the passed backend
+            backend_names = [options["backend_name"]]
+        else:
+            # update all backends listed in the search backend config
+            backend_names = get_app_config().get_search_backend_config().keys()
+
+        for backend_name in backend_names:
+            self.update_models(
+                backend_name, since, chunk_size=options.get("chunk_size")
+            )
@@ -0,0 +1,53 @@
+"""
+The functions that run in the worker processes of parallel rebuilds (see
+``rebuild_modelsearch_index --workers``).
+
+The workers are spawned with a fresh interpreter, which imports this module to unpickle
+the functions before Django has been set up. So unlike the management command, this
+module mustn't look anything up in the app registry when it is imported.
+"""
+
+import django
+
+from django.apps import apps
+from django.db import transaction
+
+from modelsearch.backends import get_search_backend, reset_search_backends
+
+
+def init_worker():
+    """
+    Prepares a process of the worker pool used for parallel rebuilds.
+    """
+    # Workers start with a fresh interpreter and open their own database connections and
+    # search backend clients
+    if not apps.ready:
+        django.setup()
+
+    reset_search_backends()
+
+
+def index_pk_range(backend_name, index_key, model_label, after_pk, last_pk):
+    """
+    Adds the objects of a model within a range of primary keys (see get_pk_ranges in the
+    rebuild_modelsearch_index command) into an index.
+
+    Returns the number of objects that were indexed.
+    """
+    backend = get_search_backend(backend_name)
+    index = backend.get_index_by_key(index_key, rebuilding=True)
+    model = apps.get_model(model_label)
+
+    qs = model.get_indexed_objects().order_by("pk")
+    if after_pk is not None:
+        qs = qs.filter(pk__gt=after_pk)
+    if last_pk is not None:
+        qs = qs.filter(pk__lte=last_pk)
+
+    with transaction.atomic(using=qs.db):
+        items = list(qs)
+
+    if items:
+        index.add_items(model, items)
+
+    return len(items)
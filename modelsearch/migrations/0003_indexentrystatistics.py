@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("modelsearch", "0002_customise_indexentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexEntryStatistics",
+            fields=[
+                (
+                    "id",
+                    models.PositiveSmallIntegerField(
+                        default=1,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("title_length_sum", models.BigIntegerField(default=0)),
+                ("title_count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "index entry statistics",
+                "verbose_name_plural": "index entry statistics",
+            },
+        ),
+    ]
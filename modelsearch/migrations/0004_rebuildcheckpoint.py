@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("modelsearch", "0003_indexentrystatistics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RebuildCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("backend_name", models.CharField(max_length=255)),
+                ("index_name", models.CharField(max_length=255)),
+                ("target_index_name", models.CharField(max_length=255)),
+                ("model", models.CharField(blank=True, max_length=255)),
+                ("last_pk", models.CharField(blank=True, max_length=255, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "rebuild checkpoint",
+                "verbose_name_plural": "rebuild checkpoints",
+                "unique_together": {("backend_name", "index_name")},
+            },
+        ),
+    ]
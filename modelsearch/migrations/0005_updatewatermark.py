@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("modelsearch", "0004_rebuildcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UpdateWatermark",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("backend_name", models.CharField(max_length=255)),
+                ("model", models.CharField(max_length=255)),
+                ("updated_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "update watermark",
+                "verbose_name_plural": "update watermarks",
+                "unique_together": {("backend_name", "model")},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("modelsearch", "0005_updatewatermark"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="indexentry",
+            name="fingerprint",
+            field=models.CharField(max_length=40, null=True),
+        ),
+    ]
@@ -1,7 +1,13 @@
 from django.db import models
 from django.db.models import OneToOneField
 
-from .abstract_models import AbstractIndexEntry, AbstractSQLiteFTSIndexEntry
+from .abstract_models import (
+    AbstractIndexEntry,
+    AbstractIndexEntryStatistics,
+    AbstractRebuildCheckpoint,
+    AbstractSQLiteFTSIndexEntry,
+    AbstractUpdateWatermark,
+)
 
 
 class IndexEntry(AbstractIndexEntry):
@@ -17,6 +23,45 @@ class IndexEntry(AbstractIndexEntry):
         abstract = False
 
 
+class IndexEntryStatistics(AbstractIndexEntryStatistics):
+    """
+    The IndexEntryStatistics model that will get created in the database.
+    """
+
+    class Meta(AbstractIndexEntryStatistics.Meta):
+        """
+        Contains everything in the AbstractIndexEntryStatistics Meta class, but makes this model concrete.
+        """
+
+        abstract = False
+
+
+class RebuildCheckpoint(AbstractRebuildCheckpoint):
+    """
+    The RebuildCheckpoint model that will get created in the database.
+    """
+
+    class Meta(AbstractRebuildCheckpoint.Meta):
+        """
+        Contains everything in the AbstractRebuildCheckpoint Meta class, but makes this model concrete.
+        """
+
+        abstract = False
+
+
+class UpdateWatermark(AbstractUpdateWatermark):
+    """
+    The UpdateWatermark model that will get created in the database.
+    """
+
+    class Meta(AbstractUpdateWatermark.Meta):
+        """
+        Contains everything in the AbstractUpdateWatermark Meta class, but makes this model concrete.
+        """
+
+        abstract = False
+
+
 if AbstractSQLiteFTSIndexEntry:
 
     class SQLiteFTSIndexEntry(AbstractSQLiteFTSIndexEntry):
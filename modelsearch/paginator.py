@@ -0,0 +1,51 @@
+from django.core.paginator import Paginator
+
+
+class SearchPaginator(Paginator):
+    """
+    A Paginator for search results, which fetches each page before counting the results.
+
+    Django's Paginator counts the results and then fetches the page, which costs two
+    searches. Backends that count the results while searching (such as Elasticsearch)
+    let this paginator take the count from the same search as the page.
+    """
+
+    def _search_page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return None
+
+        if number < 1:
+            return None
+
+        # Fetch enough results for the last page to include any orphans
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom : bottom + self.per_page + self.orphans]
+        if "count" not in self.__dict__ and hasattr(object_list, "_count_total_hits"):
+            # Count every result exactly in the same search, rather than up to the
+            # backend's limit
+            object_list._count_total_hits = True
+        len(object_list)  # Performs the search
+
+        total_hits = getattr(object_list, "_total_hits", None)
+        if total_hits is not None and "count" not in self.__dict__:
+            # Fill in Paginator's cached count
+            self.count = total_hits
+
+        return object_list
+
+    def page(self, number):
+        object_list = self._search_page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+
+        if object_list is None:
+            object_list = self.object_list[bottom:top]
+        else:
+            object_list = object_list[: top - bottom]
+
+        return self._get_page(object_list, number, self)
@@ -1,17 +1,28 @@
 from django.db.models.signals import post_delete, post_save
 
 from . import index
-from .tasks import insert_or_update_object_task
+from .buffer import DELETE, INSERT_OR_UPDATE, get_indexing_buffer
 
 
-def post_save_signal_handler(instance, **kwargs):
-    insert_or_update_object_task.enqueue(
-        instance._meta.app_label, instance._meta.model_name, str(instance.pk)
-    )
+def post_save_signal_handler(instance, using=None, update_fields=None, **kwargs):
+    # Saves that only write fields which aren't indexed don't need the object reindexing
+    if update_fields is not None and not index.save_affects_index(
+        type(instance), update_fields
+    ):
+        return
 
+    get_indexing_buffer(using).add(type(instance), instance.pk, INSERT_OR_UPDATE)
 
-def post_delete_signal_handler(instance, **kwargs):
-    index.remove_object(instance)
+
+def post_delete_signal_handler(instance, using=None, **kwargs):
+    # The object won't exist in the database by the time the buffer is flushed, so the
+    # indexed instance needs to be worked out now
+    indexed_instance = index.get_indexed_instance(instance, check_exists=False)
+
+    if indexed_instance:
+        get_indexing_buffer(using).add(
+            type(indexed_instance), indexed_instance.pk, DELETE
+        )
 
 
 def register_signal_handlers():
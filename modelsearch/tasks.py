@@ -8,3 +8,15 @@ from modelsearch import index
 def insert_or_update_object_task(app_label, model_name, pk):
     model = apps.get_model(app_label, model_name)
     index.insert_or_update_object(model.objects.get(pk=pk))
+
+
+@task()
+def insert_or_update_objects_task(app_label, model_name, pks):
+    model = apps.get_model(app_label, model_name)
+    index.insert_or_update_objects(model, pks)
+
+
+@task()
+def remove_objects_task(app_label, model_name, pks):
+    model = apps.get_model(app_label, model_name)
+    index.remove_objects(model, pks)
@@ -87,6 +87,15 @@ DATABASES = {
 if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
     INSTALLED_APPS.append("django.contrib.postgres")
 
+# The worker processes of parallel rebuilds load these settings again, so the tests keep
+# the test database on disk rather than in memory and point the workers at it with
+# MODELSEARCH_TEST_DATABASE_NAME
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"]["TEST"] = {"NAME": "test_modelsearch_test.sqlite"}
+
+if os.getenv("MODELSEARCH_TEST_DATABASE_NAME"):
+    DATABASES["default"]["NAME"] = os.environ["MODELSEARCH_TEST_DATABASE_NAME"]
+
 
 # Search backend
 
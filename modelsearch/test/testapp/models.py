@@ -134,7 +134,9 @@ class ProgrammingGuide(Book):
     )
 
     search_fields = Book.search_fields + [
-        index.SearchField("get_programming_language_display"),
+        index.SearchField(
+            "get_programming_language_display", depends_on=["programming_language"]
+        ),
         index.FilterField("programming_language"),
     ]
 
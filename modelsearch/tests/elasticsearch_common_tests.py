@@ -187,6 +187,22 @@ class ElasticsearchCommonSearchBackendTests(BackendTests):
 
         self.assertEqual(len(results), 14)
 
+    def test_values(self):
+        results = self.backend.search("JavaScript", models.Book).values(
+            "title", "number_of_pages"
+        )
+
+        with self.assertNumQueries(0):
+            rows = list(results)
+
+        self.assertEqual(
+            sorted(rows, key=lambda row: row["title"]),
+            [
+                {"title": "JavaScript: The Definitive Guide", "number_of_pages": 792},
+                {"title": "JavaScript: The good parts", "number_of_pages": 172},
+            ],
+        )
+
     def test_more_than_one_hundred_results(self):
         # Tests that fetching more than 100 results uses the scroll API
         books = []
@@ -1,3 +1,4 @@
+import threading
 import unittest
 
 from collections import OrderedDict
@@ -7,21 +8,35 @@ from unittest import mock
 
 from django.conf import settings
 from django.core import management
+from django.core.management.base import CommandError
+from django.core.paginator import EmptyPage
 from django.db import connection
 from django.db.models import F, Q, Subquery
 from django.test import TestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from taggit.models import Tag
 
 from modelsearch.backends import (
     InvalidSearchBackendError,
+    SearchBackendRegistry,
     get_search_backend,
     get_search_backends,
+    reset_search_backends,
+    search_backend_registry,
+)
+from modelsearch.backends.base import (
+    BaseIndex,
+    BaseSearchBackend,
+    FieldError,
+    FilterFieldError,
 )
-from modelsearch.backends.base import BaseSearchBackend, FieldError, FilterFieldError
 from modelsearch.backends.database.fallback import DatabaseSearchBackend
 from modelsearch.backends.database.sqlite.utils import fts5_available
-from modelsearch.models import IndexEntry
+from modelsearch.management.commands.rebuild_modelsearch_index import (
+    Command as RebuildCommand,
+)
+from modelsearch.models import IndexEntry, RebuildCheckpoint
+from modelsearch.paginator import SearchPaginator
 from modelsearch.query import (
     MATCH_ALL,
     MATCH_NONE,
@@ -213,6 +228,49 @@ class BackendTests:
         with self.assertNumQueries(0):
             self.assertEqual(results.count(), 2)
 
+    def test_multi_search(self):
+        results = self.backend.multi_search(
+            [
+                self.backend.search("JavaScript", models.Book)[:10],
+                self.backend.search("Tolkien", models.Author)[:1],
+                self.backend.search(MATCH_ALL, models.Book),
+                self.backend.search("", models.Book),
+            ]
+        )
+
+        with self.assertNumQueries(0):
+            self.assertCountEqual(
+                [book.title for book in results[0]],
+                ["JavaScript: The good parts", "JavaScript: The Definitive Guide"],
+            )
+            self.assertEqual(len(results[1]), 1)
+            self.assertEqual(len(results[2]), 14)
+            self.assertEqual(list(results[3]), [])
+
+    def test_search_paginator(self):
+        def search():
+            return self.backend.search(
+                MATCH_ALL,
+                models.Book.objects.order_by("number_of_pages"),
+                order_by_relevance=False,
+            )
+
+        books = [book.title for book in search()]
+        paginator = SearchPaginator(search(), 5, orphans=4)
+
+        first_page = paginator.page(1)
+        self.assertEqual([book.title for book in first_page], books[:5])
+        self.assertEqual(paginator.count, 14)
+        self.assertEqual(paginator.num_pages, 2)
+
+        # The last page takes the orphans
+        last_page = SearchPaginator(search(), 5, orphans=4).page(2)
+        self.assertCountEqual([book.title for book in last_page], books[5:])
+        self.assertFalse(last_page.has_next())
+
+        with self.assertRaises(EmptyPage):
+            SearchPaginator(search(), 5, orphans=4).page(3)
+
     def test_results_cache(self):
         results = self.backend.search("JavaScript", models.Book)
         self.assertEqual(len(list(results)), 2)
@@ -969,6 +1027,35 @@ class BackendTests:
         with self.assertRaises(FilterFieldError):
             self.backend.search(MATCH_ALL, models.ProgrammingGuide).facet("foo")
 
+    def test_facets(self):
+        field_names = ["programming_language", "number_of_pages", "tags"]
+        facets = self.backend.search(MATCH_ALL, models.ProgrammingGuide).facets(
+            field_names
+        )
+
+        self.assertEqual(list(facets), field_names)
+        self.assertDictEqual(
+            dict(facets["programming_language"]), {"js": 2, "py": 2, "rs": 1}
+        )
+        self.assertDictEqual(dict(facets["tags"]), {None: 5})
+
+        # Not testing ordering, as most of the counts are the same
+        for field_name in field_names:
+            self.assertDictEqual(
+                dict(facets[field_name]),
+                dict(
+                    self.backend.search(MATCH_ALL, models.ProgrammingGuide).facet(
+                        field_name
+                    )
+                ),
+            )
+
+    def test_facets_with_nonexistent_field(self):
+        with self.assertRaises(FilterFieldError):
+            self.backend.search(MATCH_ALL, models.ProgrammingGuide).facets(
+                ["programming_language", "foo"]
+            )
+
     # MISC TESTS
 
     def test_same_rank_pages(self):
@@ -1274,6 +1361,15 @@ class BackendTests:
         )
         self.assertFalse(stdout.getvalue())
 
+    def test_rebuild_modelsearch_index_reports_rate(self):
+        stdout = StringIO()
+        management.call_command(
+            "rebuild_modelsearch_index",
+            backend_name=self.backend_name,
+            stdout=stdout,
+        )
+        self.assertRegex(stdout.getvalue(), r"indexed \d+ objects in .*objects/s")
+
     def test_refresh_all_indexes(self):
         """
         Backends should provide a refresh_indexes method that refreshes all indexes. We don't care
@@ -1295,6 +1391,19 @@ class BackendTests:
         results = self.backend.search("harper", models.Author)
         self.assertEqual(results.count(), 1)
 
+    def test_delete_bulk(self):
+        # Delete all the novels through their root model, as the auto-update does
+        novel_ids = list(models.Novel.objects.values_list("pk", flat=True))
+        self.backend.delete_bulk(models.Book, novel_ids)
+        self.backend.get_index_for_model(models.Book).refresh()
+
+        results = self.backend.search("Foundation", models.Book)
+        self.assertEqual(results.count(), 0)
+
+        # Other books are still indexed
+        results = self.backend.search("JavaScript", models.Book)
+        self.assertEqual(results.count(), 2)
+
     def test_add_bulk(self):
         books = [
             models.Book.objects.create(
@@ -1324,6 +1433,11 @@ class BackendTests:
     MODELSEARCH_BACKENDS={"default": {"BACKEND": "modelsearch.backends.database"}}
 )
 class TestBackendLoader(TestCase):
+    def setUp(self):
+        # The backend chosen by modelsearch.backends.database depends on the
+        # (mocked) database vendor, so don't reuse instances between tests
+        reset_search_backends()
+
     @mock.patch("modelsearch.backends.database.connection")
     def test_import_by_name_unknown_db_vendor(self, connection):
         connection.vendor = "unknown"
@@ -1530,3 +1644,260 @@ class TestBackendLoader(TestCase):
         backends = list(get_search_backends())
 
         self.assertEqual(len(backends), 1)
+
+
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {"BACKEND": "modelsearch.backends.database.fallback"},
+        "another-backend": {"BACKEND": "modelsearch.backends.database.fallback"},
+    }
+)
+class TestSearchBackendRegistry(TestCase):
+    def setUp(self):
+        reset_search_backends()
+
+    def test_reuses_instance(self):
+        self.assertIs(get_search_backend("default"), get_search_backend("default"))
+
+    def test_instances_are_keyed_by_name(self):
+        self.assertIsNot(
+            get_search_backend("default"), get_search_backend("another-backend")
+        )
+
+    def test_instances_are_keyed_by_kwargs(self):
+        backend = get_search_backend("default", OPTIONS={"foo": ["bar"]})
+
+        self.assertIs(get_search_backend("default", OPTIONS={"foo": ["bar"]}), backend)
+        self.assertIsNot(
+            get_search_backend("default", OPTIONS={"foo": ["baz"]}), backend
+        )
+        self.assertIsNot(get_search_backend("default"), backend)
+
+    def test_unhashable_kwargs_are_not_shared(self):
+        options = {"connection_class": type("Unhashable", (), {"__hash__": None})()}
+
+        self.assertIsNot(
+            get_search_backend("default", OPTIONS=options),
+            get_search_backend("default", OPTIONS=options),
+        )
+
+    def test_reset(self):
+        backend = get_search_backend("default")
+
+        reset_search_backends()
+
+        self.assertIsNot(get_search_backend("default"), backend)
+
+    def test_reset_on_setting_change(self):
+        backend = get_search_backend("default")
+
+        with override_settings(
+            MODELSEARCH_BACKENDS={
+                "default": {"BACKEND": "modelsearch.backends.database.fallback"}
+            }
+        ):
+            self.assertIsNot(get_search_backend("default"), backend)
+
+    def test_stats(self):
+        registry = SearchBackendRegistry()
+
+        registry.get("default")
+        registry.get("default")
+        registry.get("another-backend")
+
+        self.assertEqual(
+            registry.stats(),
+            {"instances": 2, "instances_created": 2, "connections_created": 0},
+        )
+
+        registry.reset()
+
+        self.assertEqual(
+            registry.stats(),
+            {"instances": 0, "instances_created": 2, "connections_created": 0},
+        )
+
+    @mock.patch("modelsearch.tests.DummySearchBackend", create=True)
+    def test_counts_client_connections(self, backend_cls):
+        backend_cls.return_value.client_class = object
+        registry = SearchBackendRegistry()
+
+        registry.get("modelsearch.tests.DummySearchBackend")
+        registry.get("modelsearch.tests.DummySearchBackend")
+
+        self.assertEqual(registry.stats()["connections_created"], 1)
+
+    def test_get_search_backends_uses_registry(self):
+        backends = list(get_search_backends())
+
+        self.assertIs(backends[0], get_search_backend("default"))
+        self.assertIs(backends[1], get_search_backend("another-backend"))
+        self.assertEqual(search_backend_registry.stats()["instances"], 2)
+
+
+class TestRebuildQuerysetChunks(TestCase):
+    fixtures = ["search"]
+
+    def setUp(self):
+        self.command = RebuildCommand()
+        self.queryset = models.Book.objects.all()
+        self.expected_pks = list(
+            self.queryset.order_by("pk").values_list("pk", flat=True)
+        )
+
+    def get_chunk_pks(self, **kwargs):
+        return [
+            [obj.pk for obj in chunk]
+            for chunk in self.command.queryset_chunks(self.queryset, 5, **kwargs)
+        ]
+
+    def test_chunks_by_primary_key(self):
+        with CaptureQueriesContext(connection) as queries:
+            chunks = self.get_chunk_pks()
+
+        self.assertTrue(all(len(chunk) <= 5 for chunk in chunks))
+        self.assertEqual(sum(chunks, []), self.expected_pks)
+
+        # Chunks after the first are fetched by primary key rather than with an offset
+        selects = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(len(selects), len(chunks))
+        self.assertFalse(any("OFFSET" in sql for sql in selects))
+        self.assertTrue(all(" > " in sql for sql in selects[1:]))
+
+    def test_stream(self):
+        chunks = self.get_chunk_pks(stream=True)
+
+        self.assertTrue(all(len(chunk) == 5 for chunk in chunks[:-1]))
+        self.assertEqual(sum(chunks, []), self.expected_pks)
+
+    def test_empty_queryset(self):
+        self.queryset = models.Book.objects.none()
+
+        self.assertEqual(self.get_chunk_pks(), [])
+        self.assertEqual(self.get_chunk_pks(stream=True), [])
+
+
+class StreamingIndex:
+    """
+    An index that can stream objects, which fails to index the objects with the given
+    primary keys.
+    """
+
+    def __init__(self, failing_pks=()):
+        self.failing_pks = failing_pks
+        self.indexed_pks = []
+
+    def stream_items(self, model, items):
+        for item in items:
+            self.indexed_pks.append(item.pk)
+            yield str(item.pk), "error" if item.pk in self.failing_pks else None
+
+
+class TestRebuildStreamItems(TestCase):
+    fixtures = ["search"]
+
+    def setUp(self):
+        self.command = RebuildCommand(stdout=StringIO(), stderr=StringIO())
+        self.command.verbosity = 1
+        self.checkpoint = RebuildCheckpoint.objects.create(
+            backend_name="default", index_name="test"
+        )
+        self.expected_pks = list(
+            models.Author.objects.order_by("pk").values_list("pk", flat=True)
+        )
+
+    def test_stream_items(self):
+        index = StreamingIndex()
+
+        with mock.patch.object(
+            self.command, "save_checkpoint", wraps=self.command.save_checkpoint
+        ) as save_checkpoint:
+            object_count = self.command.stream_items(
+                "default", self.checkpoint, index, models.Author, 5
+            )
+
+        self.assertEqual(object_count, len(self.expected_pks))
+        self.assertEqual(index.indexed_pks, self.expected_pks)
+        self.assertEqual(save_checkpoint.call_count, (len(self.expected_pks) + 4) // 5)
+        self.checkpoint.refresh_from_db()
+        self.assertEqual(self.checkpoint.last_pk, str(self.expected_pks[-1]))
+
+    def test_stream_items_after_pk(self):
+        index = StreamingIndex()
+
+        self.command.stream_items(
+            "default", self.checkpoint, index, models.Author, 5, self.expected_pks[2]
+        )
+
+        self.assertEqual(index.indexed_pks, self.expected_pks[3:])
+
+    def test_failures_are_reported_together(self):
+        failing_pks = [self.expected_pks[1], self.expected_pks[7]]
+        index = StreamingIndex(failing_pks)
+
+        with self.assertRaisesMessage(
+            CommandError,
+            f"2 of {len(self.expected_pks)} searchtests.Author objects couldn't be indexed",
+        ):
+            self.command.stream_items(
+                "default", self.checkpoint, index, models.Author, 5
+            )
+
+        # Every object is sent, but the checkpoint stops before the first failure
+        self.assertEqual(index.indexed_pks, self.expected_pks)
+        self.checkpoint.refresh_from_db()
+        self.assertIsNone(self.checkpoint.last_pk)
+        self.assertEqual(self.command.stderr.getvalue().count("failed to index"), 2)
+
+
+class PerObjectDeleteIndex(BaseIndex):
+    """
+    An index that only implements deleting a single object.
+    """
+
+    def __init__(self):
+        self.deleted = []
+
+    def delete_item(self, item):
+        self.deleted.append((item._meta.model, item.pk))
+
+
+class TestBaseIndexDeleteItems(TestCase):
+    def test_delete_items_falls_back_to_delete_item(self):
+        index = PerObjectDeleteIndex()
+
+        index.delete_items(models.Book, [1, 2, 3])
+
+        self.assertEqual(
+            index.deleted, [(models.Book, 1), (models.Book, 2), (models.Book, 3)]
+        )
+
+    def test_delete_bulk_uses_delete_item(self):
+        index = PerObjectDeleteIndex()
+        backend = BaseSearchBackend({})
+
+        with mock.patch.object(backend, "get_index_for_model", return_value=index):
+            backend.delete_bulk(models.Author, [4, 5])
+
+        self.assertEqual(index.deleted, [(models.Author, 4), (models.Author, 5)])
+
+
+class TestSkippedWrites(TestCase):
+    def test_counted_from_several_threads(self):
+        backend = BaseSearchBackend({})
+
+        def add_skipped_writes():
+            for _ in range(1000):
+                backend.add_skipped_writes(1)
+
+        threads = [threading.Thread(target=add_skipped_writes) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(backend.skipped_writes, 8000)
@@ -1,8 +1,13 @@
 import unittest
 
+from collections import Counter
+from unittest import mock
+
 from django.test import TestCase
 from django.test.utils import override_settings
 
+from modelsearch import index
+from modelsearch.backends.database.indexer import BaseObjectIndexer
 from modelsearch.test.testapp import models
 
 from .test_backends import BackendTests
@@ -53,6 +58,11 @@ class TestDBBackend(BackendTests, TestCase):
     def test_search_callable_field(self):
         super().test_search_callable_field()
 
+    # Doesn't maintain an index, so objects can't be deleted from it
+    @unittest.expectedFailure
+    def test_delete_bulk(self):
+        super().test_delete_bulk()
+
     # Database backend always uses `icontains`, so always autocomplete
     @unittest.expectedFailure
     def test_incomplete_plain_text(self):
@@ -63,6 +73,11 @@ class TestDBBackend(BackendTests, TestCase):
     def test_boost(self):
         super().test_boost()
 
+    # Doesn't maintain an index, so there is nothing to rebuild
+    @unittest.expectedFailure
+    def test_rebuild_modelsearch_index_reports_rate(self):
+        super().test_rebuild_modelsearch_index_reports_rate()
+
     def test_reset_indexes(self):
         """
         After running backend.reset_indexes(), search should still return results (because there's
@@ -71,3 +86,56 @@ class TestDBBackend(BackendTests, TestCase):
         self.backend.reset_indexes()
         results = self.backend.search("JavaScript", models.Book)
         self.assertEqual(results.count(), 2)
+
+
+class TestObjectIndexer(TestCase):
+    fixtures = ["search"]
+
+    def get_indexer(self, obj):
+        return BaseObjectIndexer(obj, mock.Mock(config=None))
+
+    def test_texts(self):
+        novel = models.Novel.objects.get(title="A Game of Thrones")
+        indexer = self.get_indexer(novel)
+
+        self.assertEqual(indexer.id, str(novel.pk))
+        self.assertEqual(indexer.title, "A Game of Thrones")
+        self.assertIn("George R.R. Martin", indexer.body)
+        self.assertIn("Westeros", indexer.body)
+        self.assertIn("A Game of Thrones", indexer.autocomplete)
+        self.assertIn("Westeros", indexer.autocomplete)
+        self.assertNotIn("A Game of Thrones", indexer.body)
+
+    def test_walks_search_fields_once(self):
+        # Benchmark for indexing the Book/Novel test models. Looking up the title, body and
+        # autocomplete values used to walk every search field (and every related object)
+        # once for each of them. Now, each value is extracted once per object.
+        objs = list(models.Book.objects.all()) + list(models.Novel.objects.all())
+        get_value = index.BaseField.get_value
+        get_related_value = index.RelatedFields.get_value
+
+        with (
+            mock.patch.object(
+                index.BaseField, "get_value", autospec=True, side_effect=get_value
+            ) as field_get_value,
+            mock.patch.object(
+                index.RelatedFields,
+                "get_value",
+                autospec=True,
+                side_effect=get_related_value,
+            ) as related_get_value,
+        ):
+            for obj in objs:
+                field_get_value.reset_mock()
+                related_get_value.reset_mock()
+
+                indexer = self.get_indexer(obj)
+                indexer.title, indexer.body, indexer.autocomplete  # noqa: B018
+
+                values_extracted = Counter(
+                    (call.args[0], type(call.args[1]), call.args[1].pk)
+                    for call in field_get_value.call_args_list
+                    + related_get_value.call_args_list
+                )
+                self.assertTrue(values_extracted)
+                self.assertEqual(set(values_extracted.values()), {1})
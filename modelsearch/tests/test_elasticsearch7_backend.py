@@ -4,9 +4,12 @@ import unittest
 
 from unittest import mock
 
+from django.core.exceptions import ImproperlyConfigured
 from django.db.models import Q
 from django.test import TestCase
 
+from modelsearch import index
+from modelsearch.paginator import SearchPaginator
 from modelsearch.query import MATCH_ALL, Fuzzy, Phrase
 from modelsearch.test.testapp import models
 
@@ -15,8 +18,10 @@ from .elasticsearch_common_tests import ElasticsearchCommonSearchBackendTests
 
 try:
     from elasticsearch import VERSION as ELASTICSEARCH_VERSION
+    from elasticsearch.helpers import BulkIndexError
     from elasticsearch.serializer import JSONSerializer
 
+    from modelsearch.backends.base import SearchFieldError
     from modelsearch.backends.elasticsearch7 import Elasticsearch7SearchBackend
 except ImportError:
     ELASTICSEARCH_VERSION = (0, 0, 0)
@@ -28,8 +33,14 @@ if use_new_elasticsearch_api:
     search_query_kwargs = {
         "query": "QUERY",
     }
+    # Searches that fetch a single page also count the results
+    page_query_kwargs = {
+        "query": "QUERY",
+        "track_total_hits": 10000,
+    }
 else:
     search_query_kwargs = {"body": {"query": "QUERY"}}
+    page_query_kwargs = {"body": {"query": "QUERY", "track_total_hits": 10000}}
 
 
 @unittest.skipIf(ELASTICSEARCH_VERSION[0] != 7, "Elasticsearch 7 required")
@@ -918,10 +929,11 @@ class TestElasticsearch7SearchResults(TestCase):
         default = JSONSerializer().default
         self.assertEqual(json.dumps(a, sort_keys=True, default=default), json.dumps)
 
-    def get_results(self):
-        backend = Elasticsearch7SearchBackend({})
+    def get_results(self, params=None):
+        backend = Elasticsearch7SearchBackend(params or {})
         query = mock.MagicMock()
         query.queryset = models.Book.objects.all()
+        query.mapping = backend.mapping_class(models.Book)
         query.get_query.return_value = "QUERY"
         query.get_sort.return_value = None
         return backend.results_class(backend, query)
@@ -979,7 +991,7 @@ class TestElasticsearch7SearchResults(TestCase):
             stored_fields="pk",
             index="searchtests_book",
             size=1,
-            **search_query_kwargs,
+            **page_query_kwargs,
         )
 
     @mock.patch("elasticsearch.Elasticsearch.search")
@@ -995,7 +1007,7 @@ class TestElasticsearch7SearchResults(TestCase):
             stored_fields="pk",
             index="searchtests_book",
             size=3,
-            **search_query_kwargs,
+            **page_query_kwargs,
         )
 
     @mock.patch("elasticsearch.Elasticsearch.search")
@@ -1011,7 +1023,7 @@ class TestElasticsearch7SearchResults(TestCase):
             stored_fields="pk",
             index="searchtests_book",
             size=10,
-            **search_query_kwargs,
+            **page_query_kwargs,
         )
 
     @mock.patch("elasticsearch.Elasticsearch.search")
@@ -1028,7 +1040,7 @@ class TestElasticsearch7SearchResults(TestCase):
             stored_fields="pk",
             index="searchtests_book",
             size=1,
-            **search_query_kwargs,
+            **page_query_kwargs,
         )
 
     @mock.patch("elasticsearch.Elasticsearch.search")
@@ -1085,6 +1097,293 @@ class TestElasticsearch7SearchResults(TestCase):
         self.assertEqual(results[1], models.Book.objects.get(id=2))
         self.assertEqual(results[2], models.Book.objects.get(id=1))
 
+    def get_search_body(self, call):
+        return call.kwargs["body"] if "body" in call.kwargs else call.kwargs
+
+    def construct_search_after_response(self, results):
+        response = self.construct_search_response(results)
+        response["pit_id"] = "PIT"
+        for hit in response["hits"]["hits"]:
+            hit["sort"] = [1, hit["fields"]["pk"][0]]
+
+        return response
+
+    @mock.patch("elasticsearch.Elasticsearch.close_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.open_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_search_after(self, search, open_point_in_time, close_point_in_time):
+        open_point_in_time.return_value = {"id": "PIT"}
+        search.side_effect = [
+            self.construct_search_after_response([1, 2]),
+            self.construct_search_after_response([3]),
+        ]
+        results = self.get_results({"PAGINATION": "search_after", "PAGE_SIZE": 2})
+
+        self.assertEqual(
+            list(results), list(models.Book.objects.filter(id__in=[1, 2, 3]))
+        )
+
+        open_point_in_time.assert_called_once_with(
+            index="searchtests_book", keep_alive="2m"
+        )
+        self.assertEqual(search.call_count, 2)
+        first_call, second_call = search.call_args_list
+        self.assertEqual(first_call.kwargs["size"], 2)
+        self.assertNotIn("index", first_call.kwargs)
+        first_body = self.get_search_body(first_call)
+        self.assertEqual(first_body["pit"]["id"], "PIT")
+        self.assertEqual(first_body["pit"]["keep_alive"], "2m")
+        self.assertEqual(first_body["sort"], ["_score", {"pk": "asc"}])
+        self.assertEqual(self.get_search_body(second_call)["search_after"], [1, "2"])
+        close_point_in_time.assert_called_once_with(body={"id": "PIT"})
+
+    @mock.patch("elasticsearch.Elasticsearch.close_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.open_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_search_after_starts_from_offset(
+        self, search, open_point_in_time, close_point_in_time
+    ):
+        open_point_in_time.return_value = {"id": "PIT"}
+        search.side_effect = [
+            self.construct_search_after_response([4, 5]),
+            self.construct_search_after_response([]),
+        ]
+        results = self.get_results({"PAGINATION": "search_after", "PAGE_SIZE": 2})[3:]
+
+        expected = list(models.Book.objects.filter(id__in=[4, 5]))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(list(results), expected)
+
+        # The offset is within max_result_window, so the first request starts from it
+        first_call, second_call = search.call_args_list
+        self.assertEqual(first_call.kwargs["from_"], 3)
+        self.assertEqual(first_call.kwargs["size"], 2)
+        self.assertNotIn("from_", second_call.kwargs)
+        self.assertEqual(self.get_search_body(second_call)["search_after"], [1, "5"])
+        close_point_in_time.assert_called_once()
+
+    @mock.patch("elasticsearch.Elasticsearch.close_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.open_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_search_after_skips_offset_beyond_window_without_loading_objects(
+        self, search, open_point_in_time, close_point_in_time
+    ):
+        open_point_in_time.return_value = {"id": "PIT"}
+        search.side_effect = [
+            self.construct_search_after_response([1, 2, 3]),
+            self.construct_search_after_response([4, 5]),
+            self.construct_search_after_response([]),
+        ]
+        results = self.get_results({"PAGINATION": "search_after", "PAGE_SIZE": 2})[3:]
+        results.backend.max_result_window = 4
+
+        expected = list(models.Book.objects.filter(id__in=[4, 5]))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(list(results), expected)
+
+        # Skipping to the offset then reading a page would go past max_result_window, so
+        # the results before it are walked over with search_after
+        self.assertEqual(
+            [call.kwargs["size"] for call in search.call_args_list], [3, 2, 2]
+        )
+        self.assertFalse(any("from_" in call.kwargs for call in search.call_args_list))
+        close_point_in_time.assert_called_once()
+
+    @mock.patch("elasticsearch.Elasticsearch.close_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.open_point_in_time")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_search_after_closes_point_in_time_when_abandoned(
+        self, search, open_point_in_time, close_point_in_time
+    ):
+        open_point_in_time.return_value = {"id": "PIT"}
+        search.return_value = self.construct_search_after_response([1, 2])
+        results = self.get_results({"PAGINATION": "search_after", "PAGE_SIZE": 2})
+
+        generator = results._do_search()
+        next(generator)
+        close_point_in_time.assert_not_called()
+
+        generator.close()
+        close_point_in_time.assert_called_once_with(body={"id": "PIT"})
+
+    def construct_values_response(self, sources):
+        response = self.construct_search_response(list(sources))
+        for hit in response["hits"]["hits"]:
+            hit["_source"] = sources[int(hit["fields"]["pk"][0])]
+
+        return response
+
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_values(self, search):
+        search.return_value = self.construct_values_response(
+            {
+                1: {
+                    "title_filter": "A Game of Thrones",
+                    "publication_date_filter": "1996-08-01",
+                },
+                2: {
+                    "title_filter": "A Clash of Kings",
+                    "publication_date_filter": None,
+                },
+            }
+        )
+        results = self.get_results().values("pk", "title", "publication_date")
+
+        with self.assertNumQueries(0):
+            rows = list(results)
+
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "pk": 1,
+                    "title": "A Game of Thrones",
+                    "publication_date": datetime.date(1996, 8, 1),
+                },
+                {"pk": 2, "title": "A Clash of Kings", "publication_date": None},
+            ],
+        )
+        self.assertEqual(
+            search.call_args.kwargs["_source"],
+            ["title_filter", "publication_date_filter"],
+        )
+
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_values_with_score(self, search):
+        search.return_value = self.construct_values_response(
+            {1: {"title_filter": "A Game of Thrones"}}
+        )
+        results = self.get_results().annotate_score("_score").values("title")
+
+        self.assertEqual(list(results), [{"title": "A Game of Thrones", "_score": 1}])
+
+    def test_values_of_unindexed_field(self):
+        with self.assertRaises(SearchFieldError):
+            list(self.get_results().values("title", "isbn"))
+
+    @mock.patch("elasticsearch.Elasticsearch.count")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_count_from_search(self, search, count):
+        search.return_value = self.construct_search_response([1, 2])
+        search.return_value["hits"]["total"] = {"value": 12, "relation": "eq"}
+        results = self.get_results()[10:]
+
+        list(results)
+
+        self.assertEqual(results.count(), 2)
+        count.assert_not_called()
+
+    @mock.patch("elasticsearch.Elasticsearch.count")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_count_when_total_hits_are_capped(self, search, count):
+        search.return_value = self.construct_search_response([1, 2])
+        search.return_value["hits"]["total"] = {"value": 2, "relation": "gte"}
+        count.return_value = {"count": 20000}
+        results = self.get_results({"TRACK_TOTAL_HITS": 2})[:2]
+
+        list(results)
+
+        self.assertEqual(self.get_search_body(search.call_args)["track_total_hits"], 2)
+        self.assertEqual(results.count(), 2)
+        self.assertEqual(self.get_results({"TRACK_TOTAL_HITS": 2}).count(), 20000)
+        count.assert_called_once()
+
+    @mock.patch("elasticsearch.Elasticsearch.count")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_search_paginator(self, search, count):
+        search.return_value = self.construct_search_response([6, 7])
+        search.return_value["hits"]["total"] = {"value": 7, "relation": "eq"}
+        paginator = SearchPaginator(self.get_results(), 5)
+
+        page = paginator.page(2)
+
+        self.assertEqual(list(page), list(models.Book.objects.filter(id__in=[6, 7])))
+        self.assertEqual(paginator.count, 7)
+        self.assertEqual(paginator.num_pages, 2)
+        search.assert_called_once()
+        self.assertEqual(search.call_args.kwargs["from_"], 5)
+        self.assertEqual(search.call_args.kwargs["size"], 5)
+        count.assert_not_called()
+
+        # The paginator needs the exact count, so it isn't capped like other searches
+        self.assertIs(self.get_search_body(search.call_args)["track_total_hits"], True)
+
+    @mock.patch("elasticsearch.Elasticsearch.count")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_facets_with_page_of_results(self, search, count):
+        search.return_value = self.construct_search_response([1, 2])
+        search.return_value["hits"]["total"] = {"value": 12, "relation": "eq"}
+        search.return_value["aggregations"] = {
+            "title": {"buckets": [{"key": "A Game of Thrones", "doc_count": 1}]},
+            "number_of_pages": {
+                "buckets": [{"key": 694, "doc_count": 1}, {"key": 0, "doc_count": 2}]
+            },
+        }
+        results = self.get_results()[:2]
+        results.query_compiler._get_filterable_field.side_effect = {
+            field.field_name: field
+            for field in models.Book.get_filterable_search_fields()
+        }.get
+
+        facets = results.facets(["title", "number_of_pages"])
+
+        self.assertEqual(list(facets["title"].items()), [("A Game of Thrones", 1)])
+        self.assertEqual(list(facets["number_of_pages"].items()), [(694, 1), (None, 2)])
+
+        # The page of results and the count came back with the facets
+        with self.assertNumQueries(0):
+            self.assertEqual([book.pk for book in results], [1, 2])
+        self.assertEqual(results.count(), 2)
+        search.assert_called_once()
+        count.assert_not_called()
+
+        body = self.get_search_body(search.call_args)
+        self.assertEqual(
+            list(body["aggregations"]["number_of_pages"]["terms"].items()),
+            [("field", "number_of_pages_filter"), ("missing", 0)],
+        )
+        self.assertEqual(search.call_args.kwargs["size"], 2)
+
+    @mock.patch("elasticsearch.Elasticsearch.msearch")
+    @mock.patch("elasticsearch.Elasticsearch.search")
+    def test_multi_search(self, search, msearch):
+        msearch.return_value = {
+            "responses": [
+                self.construct_search_response([1, 2]),
+                {"error": {"type": "search_phase_execution_exception"}, "status": 400},
+            ]
+        }
+        search.return_value = self.construct_search_response([3])
+        page = self.get_results()[:2]
+        failing_page = self.get_results()[2:4]
+        unsliced = self.get_results()
+
+        results = page.backend.multi_search([page, failing_page, unsliced])
+
+        self.assertEqual(results, [page, failing_page, unsliced])
+        msearch.assert_called_once()
+        searches = msearch.call_args.kwargs["body"]
+        self.assertEqual(len(searches), 4)
+        self.assertEqual(searches[0]["index"], "searchtests_book")
+        self.assertEqual(searches[1]["from"], 0)
+        self.assertEqual(searches[1]["size"], 2)
+        self.assertEqual(searches[1]["stored_fields"], ["pk"])
+        self.assertEqual(searches[3]["from"], 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([book.pk for book in page], [1, 2])
+
+        # The failed search and the unsliced results were searched for separately
+        self.assertEqual(search.call_count, 2)
+        self.assertEqual([book.pk for book in failing_page], [3])
+        self.assertEqual([book.pk for book in unsliced], [3])
+
+    def test_unknown_pagination(self):
+        with self.assertRaises(ImproperlyConfigured):
+            Elasticsearch7SearchBackend({"PAGINATION": "cursor"})
+
 
 @unittest.skipIf(ELASTICSEARCH_VERSION[0] != 7, "Elasticsearch 7 required")
 class TestElasticsearch7Mapping(TestCase):
@@ -1118,6 +1417,7 @@ class TestElasticsearch7Mapping(TestCase):
             "properties": {
                 "pk": {"type": "keyword", "store": True},
                 "_django_content_type": {"type": "keyword"},
+                "_fingerprint": {"type": "keyword", "index": False},
                 "_all_text": {"type": "text"},
                 "_all_text_boost_10_0": {"type": "text"},
                 "_all_text_boost_2_0": {"type": "text"},
@@ -1207,6 +1507,344 @@ class TestElasticsearch7Mapping(TestCase):
 
         self.assertDictEqual(document, expected_result)
 
+    def test_get_document_fingerprint(self):
+        fingerprint = self.es_mapping.get_document_fingerprint(
+            self.es_mapping.get_document(self.obj)
+        )
+        self.assertEqual(
+            self.es_mapping.get_document_fingerprint(
+                self.es_mapping.get_document(models.Book.objects.get(id=4))
+            ),
+            fingerprint,
+        )
+
+        self.obj.title = "The Two Towers"
+        self.assertNotEqual(
+            self.es_mapping.get_document_fingerprint(
+                self.es_mapping.get_document(self.obj)
+            ),
+            fingerprint,
+        )
+
+    def test_column_names_are_shared_by_equivalent_fields(self):
+        mapping = Elasticsearch7SearchBackend.mapping_class.for_model(models.Book)
+        mapping.get_field_column_name(index.SearchField("title"))
+        column_name_count = len(mapping._column_names)
+
+        for _ in range(3):
+            self.assertEqual(
+                mapping.get_field_column_name(index.SearchField("title")), "title"
+            )
+
+        self.assertEqual(len(mapping._column_names), column_name_count)
+
+    def test_for_model(self):
+        mapping_class = Elasticsearch7SearchBackend.mapping_class
+        mapping = mapping_class.for_model(models.Book)
+
+        self.assertIs(mapping_class.for_model(models.Book), mapping)
+        self.assertIs(
+            index.get_search_plan(models.Book).mappings[mapping_class], mapping
+        )
+        self.assertIsNot(mapping_class.for_model(models.Novel), mapping)
+        self.assertIs(mapping_class.for_model(models.Novel).get_parent(), mapping)
+
+        # Changing the search fields gives a new mapping
+        with mock.patch.object(
+            models.Book, "search_fields", [index.SearchField("title")]
+        ):
+            changed_mapping = mapping_class.for_model(models.Book)
+            self.assertIsNot(changed_mapping, mapping)
+            self.assertEqual(
+                list(changed_mapping.get_mapping()["properties"]),
+                [
+                    "pk",
+                    "_django_content_type",
+                    "_fingerprint",
+                    "_edgengrams",
+                    "title",
+                    "_all_text",
+                ],
+            )
+
+    def test_get_document_uses_precomputed_fields(self):
+        mapping = Elasticsearch7SearchBackend.mapping_class.for_model(models.Novel)
+        novel = models.Novel.objects.get(id=1)
+        document = mapping.get_document(novel)
+
+        with (
+            mock.patch.object(
+                type(mapping), "_get_field_column_name"
+            ) as get_field_column_name,
+            mock.patch(
+                "modelsearch.backends.elasticsearchbase.get_model_root"
+            ) as get_model_root,
+        ):
+            self.assertDictEqual(mapping.get_document(novel), document)
+
+        get_field_column_name.assert_not_called()
+        get_model_root.assert_not_called()
+
+    def test_get_mapping_returns_a_copy(self):
+        mapping = Elasticsearch7SearchBackend.mapping_class.for_model(models.Book)
+        mapping.get_mapping()["properties"].clear()
+
+        self.assertIn("title", mapping.get_mapping()["properties"])
+
+
+@unittest.skipIf(ELASTICSEARCH_VERSION[0] != 7, "Elasticsearch 7 required")
+class TestElasticsearch7Index(TestCase):
+    fixtures = ["search"]
+
+    def setUp(self):
+        self.backend = Elasticsearch7SearchBackend({})
+        self.index = self.backend.get_index_for_model(models.Book)
+        self.mapping = self.backend.mapping_class(models.Book)
+
+    def get_fingerprint(self, book):
+        return self.mapping.get_document_fingerprint(self.mapping.get_document(book))
+
+    def fake_bulk(self, failing_ids=()):
+        """
+        Returns a stand-in for the bulk API, which fails to index documents with the
+        given IDs.
+        """
+
+        def bulk(body, **kwargs):
+            actions = [json.loads(line) for line in body.splitlines()[::2]]
+            items = []
+            for action in actions:
+                document_id = action["index"]["_id"]
+                if document_id in failing_ids:
+                    items.append(
+                        {
+                            "index": {
+                                "_id": document_id,
+                                "status": 400,
+                                "error": {"type": "mapper_parsing_exception"},
+                            }
+                        }
+                    )
+                else:
+                    items.append({"index": {"_id": document_id, "status": 201}})
+
+            return {"errors": bool(failing_ids), "items": items}
+
+        return bulk
+
+    def get_sent_documents(self, bulk):
+        return [
+            [json.loads(line) for line in call.kwargs["body"].splitlines()[1::2]]
+            for call in bulk.call_args_list
+        ]
+
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    @mock.patch("elasticsearch.Elasticsearch.mget")
+    def test_add_items_skips_unchanged_documents(self, mget, bulk):
+        bulk.side_effect = self.fake_bulk()
+        books = list(models.Book.objects.filter(id__in=[4, 5]).order_by("id"))
+        mget.return_value = {
+            "docs": [
+                {
+                    "_id": "4",
+                    "found": True,
+                    "_source": {"_fingerprint": self.get_fingerprint(books[0])},
+                },
+                {"_id": "5", "found": False},
+            ]
+        }
+
+        self.index.add_items(models.Book, books)
+
+        self.assertEqual(self.backend.skipped_writes, 1)
+        [documents] = self.get_sent_documents(bulk)
+        self.assertEqual([document["pk"] for document in documents], ["5"])
+        self.assertEqual(documents[0]["_fingerprint"], self.get_fingerprint(books[1]))
+
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    @mock.patch("elasticsearch.Elasticsearch.mget")
+    def test_add_items_when_not_skipping_unchanged_documents(self, mget, bulk):
+        bulk.side_effect = self.fake_bulk()
+        self.index.skip_unchanged = False
+        books = list(models.Book.objects.filter(id__in=[4, 5]).order_by("id"))
+
+        self.index.add_items(models.Book, books)
+
+        mget.assert_not_called()
+        self.assertEqual(self.backend.skipped_writes, 0)
+        self.assertEqual(len(self.get_sent_documents(bulk)[0]), 2)
+
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    def test_stream_items_limits_requests(self, bulk):
+        bulk.side_effect = self.fake_bulk()
+        self.index.skip_unchanged = False
+        self.backend.bulk_chunk_size = 2
+        books = models.Book.objects.order_by("id")
+
+        results = list(self.index.stream_items(models.Book, books.iterator()))
+
+        self.assertEqual(results, [(str(book.pk), None) for book in books])
+        self.assertEqual(
+            [len(documents) for documents in self.get_sent_documents(bulk)],
+            [2, 2, 2, 2, 2, 2, 2],
+        )
+
+        # Requests are split when they would go over the size limit too
+        bulk.reset_mock()
+        self.backend.bulk_max_bytes = 1
+        list(self.index.stream_items(models.Book, books.iterator()))
+        self.assertEqual(bulk.call_count, books.count())
+
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    def test_add_items_reports_each_failed_document(self, bulk):
+        bulk.side_effect = self.fake_bulk(failing_ids={"4", "14"})
+        self.index.skip_unchanged = False
+        self.backend.bulk_chunk_size = 5
+        books = list(models.Book.objects.order_by("id"))
+
+        with self.assertRaises(BulkIndexError) as context:
+            self.index.add_items(models.Book, books)
+
+        # Every document is sent, even after a request with failures
+        self.assertEqual(
+            sum(len(documents) for documents in self.get_sent_documents(bulk)),
+            len(books),
+        )
+        self.assertEqual(
+            [error["index"]["_id"] for error in context.exception.errors],
+            ["4", "14"],
+        )
+        self.assertEqual(
+            context.exception.errors[0]["index"]["error"],
+            {"type": "mapper_parsing_exception"},
+        )
+
+    @mock.patch("elasticsearch.Elasticsearch.index")
+    @mock.patch("elasticsearch.Elasticsearch.mget")
+    def test_add_item_skips_unchanged_document(self, mget, index):
+        book = models.Book.objects.get(id=4)
+        mget.return_value = {
+            "docs": [
+                {
+                    "_id": "4",
+                    "found": True,
+                    "_source": {"_fingerprint": self.get_fingerprint(book)},
+                }
+            ]
+        }
+
+        self.index.add_item(book)
+
+        index.assert_not_called()
+        self.assertEqual(self.backend.skipped_writes, 1)
+
+    @mock.patch("elasticsearch.Elasticsearch.delete")
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    def test_delete_items(self, bulk, delete):
+        bulk.return_value = {
+            "errors": True,
+            "items": [
+                {"delete": {"_id": "4", "status": 200}},
+                {"delete": {"_id": "5", "status": 404}},
+            ],
+        }
+
+        self.index.delete_items(models.Book, [4, 5])
+
+        delete.assert_not_called()
+        bulk.assert_called_once()
+        actions = [
+            json.loads(line) for line in bulk.call_args.kwargs["body"].splitlines()
+        ]
+        self.assertEqual(actions, [{"delete": {"_id": "4"}}, {"delete": {"_id": "5"}}])
+
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    def test_delete_item(self, bulk):
+        bulk.return_value = {
+            "errors": False,
+            "items": [{"delete": {"_id": "4", "status": 200}}],
+        }
+
+        self.index.delete_item(models.Book.objects.get(id=4))
+
+        bulk.assert_called_once()
+        self.assertEqual(
+            json.loads(bulk.call_args.kwargs["body"]), {"delete": {"_id": "4"}}
+        )
+
+
+@unittest.skipIf(ELASTICSEARCH_VERSION[0] != 7, "Elasticsearch 7 required")
+class TestElasticsearch7Rebuilders(TestCase):
+    fixtures = ["search"]
+
+    def get_backend(self, **params):
+        backend = Elasticsearch7SearchBackend(params)
+        backend.es = mock.MagicMock()
+        return backend
+
+    def test_resume(self):
+        backend = self.get_backend(ATOMIC_REBUILD=False)
+        index = backend.get_index_for_model(models.Book)
+        rebuilder = backend.rebuilder_class(index)
+
+        self.assertIs(rebuilder.resume(index.name), index)
+        backend.es.indices.delete.assert_not_called()
+
+    def test_atomic_resume(self):
+        backend = self.get_backend()
+        alias = backend.get_index_for_model(models.Book)
+        rebuilder = backend.rebuilder_class(alias)
+        backend.es.indices.exists.return_value = True
+        backend.es.indices.exists_alias.return_value = False
+
+        target_index = rebuilder.resume(alias.name + "_abcdefg")
+
+        # The interrupted rebuild's index is filled in, then replaces the alias
+        self.assertEqual(target_index.name, alias.name + "_abcdefg")
+        self.assertIs(rebuilder.index, target_index)
+        backend.es.indices.exists.assert_called_once_with(alias.name + "_abcdefg")
+        backend.es.indices.create.assert_not_called()
+
+        rebuilder.finish()
+        backend.es.indices.put_alias.assert_called_once_with(
+            name=alias.name, index=alias.name + "_abcdefg"
+        )
+
+    @mock.patch("elasticsearch.Elasticsearch.mget")
+    @mock.patch("elasticsearch.Elasticsearch.bulk")
+    def test_rebuilt_indexes_dont_look_up_fingerprints(self, bulk, mget):
+        backend = Elasticsearch7SearchBackend({})
+        bulk.return_value = {"errors": False, "items": []}
+        books = list(models.Book.objects.all())
+
+        for rebuilder_class in [
+            backend.basic_rebuilder_class,
+            backend.atomic_rebuilder_class,
+        ]:
+            rebuilder = rebuilder_class(backend.get_index_for_model(models.Book))
+            with (
+                mock.patch("elasticsearch.client.IndicesClient.create"),
+                mock.patch("elasticsearch.client.IndicesClient.delete"),
+            ):
+                index = rebuilder.start()
+
+            index.add_items(models.Book, books)
+
+        index = backend.get_index_by_key(index.name, rebuilding=True)
+        index.add_items(models.Book, books)
+
+        mget.assert_not_called()
+        self.assertEqual(bulk.call_count, 3)
+
+    def test_atomic_resume_without_index(self):
+        backend = self.get_backend()
+        alias = backend.get_index_for_model(models.Book)
+        rebuilder = backend.rebuilder_class(alias)
+        backend.es.indices.exists.return_value = False
+
+        self.assertIsNone(rebuilder.resume(alias.name + "_abcdefg"))
+        self.assertNotEqual(rebuilder.index.name, alias.name + "_abcdefg")
+
 
 @unittest.skipIf(ELASTICSEARCH_VERSION[0] != 7, "Elasticsearch 7 required")
 class TestElasticsearch7MappingInheritance(TestCase):
@@ -1269,6 +1907,7 @@ class TestElasticsearch7MappingInheritance(TestCase):
                 # Inherited
                 "pk": {"type": "keyword", "store": True},
                 "_django_content_type": {"type": "keyword"},
+                "_fingerprint": {"type": "keyword", "index": False},
                 "_all_text": {"type": "text"},
                 "_all_text_boost_0_25": {"type": "text"},
                 "_all_text_boost_0_5": {"type": "text"},
@@ -1,9 +1,10 @@
 from datetime import date
 from unittest import mock
 
-from django.test import TestCase, override_settings
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
 
-from modelsearch import index
+from modelsearch import index, tasks
 from modelsearch.test.testapp import models
 
 
@@ -37,6 +38,77 @@ class TestGetIndexedInstance(TestCase):
         indexed_instance = index.get_indexed_instance(obj.book_ptr)
         self.assertIsNone(indexed_instance)
 
+    def test_skips_check_for_default_indexed_objects(self):
+        obj = models.Author.objects.get(id=1)
+
+        # Author doesn't override get_indexed_objects, so it must be indexed
+        with self.assertNumQueries(0):
+            indexed_instance = index.get_indexed_instance(obj)
+
+        self.assertEqual(indexed_instance, obj)
+
+    def test_checks_custom_indexed_objects(self):
+        obj = models.Novel.objects.get(id=1)
+
+        with mock.patch.object(models.Novel, "get_indexed_instance", lambda self: self):
+            with self.assertNumQueries(1):
+                indexed_instance = index.get_indexed_instance(obj)
+
+        self.assertEqual(indexed_instance, obj)
+
+    def test_unsaved_instance(self):
+        obj = models.Author(name="Test")
+
+        self.assertIsNone(index.get_indexed_instance(obj))
+        self.assertEqual(index.get_indexed_instance(obj, check_exists=False), obj)
+
+    def test_has_custom_indexed_objects(self):
+        self.assertFalse(index.has_custom_indexed_objects(models.Author))
+        self.assertTrue(index.has_custom_indexed_objects(models.Book))
+        self.assertTrue(index.has_custom_indexed_objects(models.Novel))
+
+
+class TestGetIndexedInstances(TestCase):
+    fixtures = ["search"]
+
+    def test_gets_specific_classes(self):
+        books = models.Book.objects.filter(id__in=[1, 11, 16]).order_by("id")
+
+        indexed_instances = index.get_indexed_instances(books)
+
+        self.assertEqual(
+            [type(obj) for obj in indexed_instances],
+            [models.Novel, models.ProgrammingGuide, models.Book],
+        )
+
+    def test_checks_indexed_objects_in_one_query(self):
+        blocked = models.Novel.objects.create(
+            title="Don't index me!",
+            publication_date=date(2017, 10, 18),
+            number_of_pages=100,
+        )
+        novels = list(models.Novel.objects.filter(id__in=[1, 2, blocked.id]))
+
+        with mock.patch.object(models.Novel, "get_indexed_instance", lambda self: self):
+            with self.assertNumQueries(1):
+                indexed_instances = index.get_indexed_instances(novels)
+
+        self.assertCountEqual(indexed_instances, novels[:2])
+
+    def test_no_queries_for_default_indexed_objects(self):
+        authors = list(models.Author.objects.all())
+
+        with self.assertNumQueries(0):
+            indexed_instances = index.get_indexed_instances(authors)
+
+        self.assertEqual(indexed_instances, authors)
+
+    def test_without_check_exists(self):
+        obj = models.Author(name="Test")
+
+        self.assertEqual(index.get_indexed_instances([obj]), [])
+        self.assertEqual(index.get_indexed_instances([obj], check_exists=False), [obj])
+
 
 @mock.patch("modelsearch.tests.DummySearchBackend", create=True)
 @override_settings(
@@ -132,6 +204,141 @@ class TestRemoveObject(TestCase):
         self.assertIn("ValueError: Test", cm.output[0])
 
 
+@mock.patch("modelsearch.tests.DummySearchBackend", create=True)
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {"BACKEND": "modelsearch.tests.DummySearchBackend"}
+    }
+)
+class TestInsertOrUpdateObjects(TestCase):
+    fixtures = ["search"]
+
+    def test_inserts_objects(self, backend):
+        backend().reset_mock()
+
+        index.insert_or_update_objects(models.Author, [1, 2])
+
+        backend().add_bulk.assert_called_once_with(
+            models.Author, list(models.Author.objects.filter(pk__in=[1, 2]))
+        )
+
+    def test_groups_by_specific_class(self, backend):
+        backend().reset_mock()
+
+        index.insert_or_update_objects(models.Book, [1, 11])
+
+        self.assertEqual(
+            {call.args[0] for call in backend().add_bulk.mock_calls},
+            {models.Novel, models.ProgrammingGuide},
+        )
+
+    def test_skips_objects_not_in_indexed_objects(self, backend):
+        obj = models.Novel.objects.create(
+            title="Don't index me!",
+            publication_date=date(2017, 10, 18),
+            number_of_pages=100,
+        )
+        backend().reset_mock()
+
+        index.insert_or_update_objects(models.Book, [obj.pk])
+
+        self.assertFalse(backend().add_bulk.mock_calls)
+
+    def test_loads_objects_in_one_query(self, backend):
+        backend().reset_mock()
+
+        # Author doesn't override get_indexed_instance so the objects don't need to be
+        # loaded twice
+        with self.assertNumQueries(1):
+            index.insert_or_update_objects(models.Author, [1, 2])
+
+        self.assertEqual(len(backend().add_bulk.call_args[0][1]), 2)
+
+    def test_loads_specific_classes_through_indexed_objects(self, backend):
+        backend().reset_mock()
+        pks = list(models.Novel.objects.values_list("pk", flat=True))
+
+        index.insert_or_update_objects(models.Book, pks)
+
+        backend().add_bulk.assert_called_once()
+        model, objs = backend().add_bulk.call_args[0]
+        self.assertEqual(model, models.Novel)
+        self.assertCountEqual([obj.pk for obj in objs], pks)
+
+        # The related objects selected by Novel.get_indexed_objects were loaded with them
+        with self.assertNumQueries(0):
+            related = [(list(obj.characters.all()), obj.protagonist) for obj in objs]
+
+        self.assertEqual(len(related), len(objs))
+
+    def test_task(self, backend):
+        backend().reset_mock()
+
+        tasks.insert_or_update_objects_task.call("searchtests", "author", ["1", "2"])
+
+        backend().add_bulk.assert_called_once_with(
+            models.Author, list(models.Author.objects.filter(pk__in=[1, 2]))
+        )
+
+    def test_catches_index_error(self, backend):
+        backend().add_bulk.side_effect = ValueError("Test")
+        backend().reset_mock()
+
+        with self.assertLogs("modelsearch.index", level="ERROR") as cm:
+            index.insert_or_update_objects(models.Author, [1, 2])
+
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn(
+            "Exception raised while adding 2 Author objects into the 'default' search backend",
+            cm.output[0],
+        )
+        self.assertIn("ValueError: Test", cm.output[0])
+
+
+@mock.patch("modelsearch.tests.DummySearchBackend", create=True)
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {"BACKEND": "modelsearch.tests.DummySearchBackend"}
+    }
+)
+class TestRemoveObjects(TestCase):
+    def test_removes_objects(self, backend):
+        index.remove_objects(models.Book, [1, 2])
+
+        backend().delete_bulk.assert_called_once_with(models.Book, [1, 2])
+
+    def test_does_nothing_without_pks(self, backend):
+        index.remove_objects(models.Book, [])
+
+        self.assertFalse(backend().delete_bulk.mock_calls)
+
+    def test_catches_index_error(self, backend):
+        backend().delete_bulk.side_effect = ValueError("Test")
+
+        with self.assertLogs("modelsearch.index", level="ERROR") as cm:
+            index.remove_objects(models.Book, [1, 2])
+
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn(
+            "Exception raised while deleting 2 Book objects from the 'default' search backend",
+            cm.output[0],
+        )
+        self.assertIn("ValueError: Test", cm.output[0])
+
+
+@mock.patch("modelsearch.tests.DummySearchBackend", create=True)
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {"BACKEND": "modelsearch.tests.DummySearchBackend"}
+    }
+)
+class TestRemoveObjectsTask(TestCase):
+    def test_task(self, backend):
+        tasks.remove_objects_task.call("searchtests", "book", ["1", "2"])
+
+        backend().delete_bulk.assert_called_once_with(models.Book, ["1", "2"])
+
+
 @mock.patch("modelsearch.tests.DummySearchBackend", create=True)
 @override_settings(
     MODELSEARCH_BACKENDS={
@@ -145,62 +352,73 @@ class TestSignalHandlers(TestCase):
             obj = models.Book.objects.create(
                 title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
             )
-        backend().add.assert_called_with(obj)
+        backend().add_bulk.assert_called_with(models.Book, [obj])
 
     def test_index_on_create_with_uuid_primary_key(self, backend):
         backend().reset_mock()
         with self.captureOnCommitCallbacks(execute=True):
             obj = models.AdvertWithCustomUUIDPrimaryKey.objects.create(text="Test")
-        backend().add.assert_called_with(obj)
+        backend().add_bulk.assert_called_with(
+            models.AdvertWithCustomUUIDPrimaryKey, [obj]
+        )
 
     def test_index_on_update(self, backend):
-        obj = models.Book.objects.create(
-            title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.Book.objects.create(
+                title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
+            )
 
         backend().reset_mock()
         obj.title = "Updated test"
         with self.captureOnCommitCallbacks(execute=True):
             obj.save()
 
-        self.assertEqual(backend().add.call_count, 1)
-        indexed_object = backend().add.call_args[0][0]
+        self.assertEqual(backend().add_bulk.call_count, 1)
+        indexed_object = backend().add_bulk.call_args[0][1][0]
         self.assertEqual(indexed_object.title, "Updated test")
 
     def test_index_on_update_with_uuid_primary_key(self, backend):
-        obj = models.AdvertWithCustomUUIDPrimaryKey.objects.create(text="Test")
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.AdvertWithCustomUUIDPrimaryKey.objects.create(text="Test")
 
         backend().reset_mock()
         obj.text = "Updated test"
         with self.captureOnCommitCallbacks(execute=True):
             obj.save()
 
-        self.assertEqual(backend().add.call_count, 1)
-        indexed_object = backend().add.call_args[0][0]
+        self.assertEqual(backend().add_bulk.call_count, 1)
+        indexed_object = backend().add_bulk.call_args[0][1][0]
         self.assertEqual(indexed_object.text, "Updated test")
 
     def test_index_on_delete(self, backend):
-        obj = models.Book.objects.create(
-            title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.Book.objects.create(
+                title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
+            )
+        obj_id = obj.pk
 
         backend().reset_mock()
         with self.captureOnCommitCallbacks(execute=True):
             obj.delete()
-        backend().delete.assert_called_with(obj)
+        backend().delete_bulk.assert_called_with(models.Book, [str(obj_id)])
 
     def test_index_on_delete_with_uuid_primary_key(self, backend):
-        obj = models.AdvertWithCustomUUIDPrimaryKey.objects.create(text="Test")
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.AdvertWithCustomUUIDPrimaryKey.objects.create(text="Test")
+        obj_id = obj.pk
 
         backend().reset_mock()
         with self.captureOnCommitCallbacks(execute=True):
             obj.delete()
-        backend().delete.assert_called_with(obj)
+        backend().delete_bulk.assert_called_with(
+            models.AdvertWithCustomUUIDPrimaryKey, [str(obj_id)]
+        )
 
     def test_do_not_index_fields_omitted_from_update_fields(self, backend):
-        obj = models.Book.objects.create(
-            title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.Book.objects.create(
+                title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
+            )
 
         backend().reset_mock()
         obj.title = "Updated test"
@@ -208,11 +426,291 @@ class TestSignalHandlers(TestCase):
         with self.captureOnCommitCallbacks(execute=True):
             obj.save(update_fields=["title"])
 
-        self.assertEqual(backend().add.call_count, 1)
-        indexed_object = backend().add.call_args[0][0]
+        self.assertEqual(backend().add_bulk.call_count, 1)
+        indexed_object = backend().add_bulk.call_args[0][1][0]
         self.assertEqual(indexed_object.title, "Updated test")
         self.assertEqual(indexed_object.publication_date, date(2017, 10, 18))
 
+    def test_do_not_index_when_update_fields_arent_indexed(self, backend):
+        obj = models.Author.objects.create(name="Test")
+
+        backend().reset_mock()
+        obj.date_of_birth = date(2001, 10, 19)
+        with (
+            mock.patch.object(
+                models.Author, "search_fields", [index.SearchField("name")]
+            ),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            obj.save(update_fields=["date_of_birth"])
+
+        backend().add_bulk.assert_not_called()
+
+    def test_index_when_update_fields_are_filter_fields(self, backend):
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.Author.objects.create(name="Test")
+
+        backend().reset_mock()
+        obj.date_of_birth = date(2001, 10, 19)
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.save(update_fields=["date_of_birth"])
+
+        backend().add_bulk.assert_called_with(models.Author, [obj])
+
+    def test_index_when_update_fields_are_callable_dependencies(self, backend):
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.Author.objects.create(name="Test")
+
+        backend().reset_mock()
+        obj.date_of_birth = date(2001, 10, 19)
+        with (
+            mock.patch.object(
+                models.Author,
+                "search_fields",
+                [index.SearchField("__str__", depends_on=["date_of_birth"])],
+            ),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            obj.save(update_fields=["date_of_birth"])
+
+        self.assertEqual(backend().add_bulk.call_count, 1)
+
+    def test_index_when_callable_dependencies_are_unknown(self, backend):
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = models.Author.objects.create(name="Test")
+
+        backend().reset_mock()
+        obj.date_of_birth = date(2001, 10, 19)
+        with (
+            mock.patch.object(
+                models.Author, "search_fields", [index.SearchField("__str__")]
+            ),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            obj.save(update_fields=["date_of_birth"])
+
+        self.assertEqual(backend().add_bulk.call_count, 1)
+
+    def test_index_when_update_fields_are_indexed_by_subclass(self, backend):
+        with self.captureOnCommitCallbacks(execute=True):
+            novel = models.Novel.objects.create(
+                title="Test",
+                setting="Test",
+                publication_date=date(2017, 10, 18),
+                number_of_pages=100,
+            )
+        book = models.Book.objects.get(pk=novel.pk)
+
+        # The object is indexed as a Novel, which indexes the title
+        backend().reset_mock()
+        with (
+            mock.patch.object(
+                models.Book, "search_fields", [index.SearchField("summary")]
+            ),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            book.save(update_fields=["title"])
+
+        self.assertTrue(backend().add_bulk.called)
+
+
+@mock.patch("modelsearch.tests.DummySearchBackend", create=True)
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {"BACKEND": "modelsearch.tests.DummySearchBackend"}
+    }
+)
+class TestIndexingBuffer(TestCase):
+    def create_book(self, title):
+        return models.Book.objects.create(
+            title=title, publication_date=date(2017, 10, 18), number_of_pages=100
+        )
+
+    def test_writes_each_model_once_per_transaction(self, backend):
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            books = [self.create_book(f"Test {i}") for i in range(3)]
+            author = models.Author.objects.create(name="Test")
+
+        self.assertEqual(backend().add_bulk.call_count, 2)
+        backend().add_bulk.assert_any_call(models.Book, books)
+        backend().add_bulk.assert_any_call(models.Author, [author])
+        self.assertFalse(backend().add.mock_calls)
+
+    def test_enqueues_one_task_per_model(self, backend):
+        with mock.patch(
+            "modelsearch.buffer.insert_or_update_objects_task"
+        ) as objects_task:
+            with self.captureOnCommitCallbacks(execute=True):
+                books = [self.create_book(f"Test {i}") for i in range(3)]
+                books[0].save()
+
+        objects_task.enqueue.assert_called_once_with(
+            "searchtests", "book", [str(book.pk) for book in books[1:] + books[:1]]
+        )
+
+    @mock.patch("modelsearch.buffer.TASK_BATCH_SIZE", 2)
+    def test_splits_large_batches(self, backend):
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            books = [self.create_book(f"Test {i}") for i in range(3)]
+
+        self.assertEqual(backend().add_bulk.call_count, 2)
+        backend().add_bulk.assert_any_call(models.Book, books[:2])
+        backend().add_bulk.assert_any_call(models.Book, books[2:])
+
+    def test_deduplicates_saves(self, backend):
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            book = self.create_book("Test")
+            book.title = "Updated test"
+            book.save()
+            book.save()
+
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+        self.assertEqual(backend().add_bulk.call_args[0][1][0].title, "Updated test")
+
+    def test_save_then_delete(self, backend):
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            book = self.create_book("Test")
+            book_id = book.pk
+            book.delete()
+
+        self.assertFalse(backend().add_bulk.mock_calls)
+        backend().delete_bulk.assert_called_once_with(models.Book, [str(book_id)])
+
+    def test_deletes_are_grouped_by_root_model(self, backend):
+        with self.captureOnCommitCallbacks(execute=True):
+            novel = models.Novel.objects.create(
+                title="Novel", publication_date=date(2017, 10, 18), number_of_pages=100
+            )
+            book = self.create_book("Book")
+        ids = [str(novel.pk), str(book.pk)]
+
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            novel.delete()
+            book.delete()
+
+        backend().delete_bulk.assert_called_once_with(models.Book, ids)
+
+    def test_deletes_are_batched(self, backend):
+        with self.captureOnCommitCallbacks(execute=True):
+            books = [self.create_book(f"Test {i}") for i in range(3)]
+        book_ids = [book.pk for book in books]
+
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Book.objects.filter(pk__in=book_ids).delete()
+
+        backend().delete_bulk.assert_called_once()
+        model, pks = backend().delete_bulk.call_args[0]
+        self.assertEqual(model, models.Book)
+        self.assertEqual(sorted(pks), sorted(str(pk) for pk in book_ids))
+
+    def test_nothing_written_before_commit(self, backend):
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_book("Test")
+
+        self.assertTrue(callbacks)
+        self.assertFalse(backend().add_bulk.mock_calls)
+
+    def test_registers_one_callback_per_transaction(self, backend):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for i in range(3):
+                self.create_book(f"Test {i}")
+
+        self.assertEqual(len(callbacks), 1)
+
+    def test_rolled_back_savepoint_is_discarded(self, backend):
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            book = self.create_book("Kept")
+
+            try:
+                with transaction.atomic():
+                    self.create_book("Rolled back")
+                    raise ValueError
+            except ValueError:
+                pass
+
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+
+    def test_released_savepoint_is_merged(self, backend):
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            book = self.create_book("Outer")
+
+            with transaction.atomic():
+                nested_book = self.create_book("Nested")
+
+            book.save()
+
+        backend().add_bulk.assert_called_once()
+        model, objs = backend().add_bulk.call_args[0]
+        self.assertEqual(model, models.Book)
+        self.assertCountEqual(objs, [book, nested_book])
+
+    def test_delete_in_savepoint_then_save(self, backend):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = self.create_book("Test")
+
+        backend().reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                models.Book.objects.filter(pk=book.pk).delete()
+
+            book.save()
+
+        # The delete happened first, so the object is indexed again
+        backend().delete_bulk.assert_not_called()
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+
+
+@mock.patch("modelsearch.tests.DummySearchBackend", create=True)
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {"BACKEND": "modelsearch.tests.DummySearchBackend"}
+    }
+)
+class TestIndexingBufferTransactions(TransactionTestCase):
+    def create_book(self, title):
+        return models.Book.objects.create(
+            title=title, publication_date=date(2017, 10, 18), number_of_pages=100
+        )
+
+    def test_rolled_back_transaction_is_discarded(self, backend):
+        try:
+            with transaction.atomic():
+                self.create_book("Rolled back")
+                raise ValueError
+        except ValueError:
+            pass
+
+        backend().reset_mock()
+        with transaction.atomic():
+            book = self.create_book("Committed")
+
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+
+    def test_failing_on_commit_callback_doesnt_orphan_the_batch(self, backend):
+        def fail():
+            raise ValueError
+
+        # The failing callback runs first, so the buffer's callback is never run
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                transaction.on_commit(fail)
+                self.create_book("Lost")
+
+        backend().reset_mock()
+        with transaction.atomic():
+            book = self.create_book("Committed")
+
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+
 
 @mock.patch("modelsearch.tests.DummySearchBackend", create=True)
 @override_settings(
@@ -226,12 +724,12 @@ class TestSignalHandlersSearchDisabled(TestCase):
             title="Test", publication_date=date(2017, 10, 18), number_of_pages=100
         )
 
-        self.assertEqual(backend().add.call_count, 0)
-        self.assertIsNone(backend().add.call_args)
+        self.assertEqual(backend().add_bulk.call_count, 0)
+        self.assertIsNone(backend().add_bulk.call_args)
 
         backend().reset_mock()
         obj.title = "Updated test"
         obj.save()
 
-        self.assertEqual(backend().add.call_count, 0)
-        self.assertIsNone(backend().add.call_args)
+        self.assertEqual(backend().add_bulk.call_count, 0)
+        self.assertIsNone(backend().add_bulk.call_args)
@@ -1,5 +1,7 @@
 from contextlib import contextmanager
+from unittest import mock
 
+from django.apps import apps
 from django.core import checks
 from django.test import TestCase
 
@@ -105,3 +107,184 @@ class TestSearchFields(TestCase):
             ]
             errors = models.Book.check()
             self.assertEqual(errors, expected_errors)
+
+    def test_checking_search_updated_field(self):
+        with mock.patch.object(models.Book, "search_updated_field", "publication_date"):
+            self.assertEqual(models.Book.check(), [])
+
+        with mock.patch.object(models.Book, "search_updated_field", "foo"):
+            expected_errors = [
+                checks.Warning(
+                    "Book.search_updated_field refers to the non-existent field 'foo'",
+                    obj=models.Book,
+                    id="modelsearch.W005",
+                )
+            ]
+            errors = models.Book.check()
+            self.assertEqual(errors, expected_errors)
+
+    def test_checking_search_field_dependencies(self):
+        with patch_search_fields(
+            models.Author, [index.SearchField("__str__", depends_on=["name", "foo"])]
+        ):
+            expected_errors = [
+                checks.Warning(
+                    "Author.search_fields entry '__str__' depends on the non-existent field 'foo'",
+                    obj=models.Author,
+                    id="modelsearch.W006",
+                )
+            ]
+            errors = models.Author.check()
+            self.assertEqual(errors, expected_errors)
+
+
+class TestSearchPlans(TestCase):
+    def get_field_plan(self, model, field_type, field_name):
+        for field_plan in index.get_search_plan(model):
+            if (
+                type(field_plan.search_field) is field_type
+                and field_plan.search_field.field_name == field_name
+            ):
+                return field_plan
+
+    def test_built_when_app_is_ready(self):
+        for model in index.get_indexed_models():
+            self.assertIn(model, index.search_plans.plans)
+
+        # The models that RelatedFields point to are resolved too
+        self.assertIn(models.Character, index.search_plans.plans)
+
+    def test_model_field(self):
+        field_plan = self.get_field_plan(models.Novel, index.SearchField, "title")
+
+        self.assertEqual(field_plan.field, models.Book._meta.get_field("title"))
+        self.assertEqual(field_plan.attname, "title")
+        self.assertEqual(field_plan.type, "CharField")
+        self.assertEqual(field_plan.definition_model, models.Book)
+
+    def test_callable(self):
+        field_plan = self.get_field_plan(
+            models.ProgrammingGuide,
+            index.SearchField,
+            "get_programming_language_display",
+        )
+
+        self.assertIsNone(field_plan.field)
+        self.assertEqual(field_plan.attname, "get_programming_language_display")
+        self.assertEqual(field_plan.type, "CharField")
+        self.assertEqual(field_plan.definition_model, models.ProgrammingGuide)
+
+        obj = models.ProgrammingGuide(programming_language="py")
+        self.assertEqual(field_plan.get_value(obj), "Python")
+
+    def test_related_fields(self):
+        field_plan = self.get_field_plan(
+            models.Novel, index.RelatedFields, "characters"
+        )
+
+        self.assertEqual(field_plan.related_model, models.Character)
+        self.assertIs(field_plan.related_plan, index.get_search_plan(models.Character))
+
+    def test_get_value_doesnt_resolve_fields_again(self):
+        obj = models.Author(name="Jane Austen")
+        search_field = index.get_search_plan(models.Author).search_fields[0]
+
+        with (
+            mock.patch.object(models.Author._meta, "get_field") as get_field,
+            mock.patch.object(apps, "is_installed") as is_installed,
+        ):
+            value = search_field.get_value(obj)
+
+        self.assertEqual(value, "Jane Austen")
+        get_field.assert_not_called()
+        is_installed.assert_not_called()
+
+    def test_field_plans_are_shared_by_equivalent_fields(self):
+        plan = index.get_search_plan(models.Author)
+        field_plan = plan.get_field_plan(index.SearchField("name"))
+        field_plan_count = len(plan.field_plans)
+
+        for _ in range(3):
+            self.assertIs(plan.get_field_plan(index.SearchField("name")), field_plan)
+
+        self.assertIsNot(plan.get_field_plan(index.FilterField("name")), field_plan)
+        self.assertEqual(len(plan.field_plans), field_plan_count + 1)
+
+    def test_field_plans_of_fields_with_different_options_are_separate(self):
+        plan = index.get_search_plan(models.Book)
+        boosted = index.SearchField("title", boost=2)
+        partial = index.SearchField("title", partial_match=True)
+
+        self.assertIsNot(plan.get_field_plan(boosted), plan.get_field_plan(partial))
+        self.assertIs(plan.get_field_plan(boosted).search_field, boosted)
+        self.assertIs(plan.get_field_plan(partial).search_field, partial)
+        self.assertIs(
+            plan.get_field_plan(index.SearchField("title", boost=2)),
+            plan.get_field_plan(boosted),
+        )
+
+    def test_field_plans_of_related_fields_include_sub_fields(self):
+        plan = index.get_search_plan(models.Novel)
+        names = index.RelatedFields("characters", [index.SearchField("name")])
+        boosted_names = index.RelatedFields(
+            "characters", [index.SearchField("name", boost=2)]
+        )
+
+        self.assertIsNot(plan.get_field_plan(names), plan.get_field_plan(boosted_names))
+        self.assertIs(
+            plan.get_field_plan(
+                index.RelatedFields("characters", [index.SearchField("name")])
+            ),
+            plan.get_field_plan(names),
+        )
+
+    def test_field_plan_key_isnt_worked_out_again_for_the_same_field(self):
+        plan = index.get_search_plan(models.Author)
+        search_field = index.SearchField("name")
+        field_plan = plan.get_field_plan(search_field)
+
+        with mock.patch.object(index.ModelSearchPlan, "get_field_plan_key") as get_key:
+            self.assertIs(plan.get_field_plan(search_field), field_plan)
+
+        get_key.assert_not_called()
+
+    def test_rebuilt_when_search_fields_change(self):
+        old_plan = index.get_search_plan(models.Author)
+
+        with patch_search_fields(models.Author, [index.SearchField("name")]):
+            new_plan = index.get_search_plan(models.Author)
+            self.assertIsNot(new_plan, old_plan)
+            self.assertEqual(len(new_plan.search_fields), 1)
+
+        self.assertEqual(len(index.get_search_plan(models.Author).search_fields), 3)
+
+    def test_get_indexed_models_is_cached(self):
+        index.get_indexed_models()
+
+        with mock.patch.object(apps, "get_models") as get_models:
+            indexed_models = index.get_indexed_models()
+
+        get_models.assert_not_called()
+        self.assertIn(models.Book, indexed_models)
+        self.assertNotIn(models.UnindexedBook, indexed_models)
+
+    def test_dependencies(self):
+        self.assertEqual(
+            index.get_search_plan(models.Author).dependencies,
+            {"name", "date_of_birth"},
+        )
+
+        # Foreign keys can be saved by attname too, and callables declare their own
+        self.assertEqual(
+            index.get_search_plan(models.ProgrammingGuide).dependencies
+            - index.get_search_plan(models.Book).dependencies,
+            {"programming_language"},
+        )
+        self.assertTrue(
+            {"protagonist", "protagonist_id"}
+            <= index.get_search_plan(models.Novel).dependencies
+        )
+
+    def test_dependencies_of_callable_are_unknown(self):
+        with patch_search_fields(models.Author, [index.SearchField("__str__")]):
+            self.assertIsNone(index.get_search_plan(models.Author).dependencies)
@@ -0,0 +1,388 @@
+import datetime
+import os
+import unittest
+
+from concurrent.futures import Future
+from io import StringIO
+from unittest import mock
+
+from django.core import management
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+
+from modelsearch.backends import get_search_backend
+from modelsearch.backends.database.sqlite.utils import fts5_available
+from modelsearch.management.commands.rebuild_modelsearch_index import get_pk_ranges
+from modelsearch.models import IndexEntry, RebuildCheckpoint, UpdateWatermark
+from modelsearch.test.testapp import models
+
+
+def database_backend_has_index_entries():
+    """
+    Returns True if the database backend for the current database stores its index in
+    IndexEntry, rather than falling back to searching the models' tables directly.
+    """
+    if connection.vendor == "sqlite":
+        return fts5_available()
+
+    return connection.vendor in ["postgresql", "mysql"]
+
+
+skip_without_index_entries = unittest.skipUnless(
+    database_backend_has_index_entries(),
+    "The database backend doesn't store index entries for this database",
+)
+
+
+class InProcessExecutor:
+    """
+    Stands in for ProcessPoolExecutor, running each call straight away in this process so
+    that the workers can see the test's data.
+    """
+
+    def __init__(self, max_workers=None, mp_context=None, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class ManagementCommandTestMixin:
+    """
+    Runs the management commands against the database backend of the current database.
+    """
+
+    fixtures = ["search"]
+
+    def get_backend(self):
+        return get_search_backend("default")
+
+    def get_index_class(self):
+        return type(self.get_backend().get_index_for_model(models.Book))
+
+    def rebuild(self, **options):
+        stdout = StringIO()
+        management.call_command(
+            "rebuild_modelsearch_index",
+            backend_name="default",
+            stdout=stdout,
+            stderr=StringIO(),
+            chunk_size=3,
+            **options,
+        )
+        return stdout.getvalue()
+
+    def get_entries(self):
+        return list(
+            IndexEntry.objects.order_by("content_type_id", "object_id").values_list(
+                "content_type_id", "object_id", "title", "body", "autocomplete"
+            )
+        )
+
+
+@skip_without_index_entries
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {
+            "BACKEND": "modelsearch.backends.database",
+            "ATOMIC_REBUILD": False,
+        }
+    }
+)
+@mock.patch(
+    "modelsearch.management.commands.rebuild_modelsearch_index.ProcessPoolExecutor",
+    InProcessExecutor,
+)
+class TestParallelRebuild(ManagementCommandTestMixin, TestCase):
+    def test_get_pk_ranges(self):
+        pks = list(models.Book.objects.order_by("pk").values_list("pk", flat=True))
+        ranges = get_pk_ranges(models.Book.objects.all(), 3)
+
+        self.assertEqual(len(ranges), (len(pks) + 2) // 3)
+        range_pks = []
+        for after_pk, last_pk in ranges:
+            qs = models.Book.objects.order_by("pk")
+            if after_pk is not None:
+                qs = qs.filter(pk__gt=after_pk)
+            if last_pk is not None:
+                qs = qs.filter(pk__lte=last_pk)
+            self.assertLessEqual(qs.count(), 3)
+            range_pks.extend(qs.values_list("pk", flat=True))
+
+        self.assertEqual(range_pks, pks)
+
+    def test_workers_index_the_same_entries(self):
+        self.rebuild()
+        expected = self.get_entries()
+        IndexEntry.objects.all().delete()
+
+        output = self.rebuild(workers=2)
+
+        self.assertEqual(self.get_entries(), expected)
+        self.assertIn(f"indexed {len(expected)} objects", output)
+
+    def test_worker_errors_abort_the_rebuild(self):
+        calls = []
+
+        def add_items(model, items):
+            calls.append(model)
+            if len(calls) == 2:
+                raise ValueError("Boom")
+
+        with (
+            mock.patch.object(
+                self.get_index_class(), "add_items", side_effect=add_items
+            ),
+            mock.patch.object(self.get_backend().rebuilder_class, "finish") as finish,
+            self.assertRaisesMessage(
+                CommandError, "1 of 5 chunks of searchtests.Author"
+            ),
+        ):
+            self.rebuild(workers=2)
+
+        finish.assert_not_called()
+
+    @override_settings(
+        MODELSEARCH_BACKENDS={
+            "default": {
+                "BACKEND": "modelsearch.backends.database",
+            }
+        }
+    )
+    def test_atomic_rebuild_uses_a_single_process(self):
+        with mock.patch(
+            "modelsearch.management.commands.rebuild_modelsearch_index.index_pk_range"
+        ) as index_pk_range:
+            output = self.rebuild(workers=2)
+
+        index_pk_range.assert_not_called()
+        self.assertIn("can't be rebuilt by multiple workers", output)
+
+
+@skip_without_index_entries
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {
+            "BACKEND": "modelsearch.backends.database",
+            "ATOMIC_REBUILD": False,
+        }
+    }
+)
+class TestParallelRebuildWorkerProcesses(
+    ManagementCommandTestMixin, TransactionTestCase
+):
+    """
+    Runs parallel rebuilds in a real pool of spawned worker processes, which set up Django
+    and connect to the test database on their own.
+    """
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Worker processes can't connect to an in-memory database")
+
+        # The workers load the test settings again, which use this database name
+        patcher = mock.patch.dict(
+            os.environ,
+            {"MODELSEARCH_TEST_DATABASE_NAME": connection.settings_dict["NAME"]},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_workers_index_the_same_entries(self):
+        self.rebuild()
+        expected = self.get_entries()
+        IndexEntry.objects.all().delete()
+
+        output = self.rebuild(workers=2)
+
+        self.assertEqual(self.get_entries(), expected)
+        self.assertIn(f"indexed {len(expected)} objects", output)
+
+
+@skip_without_index_entries
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {
+            "BACKEND": "modelsearch.backends.database",
+            "ATOMIC_REBUILD": False,
+        }
+    }
+)
+class TestResumableRebuild(ManagementCommandTestMixin, TestCase):
+    def interrupt_rebuild(self, after_calls):
+        index_class = self.get_index_class()
+        calls = []
+        add_items = index_class.add_items
+
+        def interrupting_add_items(index, model, items):
+            if len(calls) == after_calls:
+                raise KeyboardInterrupt
+
+            calls.append((model, [item.pk for item in items]))
+            add_items(index, model, items)
+
+        with (
+            mock.patch.object(index_class, "add_items", interrupting_add_items),
+            self.assertRaises(KeyboardInterrupt),
+        ):
+            self.rebuild()
+
+        return calls
+
+    def test_checkpoint_is_deleted_when_rebuild_finishes(self):
+        self.rebuild()
+
+        self.assertFalse(RebuildCheckpoint.objects.exists())
+
+    def test_checkpoint_records_progress(self):
+        calls = self.interrupt_rebuild(after_calls=2)
+
+        checkpoint = RebuildCheckpoint.objects.get()
+        last_model, last_pks = calls[-1]
+        self.assertEqual(checkpoint.backend_name, "default")
+        self.assertEqual(checkpoint.index_name, "default")
+        self.assertEqual(checkpoint.target_index_name, "default")
+        self.assertEqual(checkpoint.model, last_model._meta.label)
+        self.assertEqual(checkpoint.last_pk, str(last_pks[-1]))
+
+    def test_resume(self):
+        index_class = self.get_index_class()
+        self.rebuild()
+        expected = self.get_entries()
+        IndexEntry.objects.all().delete()
+
+        calls = self.interrupt_rebuild(after_calls=2)
+        last_model, last_pks = calls[-1]
+
+        with mock.patch.object(
+            index_class, "add_items", autospec=True, side_effect=index_class.add_items
+        ) as add_items:
+            output = self.rebuild(resume=True)
+
+        self.assertIn("Resuming rebuild", output)
+        self.assertEqual(self.get_entries(), expected)
+        self.assertFalse(RebuildCheckpoint.objects.exists())
+
+        # Objects that were indexed before the rebuild was interrupted aren't indexed again
+        resumed_pks = [
+            item.pk
+            for index, model, items in (call.args for call in add_items.call_args_list)
+            if model is last_model
+            for item in items
+        ]
+        self.assertTrue(resumed_pks)
+        self.assertTrue(all(pk > last_pks[-1] for pk in resumed_pks))
+
+    def test_resume_without_checkpoint(self):
+        output = self.rebuild(resume=True)
+
+        self.assertNotIn("Resuming rebuild", output)
+        self.assertFalse(RebuildCheckpoint.objects.exists())
+
+    def test_without_resume_starts_again(self):
+        self.interrupt_rebuild(after_calls=2)
+
+        output = self.rebuild()
+
+        self.assertNotIn("Resuming rebuild", output)
+        self.assertFalse(RebuildCheckpoint.objects.exists())
+
+    @override_settings(
+        MODELSEARCH_BACKENDS={
+            "default": {
+                "BACKEND": "modelsearch.backends.database",
+            }
+        }
+    )
+    def test_atomic_rebuild_starts_again(self):
+        RebuildCheckpoint.objects.create(
+            backend_name="default",
+            index_name="default",
+            target_index_name="default",
+            model="searchtests.Book",
+            last_pk="1",
+        )
+
+        output = self.rebuild(resume=True)
+
+        self.assertIn("can't be resumed, starting again", output)
+        self.assertFalse(RebuildCheckpoint.objects.exists())
+
+
+@skip_without_index_entries
+@override_settings(
+    MODELSEARCH_BACKENDS={
+        "default": {
+            "BACKEND": "modelsearch.backends.database",
+        }
+    }
+)
+@mock.patch.object(models.Book, "search_updated_field", "publication_date")
+class TestUpdateIndexSince(ManagementCommandTestMixin, TestCase):
+    def update(self, since):
+        with mock.patch.object(type(self.get_backend()), "add_bulk") as add_bulk:
+            management.call_command(
+                "update_modelsearch_index",
+                backend_name="default",
+                since=since,
+                stdout=StringIO(),
+            )
+
+        updated = {}
+        for call in add_bulk.call_args_list:
+            model, objs = call.args
+            updated.setdefault(model, []).extend(obj.pk for obj in objs)
+
+        return updated
+
+    def test_since_date(self):
+        updated = self.update("2017-01-01")
+
+        self.assertEqual(
+            updated,
+            {
+                models.Book: [16],
+                models.ProgrammingGuide: [12, 15],
+            },
+        )
+
+    def test_since_last(self):
+        # Models that haven't been updated before are indexed in full
+        updated = self.update("last")
+        self.assertEqual(
+            sorted(updated[models.Novel]),
+            list(models.Novel.objects.order_by("pk").values_list("pk", flat=True)),
+        )
+
+        watermark = UpdateWatermark.objects.get(
+            backend_name="default", model="searchtests.Novel"
+        )
+        watermark.updated_at = datetime.datetime(
+            1998, 1, 1, tzinfo=datetime.timezone.utc
+        )
+        watermark.save()
+
+        updated = self.update("last")
+        self.assertEqual(updated[models.Novel], [2, 3])
+
+    def test_models_without_updated_field_are_skipped(self):
+        updated = self.update("2000-01-01")
+
+        self.assertNotIn(models.Author, updated)
+
+    def test_invalid_since(self):
+        with self.assertRaisesMessage(CommandError, "'yesterday' is not a valid date"):
+            self.update("yesterday")
@@ -1,11 +1,12 @@
 import unittest
 
-from unittest import expectedFailure, skip
+from unittest import expectedFailure, mock, skip
 
 from django.db import connection
 from django.test.testcases import TransactionTestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 
+from modelsearch.models import IndexEntry
 from modelsearch.query import Not, PlainText
 from modelsearch.test.testapp import models
 from modelsearch.tests.test_backends import BackendTests
@@ -229,3 +230,33 @@ class TestMySQLSearchBackend(BackendTests, TransactionTestCase):
         search_field = compiler.get_search_field("authors__name")
         self.assertIsNotNone(search_field)
         self.assertEqual(search_field.field_name, "name")
+
+    def test_add_items_updates_existing_entries(self):
+        index = self.backend.get_index_for_model(models.Book)
+        books = list(models.Book.objects.order_by("pk"))
+        for book in books:
+            book.title = f"Renamed {book.title}"
+
+        index.add_items(models.Book, books)
+
+        self.assertEqual(
+            IndexEntry.objects.filter(title__startswith="Renamed").count(), len(books)
+        )
+
+    def test_add_items_insert_batch_size(self):
+        index = self.backend.get_index_for_model(models.Book)
+        books = list(models.Book.objects.order_by("pk"))
+
+        with (
+            mock.patch.object(self.backend, "insert_batch_size", 2),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            index.add_items(models.Book, books)
+
+        inserts = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith("INSERT INTO")
+            and "ON DUPLICATE KEY UPDATE" in query["sql"]
+        ]
+        self.assertEqual(len(inserts), (len(books) + 1) // 2)
@@ -2,9 +2,10 @@ import unittest
 
 from django.db import connection
 from django.test import TestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 
-from modelsearch.query import Phrase
+from modelsearch.models import IndexEntry
+from modelsearch.query import MATCH_ALL, Phrase
 from modelsearch.test.testapp import models
 from modelsearch.tests.test_backends import BackendTests
 
@@ -198,6 +199,43 @@ class TestPostgresSearchBackend(BackendTests, TestCase):
         results = self.backend.search("JavaScript", models.Book)
         self.assertEqual(results.count(), 0)
 
+    def test_bulk_load_matches_add_items(self):
+        """
+        Entries loaded through COPY by the rebuilders should be the same as the entries
+        written by add_items.
+        """
+        index = self.backend.get_index_for_model(models.Book)
+        books = list(models.Book.objects.order_by("pk"))
+        entry_fields = ["object_id", "title", "autocomplete", "body", "title_norm"]
+
+        self.backend.reset_indexes()
+        index.add_items(models.Book, books)
+        expected = list(
+            IndexEntry.objects.order_by("object_id").values_list(*entry_fields)
+        )
+
+        self.backend.reset_indexes()
+        index.bulk_load = True
+        index.add_items(models.Book, books)
+
+        self.assertEqual(
+            list(IndexEntry.objects.order_by("object_id").values_list(*entry_fields)),
+            expected,
+        )
+
+    def test_facets_use_grouping_sets(self):
+        results = self.backend.search(MATCH_ALL, models.ProgrammingGuide)
+
+        with CaptureQueriesContext(connection) as queries:
+            facets = results.facets(["programming_language", "number_of_pages"])
+
+        self.assertEqual(len(queries), 1)
+        self.assertIn("GROUPING SETS", queries[0]["sql"])
+        self.assertDictEqual(
+            dict(facets["programming_language"]), {"js": 2, "py": 2, "rs": 1}
+        )
+        self.assertEqual(sum(facets["number_of_pages"].values()), 5)
+
     @unittest.expectedFailure
     def test_get_search_field_for_related_fields(self):
         """
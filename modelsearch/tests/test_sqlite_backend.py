@@ -1,13 +1,21 @@
 import sqlite3
 import unittest
 
-from unittest import skip
+from io import StringIO
+from unittest import mock, skip
 
+from django.core import management
 from django.db import connection
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
 from django.test.testcases import TestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 
 from modelsearch.backends.database.sqlite.utils import fts5_available
+from modelsearch.models import (
+    IndexEntry,
+    IndexEntryStatistics,
+)
 from modelsearch.test.testapp import models
 from modelsearch.tests.test_backends import BackendTests
 
@@ -100,3 +108,261 @@ class TestSQLiteSearchBackend(BackendTests, TestCase):
         search_field = compiler.get_search_field("authors__name")
         self.assertIsNotNone(search_field)
         self.assertEqual(search_field.field_name, "name")
+
+    def assertTitleStatisticsCorrect(self):
+        expected = (
+            IndexEntry.objects.annotate(title_length=Length("title"))
+            .filter(title_length__gt=0)
+            .aggregate(title_length_sum=Sum("title_length"), title_count=Count("pk"))
+        )
+        statistics = IndexEntryStatistics.objects.get()
+        self.assertEqual(statistics.title_length_sum, expected["title_length_sum"])
+        self.assertEqual(statistics.title_count, expected["title_count"])
+
+    def test_title_statistics_are_kept_up_to_date(self):
+        index = self.backend.get_index_for_model(models.Book)
+        self.assertTitleStatisticsCorrect()
+
+        book = models.Book.objects.create(
+            title="A new book", publication_date="2024-01-01", number_of_pages=10
+        )
+        index.add_item(book)
+        self.assertTitleStatisticsCorrect()
+
+        book.title = "A new book with a much longer title"
+        index.add_item(book)
+        self.assertTitleStatisticsCorrect()
+
+        index.delete_item(book)
+        self.assertTitleStatisticsCorrect()
+
+        index.delete_items(models.Book, [1, 2])
+        self.assertTitleStatisticsCorrect()
+
+    def test_title_statistics_are_a_single_row(self):
+        index = self.backend.get_index_for_model(models.Book)
+        IndexEntryStatistics.objects.all().delete()
+        measure = index.title_norms.measure
+
+        def measure_while_another_process_creates_the_row(entries):
+            IndexEntryStatistics.objects.create(
+                pk=IndexEntryStatistics.SINGLETON_PK,
+                title_length_sum=10,
+                title_count=1,
+            )
+            return measure(entries)
+
+        with mock.patch.object(
+            index.title_norms,
+            "measure",
+            side_effect=measure_while_another_process_creates_the_row,
+        ):
+            statistics = index.title_norms.get_statistics()
+
+        self.assertEqual(statistics.pk, IndexEntryStatistics.SINGLETON_PK)
+        self.assertEqual(statistics.title_length_sum, 10)
+        self.assertEqual(IndexEntryStatistics.objects.count(), 1)
+
+    def test_title_norm_is_set_when_adding(self):
+        index = self.backend.get_index_for_model(models.Book)
+        book = models.Book.objects.create(
+            title="A new book", publication_date="2024-01-01", number_of_pages=10
+        )
+        index.add_item(book)
+
+        statistics = IndexEntryStatistics.objects.get()
+        entry = book.index_entries.get()
+        self.assertAlmostEqual(
+            entry.title_norm,
+            statistics.title_length_sum / statistics.title_count / len(entry.title),
+        )
+
+    def test_refresh_title_norms_in_chunks(self):
+        index = self.backend.get_index_for_model(models.Book)
+        IndexEntry.objects.update(title_norm=1.0)
+        IndexEntryStatistics.objects.update(title_length_sum=0, title_count=0)
+
+        with (
+            mock.patch.object(index.title_norms, "refresh_chunk_size", 2),
+            mock.patch.object(
+                index.title_norms,
+                "update_norms",
+                wraps=index.title_norms.update_norms,
+            ) as update_norms,
+        ):
+            index.title_norms.refresh()
+
+        self.assertEqual(update_norms.call_count, (IndexEntry.objects.count() + 1) // 2)
+        self.assertTitleStatisticsCorrect()
+        statistics = IndexEntryStatistics.objects.get()
+        average_title_length = statistics.title_length_sum / statistics.title_count
+        for entry in IndexEntry.objects.exclude(title=""):
+            self.assertAlmostEqual(
+                entry.title_norm, average_title_length / len(entry.title)
+            )
+
+    def test_add_items_updates_existing_entries(self):
+        index = self.backend.get_index_for_model(models.Book)
+        books = list(models.Book.objects.order_by("pk"))
+        for book in books:
+            book.title = f"Renamed {book.title}"
+
+        index.add_items(models.Book, books)
+
+        self.assertEqual(
+            self.backend.search("Renamed", models.Book).count(), len(books)
+        )
+        self.assertEqual(
+            IndexEntry.objects.filter(title__startswith="Renamed").count(), len(books)
+        )
+
+    def test_add_items_query_count_doesnt_depend_on_chunk_size(self):
+        index = self.backend.get_index_for_model(models.Author)
+        authors = list(models.Author.objects.order_by("pk"))
+        self.assertGreater(len(authors), 1)
+
+        with CaptureQueriesContext(connection) as single:
+            index.add_items(models.Author, authors[:1])
+
+        with CaptureQueriesContext(connection) as many:
+            index.add_items(models.Author, authors)
+
+        self.assertEqual(len(many), len(single))
+
+    def test_add_items_without_upsert_support(self):
+        index = self.backend.get_index_for_model(models.Book)
+        books = list(models.Book.objects.order_by("pk"))
+        for book in books:
+            book.title = f"Renamed {book.title}"
+
+        with mock.patch.object(
+            index.write_connection.features,
+            "supports_update_conflicts_with_target",
+            False,
+        ):
+            index.add_items(models.Book, books)
+
+        self.assertEqual(
+            self.backend.search("Renamed", models.Book).count(), len(books)
+        )
+        self.assertTitleStatisticsCorrect()
+
+    def test_facets_in_one_query(self):
+        field_names = ["title", "number_of_pages", "publication_date"]
+        results = self.backend.search("JavaScript", models.Book)
+
+        with CaptureQueriesContext(connection) as queries:
+            facets = results.facets(field_names)
+
+        # Each field is grouped by separately, rather than by every combination of values
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]["sql"].count("UNION ALL"), len(field_names) - 1)
+
+        for field_name in field_names:
+            self.assertEqual(facets[field_name], results.facet(field_name))
+
+    def test_facets_count_multi_valued_fields_separately(self):
+        results = self.backend.search("JavaScript", models.Book)
+
+        with self.assertNumQueries(2):
+            facets = results.facets(["number_of_pages", "authors"])
+
+        self.assertEqual(sum(facets["number_of_pages"].values()), 2)
+
+    def test_delete_items_in_one_query(self):
+        index = self.backend.get_index_for_model(models.Book)
+
+        with CaptureQueriesContext(connection) as queries:
+            index.delete_items(models.Book, [1, 2, 3])
+
+        deletes = [
+            query["sql"] for query in queries if query["sql"].startswith("DELETE")
+        ]
+        self.assertEqual(len(deletes), 1)
+        book_entries = IndexEntry.objects.filter(
+            content_type__model__in=["book", "novel", "programmingguide"]
+        )
+        self.assertFalse(book_entries.filter(object_id__in=["1", "2", "3"]))
+        self.assertTrue(book_entries.filter(object_id="4"))
+        self.assertTitleStatisticsCorrect()
+
+    def test_delete_item(self):
+        index = self.backend.get_index_for_model(models.Novel)
+        novel = models.Novel.objects.get(pk=1)
+
+        with mock.patch.object(index, "delete_items") as delete_items:
+            index.delete_item(novel)
+
+        delete_items.assert_called_once_with(models.Novel, [1])
+
+    def test_delete_stale_entries_in_chunks(self):
+        index = self.backend.get_index_for_model(models.Author)
+        authors = [models.Author.objects.create(name=f"Author {i}") for i in range(5)]
+        self.backend.add_bulk(models.Author, authors)
+        stale_ids = [str(author.pk) for author in authors]
+        # Bypass the post_delete signal so that the index entries are left behind
+        models.Author.objects.filter(pk__in=stale_ids)._raw_delete(using="default")
+
+        with (
+            mock.patch.object(index, "stale_entries_chunk_size", 2),
+            mock.patch.object(
+                index, "delete_items", wraps=index.delete_items
+            ) as delete_items,
+        ):
+            index.delete_stale_model_entries(models.Author)
+
+        self.assertEqual(delete_items.call_count, 3)
+        self.assertFalse(
+            IndexEntry.objects.filter(
+                content_type__model="author", object_id__in=stale_ids
+            ).exists()
+        )
+        self.assertEqual(
+            IndexEntry.objects.filter(content_type__model="author").count(),
+            models.Author.objects.count(),
+        )
+        self.assertTitleStatisticsCorrect()
+
+    def test_add_items_skips_unchanged_entries(self):
+        index = self.backend.get_index_for_model(models.Novel)
+        novels = list(models.Novel.objects.filter(pk__in=[1, 2]).order_by("pk"))
+        novels[1].title = f"Renamed {novels[1].title}"
+        skipped_writes = self.backend.skipped_writes
+
+        with CaptureQueriesContext(connection) as queries:
+            index.add_items(models.Novel, novels[:1])
+
+        self.assertFalse(
+            [query for query in queries if not query["sql"].startswith("SELECT")]
+        )
+        self.assertEqual(self.backend.skipped_writes, skipped_writes + 1)
+
+        index.add_items(models.Novel, novels)
+
+        self.assertEqual(self.backend.skipped_writes, skipped_writes + 2)
+        self.assertEqual(novels[1].index_entries.get().title, novels[1].title)
+        self.assertTitleStatisticsCorrect()
+
+    def test_add_items_writes_unchanged_entries_when_not_skipping(self):
+        index = self.backend.get_index_for_model(models.Novel)
+        index.skip_unchanged = False
+        novel = models.Novel.objects.get(pk=1)
+        novel.index_entries.update(title="")
+        skipped_writes = self.backend.skipped_writes
+
+        index.add_items(models.Novel, [novel])
+
+        self.assertEqual(self.backend.skipped_writes, skipped_writes)
+        self.assertEqual(novel.index_entries.get().title, novel.title)
+
+    def test_rebuild_rewrites_unchanged_entries(self):
+        titles = dict(IndexEntry.objects.values_list("pk", "title"))
+        IndexEntry.objects.update(title="")
+
+        management.call_command(
+            "rebuild_modelsearch_index",
+            backend_name=self.backend_name,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(dict(IndexEntry.objects.values_list("pk", "title")), titles)